@@ -2,7 +2,16 @@ import numpy as np
 from mt_circuit.circuit import QuantumCircuit
 from mt_circuit.util import pauli_exp
 from mt_circuit.gate import X, Y, Z
-from mt_circuit.decompose.decompose import u2_matrix_to_HPI_RZ_form, u4_matrix_to_CHPI_u2_form
+from mt_circuit.decompose.decompose import (
+    u2_to_zxzxz_angles,
+    u4_matrix_to_CHPI_u2_form,
+    _u4_matrix_to_CHPI_u2_gate_list,
+)
+
+# instructions of the program built by convert_to_HPI_CHPI
+_RZ_ = 0
+_U2_ = 1
+_GATE_ = 2
 
 
 def remove_u4(circuit: QuantumCircuit) -> QuantumCircuit:
@@ -73,19 +82,32 @@ def bundle_1q(circuit: QuantumCircuit) -> QuantumCircuit:
 
 
 def remove_u2(circuit: QuantumCircuit) -> QuantumCircuit:
-    new_circuit = QuantumCircuit(circuit.num_qubit)
-    for gate in circuit.gate_list:
-        gate_name = gate["name"]
-        assert gate_name in ["MZ", "HPI", "CHPI", "SYNC", "RZ", "u2"]
-        if gate_name in ["u2"]:
-            u = gate["matrix"]
-            c = u2_matrix_to_HPI_RZ_form(u)
-            for temp_gate in c.gate_list:
-                temp_gate["targets"] = gate["targets"]
-                new_circuit.add_gate(**temp_gate)
-        else:
-            new_circuit.add_gate(**gate)
-    return new_circuit
+    return remove_u2_batch([circuit])[0]
+
+
+def remove_u2_batch(circuit_list: list[QuantumCircuit]) -> list[QuantumCircuit]:
+    # u2 gates of all circuits are decomposed together
+    matrix_list = [gate["matrix"] for circuit in circuit_list for gate in circuit.gate_list if gate["name"] == "u2"]
+    angle_list = u2_to_zxzxz_angles(np.array(matrix_list, dtype=complex).reshape(-1, 2, 2))
+    angle_index = 0
+    new_circuit_list = []
+    for circuit in circuit_list:
+        new_circuit = QuantumCircuit(circuit.num_qubit)
+        for gate in circuit.gate_list:
+            gate_name = gate["name"]
+            assert gate_name in ["MZ", "HPI", "CHPI", "SYNC", "RZ", "u2"]
+            if gate_name in ["u2"]:
+                z1, z2, z3 = angle_list[angle_index]
+                angle_index += 1
+                new_circuit.add_gate(name="RZ", targets=gate["targets"], angle=z1)
+                new_circuit.add_gate(name="HPI", targets=gate["targets"], angle=0)
+                new_circuit.add_gate(name="RZ", targets=gate["targets"], angle=z2)
+                new_circuit.add_gate(name="HPI", targets=gate["targets"], angle=0)
+                new_circuit.add_gate(name="RZ", targets=gate["targets"], angle=z3)
+            else:
+                new_circuit.add_gate(**gate)
+        new_circuit_list.append(new_circuit)
+    return new_circuit_list
 
 
 def push_rz(circuit: QuantumCircuit) -> QuantumCircuit:
@@ -110,8 +132,87 @@ def push_rz(circuit: QuantumCircuit) -> QuantumCircuit:
 
 
 def convert_to_HPI_CHPI(circuit: QuantumCircuit) -> QuantumCircuit:
-    circuit = remove_u4(circuit)
-    circuit = bundle_1q(circuit)
-    circuit = remove_u2(circuit)
-    circuit = push_rz(circuit)
-    return circuit
+    """Convert circuit to HPI, CHPI, and RZ gates
+
+    The result is identical to applying remove_u4, bundle_1q, remove_u2, and push_rz in order,
+    but gates are converted in a single pass without intermediate circuits.
+    Single-qubit gates are accumulated per qubit, and u2 blocks are decomposed together at the end.
+
+    Args:
+        circuit (QuantumCircuit): circuit of MZ, HPI, CHPI, SYNC, RZ, RX, RY, u2, and u4 gates
+
+    Returns:
+        QuantumCircuit: circuit of MZ, HPI, CHPI, SYNC, and RZ gates, where RZ gates are pushed to the end
+    """
+    gate_name_list = ["MZ", "HPI", "CHPI", "SYNC", "RZ", "u2", "RX", "RY", "u4"]
+    for gate in circuit.gate_list:
+        if gate["name"] not in gate_name_list:
+            raise ValueError(f"gate name: {gate['name']} cannot be converted. Available gates are {gate_name_list}")
+
+    num_qubit = circuit.num_qubit
+    cache: list[np.ndarray | None] = [None] * num_qubit
+    matrix_list: list[np.ndarray] = []
+    program: list[tuple] = []
+    for gate in circuit.gate_list:
+        if gate["name"] == "u4":
+            sub_gate_list = _u4_matrix_to_CHPI_u2_gate_list(gate["matrix"])
+            for sub_gate in sub_gate_list:
+                sub_gate["targets"] = [gate["targets"][idx] for idx in sub_gate["targets"]]
+        else:
+            sub_gate_list = [gate]
+
+        for sub_gate in sub_gate_list:
+            gate_name = sub_gate["name"]
+            if gate_name == "RZ":
+                idx = sub_gate["targets"][0]
+                if cache[idx] is not None:
+                    cache[idx] = pauli_exp(Z, sub_gate["angle"]) @ cache[idx]
+                else:
+                    program.append((_RZ_, idx, float(sub_gate["angle"])))
+            elif gate_name in ["RX", "RY", "u2"]:
+                idx = sub_gate["targets"][0]
+                if gate_name == "RX":
+                    u = pauli_exp(X, sub_gate["angle"])
+                elif gate_name == "RY":
+                    u = pauli_exp(Y, sub_gate["angle"])
+                else:
+                    u = sub_gate["matrix"]
+                cache[idx] = u if cache[idx] is None else u @ cache[idx]
+            else:
+                for idx in sub_gate["targets"]:
+                    if cache[idx] is not None:
+                        program.append((_U2_, idx, len(matrix_list)))
+                        matrix_list.append(cache[idx])
+                        cache[idx] = None
+                program.append((_GATE_, gate_name, sub_gate["targets"]))
+    for idx in range(num_qubit):
+        if cache[idx] is not None:
+            program.append((_U2_, idx, len(matrix_list)))
+            matrix_list.append(cache[idx])
+
+    angle_list = u2_to_zxzxz_angles(np.array(matrix_list, dtype=complex).reshape(-1, 2, 2)).tolist()
+    phase_accum = [0.0] * num_qubit
+    gate_list = []
+    for instruction, arg0, arg1 in program:
+        if instruction == _RZ_:
+            phase_accum[arg0] += arg1
+        elif instruction == _U2_:
+            z1, z2, z3 = angle_list[arg1]
+            phase_accum[arg0] += z1
+            gate_list.append({"name": "HPI", "targets": [arg0], "angle": np.float64(phase_accum[arg0]), "matrix": None})
+            phase_accum[arg0] += z2
+            gate_list.append({"name": "HPI", "targets": [arg0], "angle": np.float64(phase_accum[arg0]), "matrix": None})
+            phase_accum[arg0] += z3
+        elif arg0 == "HPI":
+            gate_list.append(
+                {"name": "HPI", "targets": arg1, "angle": np.float64(phase_accum[arg1[0]]), "matrix": None}
+            )
+        elif arg0 == "CHPI":
+            gate_list.append(
+                {"name": "CHPI", "targets": arg1, "angle": np.float64(phase_accum[arg1[1]]), "matrix": None}
+            )
+        else:
+            gate_list.append({"name": arg0, "targets": arg1, "angle": None, "matrix": None})
+    for idx in range(num_qubit):
+        gate_list.append({"name": "RZ", "targets": [idx], "angle": np.float64(phase_accum[idx]), "matrix": None})
+    return QuantumCircuit(num_qubit, gate_list)
@@ -1,3 +1,11 @@
-from .decompose import u2_matrix_to_HPI_RZ_form, u4_matrix_to_CHPI_u2_form
+from .decompose import u2_to_zxzxz_angles, u2_matrix_to_HPI_RZ_form, u4_matrix_to_CHPI_u2_form
+from .kak_cache import KAKCache, get_kak_cache, set_kak_cache
 
-__all__ = [u2_matrix_to_HPI_RZ_form, u4_matrix_to_CHPI_u2_form]
+__all__ = [
+    u2_to_zxzxz_angles,
+    u2_matrix_to_HPI_RZ_form,
+    u4_matrix_to_CHPI_u2_form,
+    KAKCache,
+    get_kak_cache,
+    set_kak_cache,
+]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from typing import Any, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import hashlib
+import os
+import numpy as np
+import cirq
+
+
+@dataclass(frozen=True)
+class KAKForm:
+    # single-qubit operations of qubit 0 and 1 before and after the interaction
+    single_qubit_operations_before: tuple[np.ndarray, np.ndarray]
+    single_qubit_operations_after: tuple[np.ndarray, np.ndarray]
+    interaction_coefficients: tuple[float, float, float]
+
+
+@dataclass
+class KAKCache:
+    max_size: int = 4096
+    # matrices equal up to global phase within this tolerance share a decomposition
+    tolerance: float = 1e-10
+    # decompositions are loaded from and saved to this npz file if given
+    path: Optional[str] = None
+    hit_count: int = 0
+    miss_count: int = 0
+    _entry_dict: OrderedDict[str, KAKForm] = field(default_factory=OrderedDict)
+
+    def __post_init__(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            self.load(self.path)
+
+    def get_key(self, U: np.ndarray) -> str:
+        # global phase is fixed by the first entry larger than half the maximum magnitude
+        U = np.asarray(U, dtype=complex)
+        magnitude = np.abs(U)
+        pivot = U.flat[np.argmax(magnitude > np.max(magnitude) / 2)]
+        canonical = U * (np.abs(pivot) / pivot)
+        quantized = np.round(canonical.view(float) / self.tolerance).astype(np.int64)
+        return hashlib.sha256(quantized.tobytes()).hexdigest()
+
+    def get(self, U: np.ndarray) -> KAKForm:
+        key = self.get_key(U)
+        if key in self._entry_dict:
+            self.hit_count += 1
+            self._entry_dict.move_to_end(key)
+            return self._entry_dict[key]
+        self.miss_count += 1
+        kak_form = cirq.linalg.kak_decomposition(U)
+        entry = KAKForm(
+            single_qubit_operations_before=tuple(kak_form.single_qubit_operations_before),
+            single_qubit_operations_after=tuple(kak_form.single_qubit_operations_after),
+            interaction_coefficients=tuple(kak_form.interaction_coefficients),
+        )
+        self._put(key, entry)
+        return entry
+
+    def _put(self, key: str, entry: KAKForm) -> None:
+        if self.max_size <= 0:
+            return
+        self._entry_dict[key] = entry
+        self._entry_dict.move_to_end(key)
+        while len(self._entry_dict) > self.max_size:
+            self._entry_dict.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entry_dict.clear()
+
+    def get_statistics(self) -> dict[str, Any]:
+        total_count = self.hit_count + self.miss_count
+        return {
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+            "hit_rate": self.hit_count / total_count if total_count > 0 else 0.0,
+            "num_entry": len(self._entry_dict),
+            "max_size": self.max_size,
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Save decompositions in the order of recent use to npz file
+
+        Args:
+            path (Optional[str]): path of npz file, defaults to path of the cache
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("path must be given for cache without path")
+        entry_list = list(self._entry_dict.values())
+        single_qubit_operation = np.zeros((len(entry_list), 4, 2, 2), dtype=complex)
+        interaction_coefficient = np.zeros((len(entry_list), 3), dtype=float)
+        for index, entry in enumerate(entry_list):
+            single_qubit_operation[index] = entry.single_qubit_operations_before + entry.single_qubit_operations_after
+            interaction_coefficient[index] = entry.interaction_coefficients
+        key = np.array(list(self._entry_dict), dtype=str).reshape(-1)
+        # file is replaced at once so that concurrent sessions never read a partial file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez(
+                file,
+                tolerance=self.tolerance,
+                key=key,
+                single_qubit_operation=single_qubit_operation,
+                interaction_coefficient=interaction_coefficient,
+            )
+        os.replace(temporary_path, path)
+
+    def load(self, path: str) -> None:
+        """Load decompositions from npz file, where entries decomposed in this session are kept
+
+        Args:
+            path (str): path of npz file saved by save
+        """
+        with np.load(path) as data:
+            if float(data["tolerance"]) != self.tolerance:
+                raise ValueError(f"cache file is saved with tolerance {float(data['tolerance'])}, not {self.tolerance}")
+            key_list = data["key"].tolist()
+            single_qubit_operation = data["single_qubit_operation"]
+            interaction_coefficient = data["interaction_coefficient"]
+        loaded_dict: OrderedDict[str, KAKForm] = OrderedDict()
+        for index, key in enumerate(key_list):
+            loaded_dict[key] = KAKForm(
+                single_qubit_operations_before=(single_qubit_operation[index, 0], single_qubit_operation[index, 1]),
+                single_qubit_operations_after=(single_qubit_operation[index, 2], single_qubit_operation[index, 3]),
+                interaction_coefficients=tuple(interaction_coefficient[index].tolist()),
+            )
+        for key, entry in self._entry_dict.items():
+            loaded_dict[key] = entry
+        self._entry_dict.clear()
+        for key, entry in loaded_dict.items():
+            self._put(key, entry)
+
+
+_kak_cache = KAKCache()
+
+
+def get_kak_cache() -> KAKCache:
+    return _kak_cache
+
+
+def set_kak_cache(cache: KAKCache) -> None:
+    """Replace the cache used by u4_matrix_to_CHPI_u2_form, e.g., by a cache persisted to a file
+
+    Args:
+        cache (KAKCache): cache of KAK decompositions
+    """
+    global _kak_cache
+    _kak_cache = cache
@@ -1,4 +1,13 @@
-from .sampling import sample_pauli, sample_clifford, sample_unitary
+from .sampling import sample_pauli, sample_clifford, sample_clifford_batch, sample_unitary
 from .enumerate import enumerate_pauli
+from .clifford_table import CliffordTable, get_clifford_table
 
-__all__ = [sample_pauli, sample_clifford, sample_unitary, enumerate_pauli]
+__all__ = [
+    sample_pauli,
+    sample_clifford,
+    sample_clifford_batch,
+    sample_unitary,
+    enumerate_pauli,
+    CliffordTable,
+    get_clifford_table,
+]
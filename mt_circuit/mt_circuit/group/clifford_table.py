@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Optional
+from dataclasses import dataclass, field
+import functools
+import numpy as np
+import stim
+
+# Clifford groups up to this number of qubits are tabulated
+_max_num_qubit_clifford_table = 2
+# multiplication is tabulated for groups up to this size, and composed by tableaux otherwise
+_max_size_multiplication_table = 1024
+
+
+def _get_nearest_value_array(val_list: np.ndarray, val: np.ndarray) -> np.ndarray:
+    # nearest signed value in val_list for each element, where values smaller than half the minimum become zero
+    abs_val = np.abs(val)
+    idx = np.argmin(np.abs(val_list - abs_val[..., np.newaxis]), axis=-1)
+    new_val = np.where(val > 0, val_list[idx], -val_list[idx])
+    return np.where(abs_val < np.min(val_list) / 2, 0.0, new_val)
+
+
+def _round_clifford_matrix(matrix: np.ndarray, num_qubit: int) -> np.ndarray:
+    # convert complex64 values to complex128 of Clifford elements
+    val_list = np.array([1 / np.sqrt(2) ** i for i in range(num_qubit * 4)])
+    matrix_prec = _get_nearest_value_array(val_list, matrix.real) + 1.0j * _get_nearest_value_array(
+        val_list, matrix.imag
+    )
+    assert np.all(np.abs(matrix_prec - matrix) < 1e-7)
+    return matrix_prec
+
+
+@dataclass(frozen=True, slots=True)
+class CliffordTable:
+    num_qubit: int
+    # elements in the order of stim.Tableau.iter_all
+    tableau_list: list[stim.Tableau]
+    matrix: np.ndarray
+    identity: int
+    inverse: np.ndarray
+    multiplication: Optional[np.ndarray] = None
+    _index_dict: dict[str, int] = field(default_factory=dict, repr=False)
+    _gate_list_cache: dict[int, list[dict]] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.tableau_list)
+
+    def get_index(self, tableau: stim.Tableau) -> int:
+        return self._index_dict[str(tableau)]
+
+    def multiply(self, index_after: int, index_before: int) -> int:
+        """Get index of the element that applies index_before and then index_after
+
+        Args:
+            index_after (int): index of the element applied later
+            index_before (int): index of the element applied first
+
+        Returns:
+            int: index of the element whose matrix is matrix[index_after] @ matrix[index_before] up to phase
+        """
+        if self.multiplication is not None:
+            return int(self.multiplication[index_after, index_before])
+        return self._index_dict[str(self.tableau_list[index_after] * self.tableau_list[index_before])]
+
+    def compose(self, index_list: list[int]) -> int:
+        """Get index of the element that applies elements of index_list in order
+
+        Args:
+            index_list (list[int]): indices of elements in the order of application
+
+        Returns:
+            int: index of the composed element
+        """
+        index = self.identity
+        for next_index in index_list:
+            index = self.multiply(next_index, index)
+        return index
+
+    def get_gate_list(self, index: int) -> list[dict]:
+        """Get HPI, CHPI, and RZ gates of the element, which are decomposed once and cached
+
+        Args:
+            index (int): index of the element
+
+        Returns:
+            list[dict]: gates in the form of QuantumCircuit.gate_list on qubits 0, ..., num_qubit - 1
+        """
+        if index not in self._gate_list_cache:
+            from mt_circuit.circuit import QuantumCircuit
+            from mt_circuit.convert import convert_to_HPI_CHPI
+
+            circuit = QuantumCircuit(self.num_qubit)
+            gate_name = "u2" if self.num_qubit == 1 else "u4"
+            circuit.add_gate(name=gate_name, targets=list(range(self.num_qubit)), matrix=self.matrix[index])
+            self._gate_list_cache[index] = convert_to_HPI_CHPI(circuit).gate_list
+        # gates are copied since passes of convert update gates in place
+        return [dict(gate, targets=list(gate["targets"])) for gate in self._gate_list_cache[index]]
+
+    def sample_rb_sequence(self, length: int, seed: Optional[int] = None) -> list[int]:
+        """Sample indices of randomized benchmarking sequence, where the last element inverts the others
+
+        Args:
+            length (int): number of random elements
+            seed (Optional[int]): seed of random state
+
+        Returns:
+            list[int]: length + 1 indices of elements in the order of application
+        """
+        if length < 0:
+            raise ValueError("length must be no less than 0")
+        random_state = np.random.RandomState(seed)
+        index_list = random_state.randint(len(self), size=length).tolist()
+        index_list.append(int(self.inverse[self.compose(index_list)]))
+        return index_list
+
+
+@functools.lru_cache(maxsize=None)
+def get_clifford_table(num_qubit: int) -> CliffordTable:
+    """Get table of the Clifford group, which is built once on the first call
+
+    Args:
+        num_qubit (int): number of qubits, 1 or 2
+
+    Returns:
+        CliffordTable: table of 24 elements for 1 qubit, or 11520 elements for 2 qubits
+    """
+    if num_qubit < 1 or num_qubit > _max_num_qubit_clifford_table:
+        raise ValueError(f"Clifford table is available for 1 to {_max_num_qubit_clifford_table} qubits")
+    tableau_list = list(stim.Tableau.iter_all(num_qubit))
+    index_dict = {str(tableau): index for index, tableau in enumerate(tableau_list)}
+    # qubit 0 is the most significant as in QuantumCircuit.to_matrix
+    matrix = np.array([tableau.to_unitary_matrix(endian="big") for tableau in tableau_list])
+    matrix = _round_clifford_matrix(matrix, num_qubit)
+    inverse = np.array([index_dict[str(tableau.inverse())] for tableau in tableau_list])
+    multiplication = None
+    if len(tableau_list) <= _max_size_multiplication_table:
+        multiplication = np.array(
+            [[index_dict[str(after * before)] for before in tableau_list] for after in tableau_list]
+        )
+    for array in [matrix, inverse] + ([multiplication] if multiplication is not None else []):
+        array.flags.writeable = False
+    return CliffordTable(
+        num_qubit=num_qubit,
+        tableau_list=tableau_list,
+        matrix=matrix,
+        identity=index_dict[str(stim.Tableau(num_qubit))],
+        inverse=inverse,
+        multiplication=multiplication,
+        _index_dict=index_dict,
+    )
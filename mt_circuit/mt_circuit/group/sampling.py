@@ -3,6 +3,7 @@ import numpy as np
 from scipy.stats import unitary_group
 import stim
 from mt_circuit.gate import I, X, Y, Z
+from mt_circuit.group.clifford_table import _max_num_qubit_clifford_table, _round_clifford_matrix, get_clifford_table
 
 
 def sample_pauli(num_qubit: int, seed: Optional[int] = None):
@@ -17,36 +18,46 @@ def sample_pauli(num_qubit: int, seed: Optional[int] = None):
     return matrix
 
 
-def _get_nearest_value(val_list, val):
-    if np.abs(val) < np.min(val_list) / 2:
-        return 0.0
-    dif_list = np.abs(val_list - np.abs(val))
-    idx = np.argmin(dif_list)
-    sign = 1 if val > 0 else -1
-    new_val = val_list[idx] * sign
-    return new_val
-
-
 def sample_clifford(num_qubit: int, seed: Optional[int] = None):
     if num_qubit < 1:
         raise ValueError("num qubit must be no less than 1")
     if seed is not None:
-        raise ValueError("Current impl does not support seeded sampling")
+        return sample_clifford_batch(num_qubit, 1, seed)[0]
     tableau = stim.Tableau.random(num_qubit)
-    matrix = tableau.to_unitary_matrix(endian="little")
-
-    # convert complex64 values to complex128 of Clifford elements
-    val_list = np.array([1 / np.sqrt(2) ** i for i in range(num_qubit * 4)])
-    matrix_prec = np.zeros(matrix.shape, dtype=complex)
-    for y in range(matrix.shape[0]):
-        for x in range(matrix.shape[1]):
-            val = matrix[y, x]
-            val_r = _get_nearest_value(val_list, np.real(val))
-            val_i = _get_nearest_value(val_list, np.imag(val))
-            matrix_prec[y, x] = val_r + 1.0j * val_i
-            assert np.abs(matrix_prec[y, x] - matrix[y, x]) < 1e-7
-
-    return matrix_prec
+    matrix = tableau.to_unitary_matrix(endian="big")
+    return _round_clifford_matrix(matrix, num_qubit)
+
+
+def sample_clifford_batch(num_qubit: int, count: int, seed: Optional[int] = None) -> np.ndarray:
+    """Sample Clifford unitaries uniformly
+
+    Elements are drawn from the table of all Clifford elements for up to 2 qubits,
+    and from stim.Tableau.random otherwise, which does not support seeded sampling.
+    Qubit 0 is the most significant in both cases as in QuantumCircuit.to_matrix.
+
+    Args:
+        num_qubit (int): number of qubits
+        count (int): number of samples
+        seed (Optional[int]): seed of random state
+
+    Returns:
+        np.ndarray: (count, 2**num_qubit, 2**num_qubit) complex128 array of unitaries
+    """
+    if num_qubit < 1:
+        raise ValueError("num qubit must be no less than 1")
+    if count < 0:
+        raise ValueError("count must be no less than 0")
+    if num_qubit <= _max_num_qubit_clifford_table:
+        table = get_clifford_table(num_qubit)
+        random_state = np.random.RandomState(seed)
+        return table.matrix[random_state.randint(len(table), size=count)]
+    if seed is not None:
+        raise ValueError(f"seeded sampling is supported up to {_max_num_qubit_clifford_table} qubits")
+    dim = 2**num_qubit
+    matrix = np.zeros((count, dim, dim), dtype=np.complex64)
+    for index in range(count):
+        matrix[index] = stim.Tableau.random(num_qubit).to_unitary_matrix(endian="big")
+    return _round_clifford_matrix(matrix, num_qubit)
 
 
 def sample_unitary(num_qubit: int, seed: Optional[int] = None):
@@ -0,0 +1,95 @@
+"""Benchmark of convert_to_HPI_CHPI against the pipeline of separate passes
+
+Run from the mt_circuit directory
+
+    python -m tests.benchmark_convert --num-qubit 100 --depth 20
+"""
+
+from __future__ import annotations
+from typing import Any
+import argparse
+import time
+import numpy as np
+from mt_circuit.circuit import QuantumCircuit
+from mt_circuit.convert.convert import convert_to_HPI_CHPI, remove_u4, bundle_1q, remove_u2, push_rz
+from mt_circuit.group import get_clifford_table
+
+
+def create_random_circuit(num_qubit: int, depth: int, seed: int = 0) -> QuantumCircuit:
+    """Create circuit with layers of 1Q Cliffords and RZ on all qubits and 2Q Cliffords on alternating pairs
+
+    Args:
+        num_qubit (int): number of qubits on a line
+        depth (int): number of layers
+        seed (int): seed of random state
+
+    Returns:
+        QuantumCircuit: circuit of u2, RZ, u4, and MZ gates
+    """
+    random_state = np.random.RandomState(seed)
+    table_1q = get_clifford_table(1)
+    table_2q = get_clifford_table(2)
+    qc = QuantumCircuit(num_qubit)
+    for layer in range(depth):
+        for idx in range(num_qubit):
+            qc.add_gate(name="u2", targets=[idx], matrix=table_1q.matrix[random_state.randint(len(table_1q))])
+            qc.add_gate(name="RZ", targets=[idx], angle=random_state.uniform(-np.pi, np.pi))
+        for idx in range(layer % 2, num_qubit - 1, 2):
+            qc.add_gate(name="u4", targets=[idx, idx + 1], matrix=table_2q.matrix[random_state.randint(len(table_2q))])
+    for idx in range(num_qubit):
+        qc.add_gate(name="MZ", targets=[idx])
+    return qc
+
+
+def _convert_by_pipeline(circuit: QuantumCircuit) -> QuantumCircuit:
+    return push_rz(remove_u2(bundle_1q(remove_u4(circuit))))
+
+
+def run_benchmark(num_qubit: int, depth: int, repeat: int = 3, seed: int = 0) -> dict[str, Any]:
+    """Measure conversion time of the fused pass and the pipeline on a random circuit
+
+    Args:
+        num_qubit (int): number of qubits
+        depth (int): number of layers
+        repeat (int): number of timed conversions, where the best is reported
+        seed (int): seed of random state
+
+    Returns:
+        dict[str, Any]: times in seconds, and whether the two results are identical
+    """
+    circuit = create_random_circuit(num_qubit, depth, seed)
+    # KAK decompositions of the Clifford elements are cached before timing
+    fused_circuit = convert_to_HPI_CHPI(circuit)
+    pipeline_circuit = _convert_by_pipeline(circuit)
+
+    result: dict[str, Any] = {"num_qubit": num_qubit, "depth": depth, "num_gate": len(circuit.gate_list)}
+    for name, function in [("fused_time", convert_to_HPI_CHPI), ("pipeline_time", _convert_by_pipeline)]:
+        time_list = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(circuit)
+            time_list.append(time.perf_counter() - start)
+        result[name] = min(time_list)
+    result["speedup"] = result["pipeline_time"] / result["fused_time"]
+    result["identical"] = fused_circuit.gate_list == pipeline_circuit.gate_list
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-qubit", type=int, nargs="+", default=[100])
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for num_qubit in args.num_qubit:
+        result = run_benchmark(num_qubit, args.depth, args.repeat)
+        print(
+            f"{result['num_qubit']:4d} qubits: {result['num_gate']} gates, "
+            f"fused {result['fused_time']:.3f}s, pipeline {result['pipeline_time']:.3f}s, "
+            f"speedup x{result['speedup']:.2f}, identical {result['identical']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+from tests.benchmark_convert import create_random_circuit, run_benchmark
+
+
+def test_benchmark_convert():
+    circuit = create_random_circuit(4, 3)
+    assert len(circuit.gate_list) == 4 * 3 * 2 + (2 + 1 + 2) + 4
+    result = run_benchmark(4, 3, repeat=1)
+    assert result["identical"]
+    assert result["fused_time"] > 0 and result["pipeline_time"] > 0
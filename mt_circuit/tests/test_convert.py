@@ -1,10 +1,14 @@
+import numpy as np
+import pytest
 from scipy.stats import unitary_group
 from mt_circuit.circuit import QuantumCircuit
 from mt_circuit.util import check_unitary_equal_up_to_phase
 from mt_circuit.convert.convert import (
+    convert_to_HPI_CHPI,
     remove_u4,
     bundle_1q,
     remove_u2,
+    remove_u2_batch,
     push_rz,
 )
 
@@ -151,3 +155,50 @@ def test_convert_random():
     qc = push_rz(qc)
     u4 = qc.to_matrix()
     assert check_unitary_equal_up_to_phase(u0, u4)
+
+
+def test_remove_u2_batch():
+    circuit_list = []
+    for num_qubit in [1, 2, 3]:
+        qc = QuantumCircuit(num_qubit)
+        for idx in range(num_qubit):
+            qc.add_gate(name="u2", targets=[idx], matrix=unitary_group.rvs(2))
+        if num_qubit > 1:
+            qc.add_gate(name="CHPI", targets=[0, 1], angle=0)
+        qc.add_gate(name="u2", targets=[0], matrix=unitary_group.rvs(2))
+        circuit_list.append(qc)
+    batch_circuit_list = remove_u2_batch(circuit_list)
+    for qc, batch_qc in zip(circuit_list, batch_circuit_list):
+        assert batch_qc.gate_list == remove_u2(qc).gate_list
+        assert check_unitary_equal_up_to_phase(qc.to_matrix(), batch_qc.to_matrix())
+
+
+def test_convert_fused():
+    qc = QuantumCircuit(3)
+    qc.add_gate(name="RZ", targets=[0], angle=0.3)
+    qc.add_gate(name="HPI", targets=[1], angle=0)
+    qc.add_gate(name="u4", targets=[2, 0], matrix=unitary_group.rvs(4))
+    qc.add_gate(name="RX", targets=[1], angle=0.5)
+    qc.add_gate(name="RZ", targets=[1], angle=-0.7)
+    qc.add_gate(name="RY", targets=[2], angle=1.1)
+    qc.add_gate(name="SYNC", targets=[0, 1, 2])
+    qc.add_gate(name="CHPI", targets=[1, 2], angle=0)
+    qc.add_gate(name="u2", targets=[0], matrix=unitary_group.rvs(2))
+    qc.add_gate(name="u4", targets=[0, 1], matrix=unitary_group.rvs(4))
+    u0 = qc.to_matrix()
+
+    fused_qc = convert_to_HPI_CHPI(qc)
+    pipeline_qc = push_rz(remove_u2(bundle_1q(remove_u4(qc))))
+    assert fused_qc.gate_list == pipeline_qc.gate_list
+    for fused_gate, pipeline_gate in zip(fused_qc.gate_list, pipeline_qc.gate_list):
+        assert type(fused_gate["angle"]) is type(pipeline_gate["angle"])
+    assert check_unitary_equal_up_to_phase(u0, fused_qc.to_matrix())
+
+    qc.add_gate(name="MZ", targets=[0])
+    assert convert_to_HPI_CHPI(qc).gate_list == push_rz(remove_u2(bundle_1q(remove_u4(qc)))).gate_list
+
+    qc = QuantumCircuit(1)
+    qc.add_gate(name="BARRIER", targets=[0])
+    with pytest.raises(ValueError):
+        convert_to_HPI_CHPI(qc)
+    assert np.isclose(convert_to_HPI_CHPI(QuantumCircuit(1)).gate_list[0]["angle"], 0)
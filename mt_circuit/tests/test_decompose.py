@@ -1,5 +1,6 @@
 from scipy.stats import unitary_group
 from mt_circuit.decompose import (
+    u2_to_zxzxz_angles,
     u2_matrix_to_HPI_RZ_form,
     u4_matrix_to_CHPI_u2_form,
 )
@@ -15,6 +16,18 @@ def test_decompose_HPI_form():
         assert check_unitary_equal_up_to_phase(u, u_test)
 
 
+def test_decompose_HPI_form_batch():
+    import numpy as np
+
+    u_list = np.array([unitary_group.rvs(2) for _ in range(100)])
+    angle_list = u2_to_zxzxz_angles(u_list)
+    assert angle_list.shape == (100, 3)
+    for u, angle in zip(u_list, angle_list):
+        qc = u2_matrix_to_HPI_RZ_form(u)
+        assert [gate["angle"] for gate in qc.gate_list if gate["name"] == "RZ"] == angle.tolist()
+    assert u2_to_zxzxz_angles(np.zeros((0, 2, 2))).shape == (0, 3)
+
+
 def test_decompose_CHPI_form():
     count = 100
     for _ in range(count):
@@ -22,3 +35,31 @@ def test_decompose_CHPI_form():
         qc = u4_matrix_to_CHPI_u2_form(u)
         u_test = qc.to_matrix()
         assert check_unitary_equal_up_to_phase(u, u_test)
+
+
+def test_kak_cache(tmp_path):
+    import cirq
+    import numpy as np
+    from mt_circuit.decompose import KAKCache, get_kak_cache, set_kak_cache
+
+    default_cache = get_kak_cache()
+    path = str(tmp_path / "kak_cache.npz")
+    try:
+        cache = KAKCache(max_size=2, path=path)
+        set_kak_cache(cache)
+        cnot = cirq.unitary(cirq.CNOT)
+        for u in [cnot, cnot * np.exp(0.3j), unitary_group.rvs(4), unitary_group.rvs(4), cnot]:
+            qc = u4_matrix_to_CHPI_u2_form(u)
+            assert check_unitary_equal_up_to_phase(u, qc.to_matrix())
+        # CNOT with global phase hits, and CNOT is evicted by the two random unitaries
+        statistics = cache.get_statistics()
+        assert statistics["hit_count"] == 1 and statistics["miss_count"] == 4
+        assert statistics["num_entry"] == 2
+
+        cache.save()
+        loaded_cache = KAKCache(max_size=2, path=path)
+        set_kak_cache(loaded_cache)
+        u4_matrix_to_CHPI_u2_form(cnot)
+        assert loaded_cache.get_statistics()["hit_count"] == 1
+    finally:
+        set_kak_cache(default_cache)
@@ -1,6 +1,14 @@
 import itertools
 import numpy as np
-from mt_circuit.group import sample_pauli, sample_clifford, sample_unitary, enumerate_pauli
+import pytest
+from mt_circuit.group import (
+    sample_pauli,
+    sample_clifford,
+    sample_clifford_batch,
+    sample_unitary,
+    enumerate_pauli,
+    get_clifford_table,
+)
 
 
 def test_pauli_enumerate():
@@ -76,3 +84,56 @@ def test_clifford_sampling():
                     found = found or np.allclose(mapped_pauli @ check, np.eye(2**num_qubit), atol=1e-5)
                     found = found or np.allclose(-mapped_pauli @ check, np.eye(2**num_qubit), atol=1e-5)
                 assert found
+
+
+def test_clifford_batch_sampling():
+    count = 200
+    for num_qubit in [1, 2, 3]:
+        m = sample_clifford_batch(num_qubit, count)
+        assert m.shape == (count, 2**num_qubit, 2**num_qubit) and m.dtype == np.complex128
+        is_unitary = np.allclose(m @ m.transpose(0, 2, 1).conj(), np.eye(2**num_qubit), atol=1e-10)
+        assert is_unitary
+
+    for num_qubit in [1, 2]:
+        m1 = sample_clifford_batch(num_qubit, count, seed=1)
+        m2 = sample_clifford_batch(num_qubit, count, seed=1)
+        assert np.array_equal(m1, m2)
+        assert np.array_equal(sample_clifford(num_qubit, seed=1), m1[0])
+    # all 24 elements of 1-qubit Clifford group are distinct matrices
+    m = sample_clifford_batch(1, 1000, seed=0)
+    assert len(np.unique(m.reshape(1000, -1), axis=0)) == 24
+
+    with pytest.raises(ValueError):
+        sample_clifford_batch(3, count, seed=0)
+
+
+def test_clifford_table():
+    from mt_circuit.circuit import QuantumCircuit
+    from mt_circuit.util import check_unitary_equal_up_to_phase
+
+    for num_qubit, size in [(1, 24), (2, 11520)]:
+        table = get_clifford_table(num_qubit)
+        assert len(table) == size
+        assert np.allclose(table.matrix[table.identity], np.eye(2**num_qubit))
+        random_state = np.random.RandomState(0)
+        for _ in range(20):
+            i1, i2 = random_state.randint(size, size=2)
+            product = table.matrix[i2] @ table.matrix[i1]
+            assert check_unitary_equal_up_to_phase(table.matrix[table.multiply(i2, i1)], product)
+            assert check_unitary_equal_up_to_phase(
+                table.matrix[table.inverse[i1]] @ table.matrix[i1], np.eye(2**num_qubit)
+            )
+            circuit = QuantumCircuit(num_qubit, table.get_gate_list(i1))
+            assert {gate["name"] for gate in circuit.gate_list} <= {"HPI", "CHPI", "RZ"}
+            assert check_unitary_equal_up_to_phase(circuit.to_matrix(), table.matrix[i1])
+
+        # randomized benchmarking sequence composes to identity
+        index_list = table.sample_rb_sequence(30, seed=0)
+        assert len(index_list) == 31 and table.compose(index_list) == table.identity
+        circuit = QuantumCircuit(num_qubit)
+        for index in index_list:
+            circuit.gate_list.extend(table.get_gate_list(index))
+        assert check_unitary_equal_up_to_phase(circuit.to_matrix(), np.eye(2**num_qubit))
+
+    with pytest.raises(ValueError):
+        get_clifford_table(3)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Any
+import hashlib
+import json
+import struct
+import zlib
+import numpy as np
+
+# header is magic, format version and payload kind, followed by zlib-compressed json payload
+_MAGIC_ = b"MTPB"
+_FORMAT_VERSION_ = 1
+_KIND_PULSE_LIBRARY_ = 1
+_KIND_SEQUENCE_ = 2
+_KIND_COMPILED_PULSE_LIBRARY_ = 3
+_KIND_RUNTIME_PULSE_LIBRARY_ = 4
+_header_struct = struct.Struct("<4sHB")
+
+
+def _encode_payload(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _pack_payload(kind: int, payload_bytes: bytes) -> bytes:
+    return _header_struct.pack(_MAGIC_, _FORMAT_VERSION_, kind) + zlib.compress(payload_bytes)
+
+
+def _unpack_payload(data: bytes, kind: int) -> tuple[dict[str, Any], bytes]:
+    if len(data) < _header_struct.size:
+        raise ValueError("data is too short to be mt_pulse binary")
+    magic, version, data_kind = _header_struct.unpack_from(data)
+    if magic != _MAGIC_:
+        raise ValueError("data is not mt_pulse binary")
+    if version != _FORMAT_VERSION_:
+        raise ValueError(f"binary format version {version} is not supported, expected {_FORMAT_VERSION_}")
+    if data_kind != kind:
+        raise ValueError(f"binary payload kind {data_kind} does not match expected kind {kind}")
+    payload_bytes = zlib.decompress(data[_header_struct.size :])
+    return json.loads(payload_bytes), payload_bytes
+
+
+def _get_content_hash(payload_bytes: bytes) -> str:
+    return hashlib.sha256(payload_bytes).hexdigest()
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"value of type {type(value).__name__} cannot be hashed")
+
+
+def _get_digest(data: Any, previous_digest: bytes = b"") -> bytes:
+    # sha256 of canonical json of data chained to the previous digest
+    data_bytes = json.dumps(data, sort_keys=True, separators=(",", ":"), default=_to_json_value).encode("utf-8")
+    return hashlib.sha256(previous_digest + data_bytes).digest()
@@ -0,0 +1,256 @@
+from __future__ import annotations
+from typing import Union, Any, Callable, Optional
+from dataclasses import dataclass, field
+import functools
+import numpy as np
+from mt_pulse.compiled_shape import CompiledShape
+from mt_pulse.segment_waveform import SegmentWaveform
+from mt_pulse.waveform_format import _INT16_IQ_, _get_output_waveform_dict, _convert_to_int16_iq
+
+# fractional sample positions are quantized by this resolution to share rendered pulses
+_sample_phase_tolerance = 1e-6
+# fractional delay interpolates each sample from this number of samples on each side
+_fractional_delay_half_tap = 16
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_fractional_delay_tap(sample_phase: float) -> np.ndarray:
+    # Lanczos-windowed sinc taps for offsets -half_tap + 1, ..., half_tap, normalized to unit DC gain
+    offset = np.arange(-_fractional_delay_half_tap + 1, _fractional_delay_half_tap + 1)
+    if sample_phase == 0.0:
+        tap = (offset == 0).astype(float)
+    else:
+        # sin(pi * (offset - sample_phase)) alternates in sign with the common magnitude sin(pi * sample_phase)
+        position = np.pi * (offset - sample_phase)
+        sign = 1 - 2 * ((offset + 1) % 2)
+        tap = sign * np.sin(np.pi * sample_phase) * np.sin(position / _fractional_delay_half_tap) / position**2
+        tap /= np.sum(tap)
+    tap.flags.writeable = False
+    return tap
+
+
+def _validate_time_slots(time_slots: np.ndarray) -> None:
+    if time_slots.ndim != 1:
+        raise ValueError(f"time_slots must be 1D array, but {time_slots.ndim}-dim array is provided")
+    if np.any(time_slots[1:] < time_slots[:-1]):
+        raise ValueError("time_slots must be sorted in ascending order")
+
+
+def _get_sample_interval(time_slots: np.ndarray) -> Optional[float]:
+    # return sample interval if time_slots is uniform grid, otherwise None
+    if len(time_slots) < 2:
+        return None
+    sample_interval = float(time_slots[1] - time_slots[0])
+    if sample_interval <= 0:
+        return None
+    grid = time_slots[0] + np.arange(len(time_slots)) * sample_interval
+    if np.max(np.abs(time_slots - grid)) > _sample_phase_tolerance * sample_interval:
+        return None
+    return sample_interval
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedPulse:
+    start_index: int
+    waveform_dict: dict[str, np.ndarray]
+    duration: float
+
+    @property
+    def nbytes(self) -> int:
+        return sum([waveform.nbytes for waveform in self.waveform_dict.values()])
+
+    def add_to(self, waveform_dict: dict[str, np.ndarray], offset: int) -> None:
+        for channel_name, waveform in self.waveform_dict.items():
+            buffer = waveform_dict[channel_name]
+            index_start = offset + self.start_index
+            index_end = index_start + len(waveform)
+            clip_start = max(index_start, 0)
+            clip_end = min(index_end, len(buffer))
+            if clip_start < clip_end:
+                buffer[clip_start:clip_end] += waveform[clip_start - index_start : clip_end - index_start]
+
+    def add_to_segment(self, segment_waveform_dict: dict[str, SegmentWaveform], offset: int) -> None:
+        for channel_name, waveform in self.waveform_dict.items():
+            segment_waveform_dict[channel_name].add(offset + self.start_index, waveform)
+
+    def shift(self, sample_phase: float) -> RenderedPulse:
+        # pulse rendered on grid index * sample_interval is resampled on grid (index - sample_phase) * sample_interval
+        # by band-limited interpolation, where one more sample covers the range rendered at any phase in [0, 1)
+        tap = _get_fractional_delay_tap(sample_phase)
+        num_sample = self.num_sample + 1
+        tap_offset = _fractional_delay_half_tap - 1
+        waveform_dict = {}
+        for channel_name, waveform in self.waveform_dict.items():
+            waveform_dict[channel_name] = np.convolve(waveform, tap)[tap_offset : tap_offset + num_sample]
+        return RenderedPulse(self.start_index, waveform_dict, self.duration)
+
+    @property
+    def num_sample(self) -> int:
+        return max([len(waveform) for waveform in self.waveform_dict.values()], default=0)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPulse:
+    name: str
+    channel_list: list[str]
+    variable_name_list: list[str]
+    _parameter_function: Callable[..., list[Any]]
+    _shape_list: list[tuple[str, CompiledShape, slice]] = field(default_factory=list)
+    # index of the shape whose envelope is reused for each shape, or None if the shape is evaluated by itself
+    _envelope_source_list: list[Optional[int]] = field(default_factory=list)
+    # number of evaluations removed by common subexpression elimination of parameters and shared envelopes
+    saved_evaluation: dict[str, int] = field(default_factory=dict)
+
+    def get_variable_value_tuple(self, config: dict[str, float]) -> tuple[Any, ...]:
+        undefined_variables = [name for name in self.variable_name_list if name not in config]
+        if len(undefined_variables) > 0:
+            raise ValueError(f"undefined key {set(undefined_variables)} in {self.name}")
+        return tuple([config[name] for name in self.variable_name_list])
+
+    def _evaluate_shape_param(self, config: dict[str, float]) -> list[Any]:
+        return self._parameter_function(*self.get_variable_value_tuple(config))
+
+    def add_waveform(
+        self,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        waveform_dict: dict[str, np.ndarray],
+    ) -> float:
+        # time_slots must be sorted, and shapes are evaluated only in the slice of their support
+        cursor_dict: dict[str, float] = {}
+        for channel_name in self.channel_list:
+            cursor_dict[channel_name] = current_time
+
+        shape_param_list = self._evaluate_shape_param(config)
+        envelope_dict: dict[int, tuple[int, int, np.ndarray]] = {}
+        for shape_index, (channel_name, shape, param_index) in enumerate(self._shape_list):
+            shape_param = shape_param_list[param_index]
+            cursor = cursor_dict[channel_name]
+            source_index = self._envelope_source_list[shape_index] if len(self._envelope_source_list) > 0 else None
+            if not shape.is_zero and source_index is not None:
+                if source_index not in envelope_dict:
+                    envelope_param = shape.get_envelope_parameter(shape_param)
+                    support_start, support_end = shape.support_function(*envelope_param)
+                    index_start = np.searchsorted(time_slots, cursor + support_start, side="left")
+                    index_end = np.searchsorted(time_slots, cursor + support_end, side="right")
+                    envelope = shape.time_function(time_slots[index_start:index_end] - cursor, *envelope_param)
+                    envelope_dict[source_index] = (index_start, index_end, envelope)
+                index_start, index_end, envelope = envelope_dict[source_index]
+                if index_start < index_end:
+                    waveform_dict[channel_name][index_start:index_end] += shape.get_coefficient(shape_param) * envelope
+            elif not shape.is_zero:
+                support_start, support_end = shape.support_function(*shape_param)
+                index_start = np.searchsorted(time_slots, cursor + support_start, side="left")
+                index_end = np.searchsorted(time_slots, cursor + support_end, side="right")
+                if index_start < index_end:
+                    time_slots_support = time_slots[index_start:index_end]
+                    waveform_dict[channel_name][index_start:index_end] += shape.time_function(
+                        time_slots_support - cursor, *shape_param
+                    )
+            cursor_dict[channel_name] = cursor + float(shape.progress_function(*shape_param))
+        duration = max(cursor_dict.values()) - current_time
+        return duration
+
+    def add_waveform_batch(
+        self,
+        time_slots: np.ndarray,
+        current_time: Union[float, np.ndarray],
+        config: dict[str, Union[float, np.ndarray]],
+        waveform_dict: dict[str, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        # current_time and config values are scalars or (N, 1) arrays, and waveforms are (N, len(time_slots)) arrays
+        cursor_dict: dict[str, Union[float, np.ndarray]] = {}
+        for channel_name in self.channel_list:
+            cursor_dict[channel_name] = current_time
+
+        shape_param_list = self._evaluate_shape_param(config)
+        for channel_name, shape, param_index in self._shape_list:
+            shape_param = shape_param_list[param_index]
+            cursor = cursor_dict[channel_name]
+            if not shape.is_zero:
+                support_start, support_end = shape.support_function(*shape_param)
+                window_start = cursor + support_start
+                window_end = cursor + support_end
+                index_start = np.searchsorted(time_slots, np.min(window_start), side="left")
+                index_end = np.searchsorted(time_slots, np.max(window_end), side="right")
+                if index_start < index_end:
+                    time_slots_support = time_slots[index_start:index_end]
+                    waveform = shape.time_function(time_slots_support - cursor, *shape_param)
+                    if np.ndim(window_start) > 0 or np.ndim(window_end) > 0:
+                        # supports differ among batch, so clip each row by its own support
+                        is_support = (window_start <= time_slots_support) & (time_slots_support <= window_end)
+                        waveform = np.where(is_support, waveform, 0.0)
+                    waveform_dict[channel_name][:, index_start:index_end] += waveform
+            cursor_dict[channel_name] = cursor + shape.progress_function(*shape_param)
+        duration = functools.reduce(np.maximum, cursor_dict.values()) - current_time
+        return duration
+
+    def get_waveform(
+        self,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        dtype: str = "complex128",
+        out: Optional[dict[str, np.ndarray]] = None,
+        full_scale: float = 1.0,
+    ) -> tuple[dict[str, np.ndarray], float]:
+        _validate_time_slots(time_slots)
+        waveform_dict = _get_output_waveform_dict(self.channel_list, len(time_slots), dtype, out)
+        if dtype != _INT16_IQ_:
+            duration = self.add_waveform(time_slots, current_time, config, waveform_dict)
+            return waveform_dict, duration
+
+        render_dict = {}
+        for channel_name in self.channel_list:
+            render_dict[channel_name] = np.zeros_like(time_slots, dtype=complex)
+        duration = self.add_waveform(time_slots, current_time, config, render_dict)
+        for channel_name in self.channel_list:
+            _convert_to_int16_iq(render_dict[channel_name], full_scale, waveform_dict[channel_name])
+        return waveform_dict, duration
+
+    def get_support(self, config: dict[str, float]) -> tuple[float, float]:
+        # union of the supports of non-zero shapes relative to the pulse start, (inf, -inf) if empty
+        cursor_dict: dict[str, float] = {}
+        for channel_name in self.channel_list:
+            cursor_dict[channel_name] = 0.0
+        pulse_support_start = np.inf
+        pulse_support_end = -np.inf
+        shape_param_list = self._evaluate_shape_param(config)
+        for channel_name, shape, param_index in self._shape_list:
+            shape_param = shape_param_list[param_index]
+            cursor = cursor_dict[channel_name]
+            if not shape.is_zero:
+                support_start, support_end = shape.support_function(*shape_param)
+                pulse_support_start = min(pulse_support_start, cursor + support_start)
+                pulse_support_end = max(pulse_support_end, cursor + support_end)
+            cursor_dict[channel_name] = cursor + float(shape.progress_function(*shape_param))
+        return pulse_support_start, pulse_support_end
+
+    def render(self, sample_interval: float, sample_phase: float, config: dict[str, float]) -> RenderedPulse:
+        # render on grid (index - sample_phase) * sample_interval relative to the pulse start
+        support_start, support_end = self.get_support(config)
+        if support_start > support_end:
+            start_index = end_index = 0
+        elif np.isfinite(support_start) and np.isfinite(support_end):
+            # one extra sample on both sides, which are clipped by the support in add_waveform
+            start_index = int(np.floor(support_start / sample_interval + sample_phase)) - 1
+            end_index = int(np.ceil(support_end / sample_interval + sample_phase)) + 2
+        else:
+            raise ValueError(f"pulse {self.name} has unbounded support and cannot be rendered on finite grid")
+        time_slots = (np.arange(start_index, end_index) - sample_phase) * sample_interval
+        waveform_dict = {}
+        for channel_name in self.channel_list:
+            waveform_dict[channel_name] = np.zeros_like(time_slots, dtype=complex)
+        duration = self.add_waveform(time_slots, 0.0, config, waveform_dict)
+        return RenderedPulse(start_index, waveform_dict, duration)
+
+    def get_duration(self, config: dict[str, float]) -> float:
+        cursor_dict: dict[str, float] = {}
+        for channel_name in self.channel_list:
+            cursor_dict[channel_name] = 0.0
+        shape_param_list = self._evaluate_shape_param(config)
+        for channel_name, shape, param_index in self._shape_list:
+            cursor_dict[channel_name] += float(shape.progress_function(*shape_param_list[param_index]))
+        duration = max(cursor_dict.values())
+        return duration
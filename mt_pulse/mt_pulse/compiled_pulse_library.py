@@ -0,0 +1,277 @@
+from __future__ import annotations
+from typing import Any, Optional, Union
+from dataclasses import dataclass, field
+import numpy as np
+from mt_pulse.compiled_pulse import CompiledPulse, RenderedPulse, _sample_phase_tolerance
+from mt_pulse.segment_waveform import SegmentWaveform
+from mt_pulse.binary_format import (
+    _KIND_PULSE_LIBRARY_,
+    _KIND_RUNTIME_PULSE_LIBRARY_,
+    _encode_payload,
+    _get_content_hash,
+    _pack_payload,
+    _unpack_payload,
+)
+from mt_pulse.kernel_cache import KernelCache, _compiled_pulse_dict_to_json_dict, _compiled_pulse_dict_from_json_dict
+from mt_pulse.render_cache import RenderCache
+
+# sample phases at which fractional delay is compared with direct evaluation, where the error of the Lanczos
+# interpolation is largest around the half sample and vanishes toward integer delays
+_shift_probe_phase_list = [0.25, 0.5, 0.75]
+
+
+class _PulseRenderer:
+    # rendering of compiled pulses shared by authoring and runtime pulse libraries,
+    # which provide get_compiled_pulse and render_cache
+    __slots__ = ()
+
+    def get_waveform(
+        self,
+        pulse_name: str,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        dtype: str = "complex128",
+        out: Optional[dict[str, np.ndarray]] = None,
+        full_scale: float = 1.0,
+    ) -> tuple[dict[str, np.ndarray], float]:
+        compiled_pulse = self.get_compiled_pulse(pulse_name)
+        return compiled_pulse.get_waveform(time_slots, current_time, config, dtype, out, full_scale)
+
+    def get_rendered_pulse(
+        self,
+        pulse_name: str,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        sample_interval: float,
+    ) -> Optional[tuple[RenderedPulse, int]]:
+        # rendered pulse and its sample offset in time_slots, or None if the pulse cannot be pre-rendered
+        compiled_pulse = self.get_compiled_pulse(pulse_name)
+
+        # time_slots is uniform grid, so rendered pulse is reused with integer offset for the same sample phase
+        sample_position = (current_time - time_slots[0]) / sample_interval
+        offset = int(np.floor(sample_position))
+        sample_phase = round((sample_position - offset) / _sample_phase_tolerance) * _sample_phase_tolerance
+        if sample_phase >= 1.0:
+            offset += 1
+            sample_phase = 0.0
+        key = (pulse_name, sample_interval, sample_phase, compiled_pulse.get_variable_value_tuple(config))
+        try:
+            rendered_pulse = self.render_cache.get(key)
+        except TypeError:
+            # config contains unhashable values
+            return None
+        if rendered_pulse is None:
+            support_start, support_end = compiled_pulse.get_support(config)
+            is_empty = support_start > support_end
+            if not is_empty and not (np.isfinite(support_start) and np.isfinite(support_end)):
+                # shapes without declared support are evaluated over the whole time slots
+                return None
+            if not is_empty and sample_phase != 0.0 and self.render_cache.fractional_shift_error is not None:
+                rendered_pulse = self._get_shifted_pulse(compiled_pulse, key, config)
+            if rendered_pulse is None:
+                rendered_pulse = compiled_pulse.render(sample_interval, sample_phase, config)
+            self.render_cache.put(key, rendered_pulse)
+        return rendered_pulse, offset
+
+    def _get_shifted_pulse(
+        self, compiled_pulse: CompiledPulse, key: tuple[Any, ...], config: dict[str, float]
+    ) -> Optional[RenderedPulse]:
+        # pulse rendered at sample phase 0 is placed by fractional delay, or None if the delay exceeds the error bound
+        pulse_name, sample_interval, sample_phase, variable_value_tuple = key
+        canonical_key = (pulse_name, sample_interval, 0.0, variable_value_tuple)
+        canonical_pulse = self.render_cache.get(canonical_key)
+        if canonical_pulse is None:
+            canonical_pulse = compiled_pulse.render(sample_interval, 0.0, config)
+            self.render_cache.put(canonical_key, canonical_pulse)
+
+        is_shiftable = self.render_cache.get_shift_verdict(canonical_key)
+        if is_shiftable is None:
+            # delays at several sample phases are compared with direct evaluation once for each canonical pulse,
+            # and probes are rendered outside the cache to keep its statistics
+            error = max(
+                [
+                    self._get_shift_error(compiled_pulse, canonical_pulse, sample_interval, probe_phase, config)
+                    for probe_phase in _shift_probe_phase_list
+                ]
+            )
+            is_shiftable = error <= self.render_cache.fractional_shift_error
+            self.render_cache.set_shift_verdict(canonical_key, is_shiftable)
+        if not is_shiftable:
+            return None
+        self.render_cache.shift_count += 1
+        return canonical_pulse.shift(sample_phase)
+
+    @staticmethod
+    def _get_shift_error(
+        compiled_pulse: CompiledPulse,
+        canonical_pulse: RenderedPulse,
+        sample_interval: float,
+        sample_phase: float,
+        config: dict[str, float],
+    ) -> float:
+        # maximum absolute difference between the delayed canonical pulse and direct evaluation at the sample phase
+        shifted_pulse = canonical_pulse.shift(sample_phase)
+        probe_pulse = compiled_pulse.render(sample_interval, sample_phase, config)
+        probe_waveform_dict = {
+            channel_name: np.zeros_like(shifted_waveform)
+            for channel_name, shifted_waveform in shifted_pulse.waveform_dict.items()
+        }
+        probe_pulse.add_to(probe_waveform_dict, -shifted_pulse.start_index)
+        return max(
+            [
+                float(np.max(np.abs(shifted_pulse.waveform_dict[channel_name] - probe_waveform)))
+                for channel_name, probe_waveform in probe_waveform_dict.items()
+            ]
+        )
+
+    def add_waveform(
+        self,
+        pulse_name: str,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        waveform_dict: dict[str, np.ndarray],
+        sample_interval: Optional[float] = None,
+    ) -> float:
+        compiled_pulse = self.get_compiled_pulse(pulse_name)
+        if sample_interval is None:
+            return compiled_pulse.add_waveform(time_slots, current_time, config, waveform_dict)
+        rendered = self.get_rendered_pulse(pulse_name, time_slots, current_time, config, sample_interval)
+        if rendered is None:
+            return compiled_pulse.add_waveform(time_slots, current_time, config, waveform_dict)
+        rendered_pulse, offset = rendered
+        rendered_pulse.add_to(waveform_dict, offset)
+        return rendered_pulse.duration
+
+    def add_segment_waveform(
+        self,
+        pulse_name: str,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        segment_waveform_dict: dict[str, SegmentWaveform],
+        sample_interval: float,
+    ) -> float:
+        rendered = self.get_rendered_pulse(pulse_name, time_slots, current_time, config, sample_interval)
+        if rendered is None:
+            waveform_dict = {channel: np.zeros_like(time_slots, dtype=complex) for channel in segment_waveform_dict}
+            duration = self.get_compiled_pulse(pulse_name).add_waveform(time_slots, current_time, config, waveform_dict)
+            for channel, waveform in waveform_dict.items():
+                segment_waveform_dict[channel].add_segment_waveform(SegmentWaveform.from_dense(waveform))
+            return duration
+        rendered_pulse, offset = rendered
+        rendered_pulse.add_to_segment(segment_waveform_dict, offset)
+        return rendered_pulse.duration
+
+    def add_waveform_batch(
+        self,
+        pulse_name: str,
+        time_slots: np.ndarray,
+        current_time: Union[float, np.ndarray],
+        config: dict[str, Union[float, np.ndarray]],
+        waveform_dict: dict[str, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        compiled_pulse = self.get_compiled_pulse(pulse_name)
+        return compiled_pulse.add_waveform_batch(time_slots, current_time, config, waveform_dict)
+
+    def get_duration(self, pulse_name: str, config: dict[str, float]) -> float:
+        return self.get_compiled_pulse(pulse_name).get_duration(config)
+
+    def get_saved_evaluation(self) -> dict[str, dict[str, int]]:
+        # number of evaluations saved by common subexpression elimination for each pulse
+        return {pulse_name: compiled_pulse.saved_evaluation for pulse_name, compiled_pulse in self.compile().items()}
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPulseLibrary(_PulseRenderer):
+    # runtime pulse library that holds only numeric kernels, and is loaded and rendered without sympy
+    content_hash: str
+    _compiled_pulse_dict: dict[str, CompiledPulse] = field(default_factory=dict)
+    _config_dict: dict[str, dict[str, Any]] = field(default_factory=dict)
+    render_cache: RenderCache = field(default_factory=RenderCache)
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "content_hash": self.content_hash,
+            "config": self._config_dict,
+            "kernel": _compiled_pulse_dict_to_json_dict(self._compiled_pulse_dict),
+        }
+        return _pack_payload(_KIND_RUNTIME_PULSE_LIBRARY_, _encode_payload(payload))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> CompiledPulseLibrary:
+        """Load runtime pulse library serialized by to_bytes
+
+        Kernels are rebuilt from the data as in KernelCache, so data must come from a trusted source.
+
+        Args:
+            data (bytes): serialized runtime pulse library
+
+        Returns:
+            CompiledPulseLibrary: loaded runtime pulse library
+        """
+        payload, _ = _unpack_payload(data, _KIND_RUNTIME_PULSE_LIBRARY_)
+        return CompiledPulseLibrary(
+            content_hash=payload["content_hash"],
+            _compiled_pulse_dict=_compiled_pulse_dict_from_json_dict(payload["kernel"]),
+            _config_dict=payload["config"],
+        )
+
+    @staticmethod
+    def from_pulse_library_bytes(data: bytes, kernel_cache: KernelCache) -> CompiledPulseLibrary:
+        """Load pulse library serialized by PulseLibrary.to_bytes as runtime pulse library
+
+        If the kernel cache has compiled pulses of the library, expressions are not parsed and sympy is not imported.
+        Otherwise the library is loaded and compiled by PulseLibrary.from_bytes, which stores compiled pulses.
+
+        Args:
+            data (bytes): serialized pulse library
+            kernel_cache (KernelCache): cache of compiled pulses keyed by content hash
+
+        Returns:
+            CompiledPulseLibrary: runtime pulse library that has the same content hash as the serialized library
+        """
+        payload, payload_bytes = _unpack_payload(data, _KIND_PULSE_LIBRARY_)
+        content_hash = _get_content_hash(payload_bytes)
+        compiled_pulse_dict = kernel_cache.get(content_hash)
+        if compiled_pulse_dict is None:
+            from mt_pulse.pulse_library import PulseLibrary
+
+            return PulseLibrary.from_bytes(data, kernel_cache=kernel_cache).to_compiled()
+        config_dict = {}
+        for name, _, _, _, variable_default_value in payload["pulse"]:
+            config_dict[name] = dict(variable_default_value)
+        return CompiledPulseLibrary(content_hash, compiled_pulse_dict, config_dict)
+
+    def get_content_hash(self) -> str:
+        return self.content_hash
+
+    def get_revision(self) -> int:
+        # runtime pulse library is not updated after loading
+        return 0
+
+    def get_pulse_name_list(self) -> list[str]:
+        return list(self._compiled_pulse_dict.keys())
+
+    def has_pulse(self, pulse_name: str) -> bool:
+        return pulse_name in self._compiled_pulse_dict
+
+    def get_channel_list(self, name: str) -> list[str]:
+        return self._compiled_pulse_dict[name].channel_list
+
+    def get_config(self, pulse_name: str) -> dict[str, Any]:
+        if pulse_name not in self._config_dict:
+            raise ValueError(f"pulse {pulse_name} not found in pulse library list {list(self._config_dict.keys())}")
+        return dict(self._config_dict[pulse_name])
+
+    def compile(self) -> dict[str, CompiledPulse]:
+        return dict(self._compiled_pulse_dict)
+
+    def get_compiled_pulse(self, pulse_name: str) -> CompiledPulse:
+        if pulse_name not in self._compiled_pulse_dict:
+            raise ValueError(
+                f"pulse {pulse_name} not found in pulse library list {list(self._compiled_pulse_dict.keys())}"
+            )
+        return self._compiled_pulse_dict[pulse_name]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import Any, Callable, Optional
+from dataclasses import dataclass, field
+import functools
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledShape:
+    name: str
+    parameter_name_list: list[str]
+    time_function: Callable[..., np.ndarray]
+    progress_function: Callable[..., float]
+    support_function: Callable[..., tuple[float, float]]
+    is_zero: bool = False
+    # parameters that only multiply the shape as amplitude or as phase factor exp(1j * phase)
+    scale_index_list: list[int] = field(default_factory=list)
+    phase_index_list: list[int] = field(default_factory=list)
+
+    def get_envelope_parameter(self, shape_param: list[Any]) -> list[Any]:
+        envelope_param = list(shape_param)
+        for index in self.scale_index_list:
+            envelope_param[index] = 1.0
+        for index in self.phase_index_list:
+            envelope_param[index] = 0.0
+        return envelope_param
+
+    def get_coefficient(self, shape_param: list[Any]) -> complex:
+        coefficient = 1.0 + 0.0j
+        for index in self.scale_index_list:
+            coefficient *= shape_param[index]
+        for index in self.phase_index_list:
+            coefficient *= np.exp(1.0j * shape_param[index])
+        return coefficient
+
+
+@dataclass(frozen=True, slots=True)
+class ShapeKernel:
+    parameter_name_list: list[str]
+    time_function: Callable[..., np.ndarray]
+    progress_function: Callable[..., float]
+    support_function: Optional[Callable[..., tuple[float, float]]] = None
+
+
+def _broadcast_parameter(function: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+    # lambdified piecewise functions require arguments of the same shape when parameters are arrays
+    @functools.wraps(function)
+    def time_function(t: np.ndarray, *args: Any) -> np.ndarray:
+        if any([np.ndim(arg) > 0 for arg in args]):
+            return function(*np.broadcast_arrays(t, *args))
+        return function(t, *args)
+
+    return time_function
+
+
+def _unbounded_support(*args: Any) -> tuple[float, float]:
+    return -np.inf, np.inf
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import Any
+from dataclasses import dataclass, field
+import importlib
+import sympy as sp
+
+# node kinds
+_SINGLETON_ = 0
+_SYMBOL_ = 1
+_INTEGER_ = 2
+_RATIONAL_ = 3
+_FLOAT_ = 4
+_COMPOUND_ = 5
+
+
+def _get_class_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _import_class(class_name: str) -> type:
+    module_name, qualname = class_name.split(":")
+    if module_name.split(".")[0] != "sympy":
+        raise ValueError(f"{class_name} is not a sympy class")
+    cls = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        cls = getattr(cls, attribute)
+    if not (isinstance(cls, type) and issubclass(cls, sp.Basic)):
+        raise ValueError(f"{class_name} is not a sympy class")
+    return cls
+
+
+@dataclass(slots=True)
+class ExpressionTable:
+    # expressions are stored once as nodes whose arguments refer to preceding nodes
+    node_list: list[list[Any]] = field(default_factory=list)
+    class_name_list: list[str] = field(default_factory=list)
+    _node_index_dict: dict[sp.Basic, int] = field(default_factory=dict)
+    _class_index_dict: dict[str, int] = field(default_factory=dict)
+    _expr_list: list[sp.Basic] = field(default_factory=list)
+
+    def to_json_dict(self) -> dict[str, Any]:
+        return {"node_list": self.node_list, "class_name_list": self.class_name_list}
+
+    @staticmethod
+    def from_json_dict(data: dict[str, Any]) -> ExpressionTable:
+        table = ExpressionTable(node_list=data["node_list"], class_name_list=data["class_name_list"])
+        class_list = [_import_class(class_name) for class_name in table.class_name_list]
+        for node in table.node_list:
+            table._expr_list.append(table._decode_node(node, class_list))
+        return table
+
+    def _get_class_index(self, cls: type) -> int:
+        class_name = _get_class_name(cls)
+        if class_name not in self._class_index_dict:
+            self._class_index_dict[class_name] = len(self.class_name_list)
+            self.class_name_list.append(class_name)
+        return self._class_index_dict[class_name]
+
+    def add(self, expr: sp.Basic) -> int:
+        if expr in self._node_index_dict:
+            return self._node_index_dict[expr]
+
+        if getattr(sp.S, type(expr).__name__, None) is expr:
+            node = [_SINGLETON_, type(expr).__name__]
+        elif isinstance(expr, sp.Symbol):
+            if type(expr) is not sp.Symbol:
+                raise ValueError(f"symbol {expr} of type {type(expr).__name__} cannot be serialized")
+            node = [_SYMBOL_, expr.name, expr.__getnewargs_ex__()[1]]
+        elif isinstance(expr, sp.Integer):
+            node = [_INTEGER_, int(expr.p)]
+        elif isinstance(expr, sp.Rational):
+            node = [_RATIONAL_, int(expr.p), int(expr.q)]
+        elif isinstance(expr, sp.Float):
+            args, kwargs = expr.__getnewargs_ex__()
+            node = [_FLOAT_, list(args[0]), kwargs["precision"]]
+        elif len(expr.args) > 0:
+            if isinstance(type(expr), sp.core.function.UndefinedFunction):
+                raise ValueError(f"undefined function {expr.func} cannot be serialized")
+            arg_index_list = [self.add(arg) for arg in expr.args]
+            node = [_COMPOUND_, self._get_class_index(expr.func), arg_index_list]
+        else:
+            raise ValueError(f"expression {expr} of type {type(expr).__name__} cannot be serialized")
+
+        index = len(self.node_list)
+        self.node_list.append(node)
+        self._node_index_dict[expr] = index
+        self._expr_list.append(expr)
+        return index
+
+    def get(self, index: int) -> sp.Basic:
+        return self._expr_list[index]
+
+    def _decode_node(self, node: list[Any], class_list: list[type]) -> sp.Basic:
+        kind = node[0]
+        if kind == _SINGLETON_:
+            return getattr(sp.S, node[1])
+        if kind == _SYMBOL_:
+            return sp.Symbol(node[1], **node[2])
+        if kind == _INTEGER_:
+            return sp.Integer(node[1])
+        if kind == _RATIONAL_:
+            return sp.Rational(node[1], node[2])
+        if kind == _FLOAT_:
+            return sp.Float(tuple(node[1]), precision=node[2])
+        if kind == _COMPOUND_:
+            func = class_list[node[1]]
+            arg_list = [self._expr_list[index] for index in node[2]]
+            # arguments are already canonical, so evaluation is skipped when the class allows
+            try:
+                return func(*arg_list, evaluate=False)
+            except TypeError:
+                return func(*arg_list)
+        raise ValueError(f"unknown node kind {kind}")
@@ -0,0 +1,237 @@
+from __future__ import annotations
+from typing import Any, Callable, Optional
+from dataclasses import dataclass
+import ast
+import importlib
+import inspect
+import os
+import numpy as np
+from mt_pulse.binary_format import (
+    _KIND_COMPILED_PULSE_LIBRARY_,
+    _encode_payload,
+    _pack_payload,
+    _unpack_payload,
+)
+from mt_pulse.compiled_shape import CompiledShape, _broadcast_parameter
+from mt_pulse.compiled_pulse import CompiledPulse
+
+_LAMBDIFY_FUNCTION_NAME_ = "_lambdifygenerated"
+# modules which lambdified functions may refer to as globals
+_lambdify_module_set = {"numpy", "math", "cmath"}
+# functions are imported only from mt_pulse and modules registered by register_kernel_module
+_kernel_module_set: set[str] = set()
+
+
+def register_kernel_module(module_name: str) -> None:
+    """Allow loading of kernel functions defined in the module from cache files and binary payloads
+
+    Modules of kernels passed to register_shape_kernel and ShapeLibrary.add_kernel are registered automatically.
+
+    Args:
+        module_name (str): name of module that defines kernel functions
+    """
+    _kernel_module_set.add(module_name)
+
+
+def _is_kernel_module(module_name: str) -> bool:
+    return module_name == "mt_pulse" or module_name.startswith("mt_pulse.") or module_name in _kernel_module_set
+
+
+def _validate_lambdify_source(source: str, global_name_set: set[str]) -> None:
+    # source must be a single function that only refers to its arguments, its locals, and the stored globals
+    tree = ast.parse(source)
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.FunctionDef):
+        raise ValueError("source of lambdified function must be a single function definition")
+    function_def = tree.body[0]
+    if function_def.name != _LAMBDIFY_FUNCTION_NAME_ or len(function_def.decorator_list) > 0:
+        raise ValueError(f"source of lambdified function must define undecorated {_LAMBDIFY_FUNCTION_NAME_}")
+    argument_list = function_def.args.posonlyargs + function_def.args.args + function_def.args.kwonlyargs
+    name_set = set([argument.arg for argument in argument_list]) | global_name_set
+    for node in ast.walk(function_def):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            name_set.add(node.id)
+    for node in ast.walk(function_def):
+        if node is not function_def and isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef, ast.Import, ast.ImportFrom)
+        ):
+            raise ValueError(f"{type(node).__name__} is not allowed in lambdified function")
+        if isinstance(node, (ast.Global, ast.Nonlocal, ast.Delete)):
+            raise ValueError(f"{type(node).__name__} is not allowed in lambdified function")
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ValueError(f"attribute {node.attr} is not allowed in lambdified function")
+        if isinstance(node, ast.Name) and node.id not in name_set:
+            raise ValueError(f"name {node.id} is not defined in lambdified function")
+
+
+def _function_to_json_dict(function: Callable[..., Any]) -> dict[str, Any]:
+    # lambdified functions are stored as source code, and other functions as importable references
+    is_broadcast = hasattr(function, "__wrapped__")
+    function = inspect.unwrap(function)
+    if function.__name__ == _LAMBDIFY_FUNCTION_NAME_:
+        global_dict: dict[str, Any] = {}
+        for name in function.__code__.co_names:
+            if name not in function.__globals__:
+                continue
+            value = function.__globals__[name]
+            if isinstance(value, (int, float, complex)) and not isinstance(value, bool):
+                global_dict[name] = {"value": [complex(value).real, complex(value).imag]}
+            elif inspect.ismodule(value):
+                global_dict[name] = {"module": value.__name__}
+            elif getattr(np, getattr(value, "__name__", ""), None) is value:
+                global_dict[name] = {"numpy": value.__name__}
+            else:
+                raise ValueError(f"global {name} of lambdified function cannot be serialized")
+        return {"source": inspect.getsource(function), "global": global_dict, "broadcast": is_broadcast}
+
+    module = importlib.import_module(function.__module__)
+    reference = module
+    for attribute in function.__qualname__.split("."):
+        reference = getattr(reference, attribute, None)
+    if reference is not function:
+        raise ValueError(f"function {function.__qualname__} is not importable from {function.__module__}")
+    return {"module": function.__module__, "qualname": function.__qualname__}
+
+
+def _function_from_json_dict(data: dict[str, Any]) -> Callable[..., Any]:
+    # payloads are validated so that loading them never imports or runs code other than kernels
+    if "source" not in data:
+        if not _is_kernel_module(data["module"]):
+            raise ValueError(f"module {data['module']} is not registered as kernel module")
+        function = importlib.import_module(data["module"])
+        for attribute in data["qualname"].split("."):
+            if attribute.startswith("__"):
+                raise ValueError(f"attribute {attribute} is not allowed in kernel reference")
+            function = getattr(function, attribute)
+        if not callable(function):
+            raise ValueError(f"{data['module']}.{data['qualname']} is not a function")
+        return function
+
+    namespace: dict[str, Any] = {"__builtins__": {}}
+    for name, value in data["global"].items():
+        if "value" in value:
+            real, imag = value["value"]
+            namespace[name] = real if imag == 0 else complex(real, imag)
+        elif "module" in value:
+            if value["module"] not in _lambdify_module_set:
+                raise ValueError(f"module {value['module']} is not allowed in lambdified function")
+            namespace[name] = importlib.import_module(value["module"])
+        else:
+            if value["numpy"].startswith("_") or not hasattr(np, value["numpy"]):
+                raise ValueError(f"numpy.{value['numpy']} is not allowed in lambdified function")
+            namespace[name] = getattr(np, value["numpy"])
+    _validate_lambdify_source(data["source"], set(data["global"].keys()))
+    exec(compile(data["source"], f"<{_LAMBDIFY_FUNCTION_NAME_}>", "exec"), namespace)
+    function = namespace[_LAMBDIFY_FUNCTION_NAME_]
+    if data["broadcast"]:
+        function = _broadcast_parameter(function)
+    return function
+
+
+def _compiled_pulse_dict_to_json_dict(compiled_pulse_dict: dict[str, CompiledPulse]) -> dict[str, Any]:
+    shape_index_dict: dict[int, int] = {}
+    shape_list: list[dict[str, Any]] = []
+    pulse_list: list[dict[str, Any]] = []
+    for compiled_pulse in compiled_pulse_dict.values():
+        pulse_shape_list = []
+        for channel_name, shape, param_index in compiled_pulse._shape_list:
+            if id(shape) not in shape_index_dict:
+                shape_index_dict[id(shape)] = len(shape_list)
+                shape_list.append(
+                    {
+                        "name": shape.name,
+                        "parameter_name_list": shape.parameter_name_list,
+                        "time_function": _function_to_json_dict(shape.time_function),
+                        "progress_function": _function_to_json_dict(shape.progress_function),
+                        "support_function": _function_to_json_dict(shape.support_function),
+                        "is_zero": shape.is_zero,
+                        "scale_index_list": shape.scale_index_list,
+                        "phase_index_list": shape.phase_index_list,
+                    }
+                )
+            pulse_shape_list.append([channel_name, shape_index_dict[id(shape)], param_index.start, param_index.stop])
+        pulse_list.append(
+            {
+                "name": compiled_pulse.name,
+                "channel_list": list(compiled_pulse.channel_list),
+                "variable_name_list": compiled_pulse.variable_name_list,
+                "parameter_function": _function_to_json_dict(compiled_pulse._parameter_function),
+                "shape_list": pulse_shape_list,
+                "envelope_source_list": compiled_pulse._envelope_source_list,
+                "saved_evaluation": compiled_pulse.saved_evaluation,
+            }
+        )
+    return {"shape": shape_list, "pulse": pulse_list}
+
+
+def _compiled_pulse_dict_from_json_dict(data: dict[str, Any]) -> dict[str, CompiledPulse]:
+    shape_list: list[CompiledShape] = []
+    for shape_data in data["shape"]:
+        shape_list.append(
+            CompiledShape(
+                name=shape_data["name"],
+                parameter_name_list=shape_data["parameter_name_list"],
+                time_function=_function_from_json_dict(shape_data["time_function"]),
+                progress_function=_function_from_json_dict(shape_data["progress_function"]),
+                support_function=_function_from_json_dict(shape_data["support_function"]),
+                is_zero=shape_data["is_zero"],
+                scale_index_list=shape_data["scale_index_list"],
+                phase_index_list=shape_data["phase_index_list"],
+            )
+        )
+    compiled_pulse_dict: dict[str, CompiledPulse] = {}
+    for pulse_data in data["pulse"]:
+        pulse_shape_list = []
+        for channel_name, shape_index, param_start, param_stop in pulse_data["shape_list"]:
+            pulse_shape_list.append((channel_name, shape_list[shape_index], slice(param_start, param_stop)))
+        compiled_pulse_dict[pulse_data["name"]] = CompiledPulse(
+            name=pulse_data["name"],
+            channel_list=pulse_data["channel_list"],
+            variable_name_list=pulse_data["variable_name_list"],
+            _parameter_function=_function_from_json_dict(pulse_data["parameter_function"]),
+            _shape_list=pulse_shape_list,
+            _envelope_source_list=pulse_data["envelope_source_list"],
+            saved_evaluation=pulse_data["saved_evaluation"],
+        )
+    return compiled_pulse_dict
+
+
+def compiled_pulse_dict_to_bytes(compiled_pulse_dict: dict[str, CompiledPulse]) -> bytes:
+    payload_bytes = _encode_payload(_compiled_pulse_dict_to_json_dict(compiled_pulse_dict))
+    return _pack_payload(_KIND_COMPILED_PULSE_LIBRARY_, payload_bytes)
+
+
+def compiled_pulse_dict_from_bytes(data: bytes) -> dict[str, CompiledPulse]:
+    # kernels are rebuilt from the payload, so data must come from a trusted source (see KernelCache)
+    payload, _ = _unpack_payload(data, _KIND_COMPILED_PULSE_LIBRARY_)
+    return _compiled_pulse_dict_from_json_dict(payload)
+
+
+@dataclass(frozen=True, slots=True)
+class KernelCache:
+    """Cache of compiled pulses stored as files named by content hash of pulse library
+
+    Loading a file runs the stored source of lambdified functions and imports the stored kernel references.
+    Sources are restricted to numpy expressions and references to mt_pulse and registered kernel modules,
+    but the directory must still be writable only by trusted users.
+    """
+
+    directory: str
+
+    def _get_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}.kernel")
+
+    def get(self, content_hash: str) -> Optional[dict[str, CompiledPulse]]:
+        path = self._get_path(content_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            return compiled_pulse_dict_from_bytes(file.read())
+
+    def put(self, content_hash: str, compiled_pulse_dict: dict[str, CompiledPulse]) -> None:
+        data = compiled_pulse_dict_to_bytes(compiled_pulse_dict)
+        os.makedirs(self.directory, exist_ok=True)
+        # write to temporary file first so that concurrent readers never see a partial file
+        temporary_path = f"{self._get_path(content_hash)}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, self._get_path(content_hash))
@@ -0,0 +1,173 @@
+from __future__ import annotations
+from typing import Any, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import numpy as np
+from mt_pulse.compiled_pulse import _validate_time_slots
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary
+from mt_pulse.sequence import Sequence, SequenceConfig
+
+# sequence loaded in a worker process, which is reused while the fingerprint of the sequence is unchanged
+_worker_sequence: dict[str, Sequence] = {}
+
+
+def _load_worker_sequence(
+    fingerprint: str, pulse_library_data: bytes, sequence_data: bytes, fractional_shift_error: Optional[float]
+) -> Sequence:
+    if fingerprint not in _worker_sequence:
+        _worker_sequence.clear()
+        pulse_library = CompiledPulseLibrary.from_bytes(pulse_library_data)
+        _worker_sequence[fingerprint] = Sequence.from_bytes(sequence_data, pulse_library)
+    # pulses rendered with another error bound of fractional delay are not reused
+    render_cache = _worker_sequence[fingerprint].pulse_library.render_cache
+    if render_cache.fractional_shift_error != fractional_shift_error:
+        render_cache.clear()
+        render_cache.fractional_shift_error = fractional_shift_error
+    return _worker_sequence[fingerprint]
+
+
+def _render_partition_worker(
+    fingerprint: str,
+    pulse_library_data: bytes,
+    sequence_data: bytes,
+    fractional_shift_error: Optional[float],
+    raw_config_list: list[dict[str, Any]],
+    time_slots_name: str,
+    waveform_name: str,
+    num_sample: int,
+    channel_index_list: list[int],
+) -> None:
+    # waveforms of the partition are written to the shared buffer of (#channel, #sample) complex128
+    sequence = _load_worker_sequence(fingerprint, pulse_library_data, sequence_data, fractional_shift_error)
+    config = SequenceConfig.from_json_dict(raw_config_list)
+    time_slots_memory = shared_memory.SharedMemory(name=time_slots_name)
+    waveform_memory = shared_memory.SharedMemory(name=waveform_name)
+    try:
+        time_slots = np.ndarray((num_sample,), dtype=float, buffer=time_slots_memory.buf)
+        num_channel = len(sequence.compile(config).channel_list)
+        waveform_array = np.ndarray((num_channel, num_sample), dtype=complex, buffer=waveform_memory.buf)
+        # pulses spanning other partitions are also added to other channels, which are discarded
+        discard = np.zeros(num_sample, dtype=complex)
+        waveform_list = [discard] * num_channel
+        for channel_index in channel_index_list:
+            waveform_list[channel_index] = waveform_array[channel_index]
+        sequence._render_channel_partition(time_slots, config, channel_index_list, waveform_list)
+        del time_slots, waveform_array, waveform_list
+    finally:
+        time_slots_memory.close()
+        waveform_memory.close()
+
+
+def get_channel_partition(sequence: Sequence, config: SequenceConfig, num_partition: int) -> list[list[str]]:
+    """Split channels into partitions balanced by the number of pulse entries
+
+    Args:
+        sequence (Sequence): sequence to render
+        config (SequenceConfig): sequence config
+        num_partition (int): number of partitions
+
+    Returns:
+        list[list[str]]: non-empty channel partitions
+    """
+    if num_partition < 1:
+        raise ValueError(f"num_partition must be positive, but {num_partition} is provided")
+    timeline = sequence.compile(config)
+    channel_list = timeline.channel_list
+    load = np.bincount(timeline.channel_index, minlength=len(channel_list)).tolist()
+    for repeat in timeline.repeat_list:
+        for channel_index in repeat.channel_index_list:
+            load[channel_index] += len(repeat.timeline.start)
+
+    # channels are assigned in descending load to the least loaded partition
+    partition_list: list[list[str]] = [[] for _ in range(num_partition)]
+    partition_load = [0] * num_partition
+    for channel_index in sorted(range(len(channel_list)), key=lambda index: -load[index]):
+        target = partition_load.index(min(partition_load))
+        partition_list[target].append(channel_list[channel_index])
+        partition_load[target] += load[channel_index]
+    return [partition for partition in partition_list if len(partition) > 0]
+
+
+def get_waveform_parallel(
+    sequence: Sequence,
+    time_slots: np.ndarray,
+    config: SequenceConfig,
+    num_process: Optional[int] = None,
+    channel_partition: Optional[list[list[str]]] = None,
+    executor: Optional[Executor] = None,
+) -> tuple[dict[str, np.ndarray], dict[str, list[float]]]:
+    """Generate complex128 waveform of each channel with a process pool, identical to Sequence.get_waveform
+
+    Workers render with the fractional_shift_error of the render cache of the sequence's pulse library.
+
+    Args:
+        sequence (Sequence): sequence to render
+        time_slots (np.ndarray): sorted time slots
+        config (SequenceConfig): sequence config
+        num_process (Optional[int]): number of worker processes, defaults to the number of CPUs
+        channel_partition (Optional[list[list[str]]]): channels rendered by each task, e.g., channels of an AWG
+        executor (Optional[Executor]): process pool reused across calls, created for the call if None
+
+    Returns:
+        tuple[dict[str, np.ndarray], dict[str, list[float]]]: waveforms and capture points of each channel
+    """
+    _validate_time_slots(time_slots)
+    if num_process is None:
+        num_process = os.cpu_count() or 1
+    timeline = sequence.compile(config)
+    channel_list = timeline.channel_list
+    if channel_partition is None:
+        channel_partition = get_channel_partition(sequence, config, num_process)
+    channel_index_dict = {channel: index for index, channel in enumerate(channel_list)}
+    partitioned_channel_list = [channel for partition in channel_partition for channel in partition]
+    if sorted(partitioned_channel_list) != sorted(channel_list):
+        raise ValueError(f"channel_partition {channel_partition} must cover each channel {channel_list} exactly once")
+
+    # workers load sympy-free runtime artifacts instead of pickled compiled pulses
+    pulse_library = sequence.pulse_library
+    if not isinstance(pulse_library, CompiledPulseLibrary):
+        pulse_library = pulse_library.to_compiled()
+    pulse_library_data = pulse_library.to_bytes()
+    sequence_data = sequence.to_bytes()
+    raw_config_list = config.to_json_dict()
+    fingerprint = sequence.get_fingerprint()
+
+    num_sample = len(time_slots)
+    time_slots_memory = shared_memory.SharedMemory(create=True, size=max(num_sample * 8, 1))
+    waveform_memory = shared_memory.SharedMemory(create=True, size=max(len(channel_list) * num_sample * 16, 1))
+    owned_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=min(num_process, len(channel_partition)))
+    try:
+        shared_time_slots = np.ndarray((num_sample,), dtype=float, buffer=time_slots_memory.buf)
+        shared_time_slots[:] = time_slots
+        waveform_array = np.ndarray((len(channel_list), num_sample), dtype=complex, buffer=waveform_memory.buf)
+        waveform_array.fill(0)
+        future_list = [
+            executor.submit(
+                _render_partition_worker,
+                fingerprint,
+                pulse_library_data,
+                sequence_data,
+                sequence.pulse_library.render_cache.fractional_shift_error,
+                raw_config_list,
+                time_slots_memory.name,
+                waveform_memory.name,
+                num_sample,
+                [channel_index_dict[channel] for channel in partition],
+            )
+            for partition in channel_partition
+        ]
+        for future in future_list:
+            future.result()
+        waveform = {channel: waveform_array[index].copy() for index, channel in enumerate(channel_list)}
+        del shared_time_slots, waveform_array
+    finally:
+        if owned_executor:
+            executor.shutdown()
+        time_slots_memory.close()
+        time_slots_memory.unlink()
+        waveform_memory.close()
+        waveform_memory.unlink()
+    return waveform, timeline.get_capture_point()
@@ -1,9 +1,12 @@
 from __future__ import annotations
-from typing import Union, Any
+from typing import Union, Any, Optional
 from dataclasses import dataclass, field
 import numpy as np
 import sympy as sp
+from mt_pulse.compiled_shape import CompiledShape
+from mt_pulse.compiled_pulse import CompiledPulse
 from mt_pulse.shape_library import ShapeLibrary
+from mt_pulse.waveform_format import _INT16_IQ_, _get_output_waveform_dict, _convert_to_int16_iq
 
 
 @dataclass(frozen=True, slots=True)
@@ -62,6 +65,17 @@ class Pulse:
     def add_shape(self, channel_name: str, shape_name: str, shape_param: dict[str, Union[float, sp.Expr]]) -> None:
         self._shape_list.append((channel_name, shape_name, shape_param))
 
+    def _get_snapshot(self) -> tuple:
+        # copy of content to detect in-place updates after the pulse is registered
+        shape_snapshot = tuple([(item[0], item[1], tuple(item[2].items())) for item in self._shape_list])
+        return (
+            self.name,
+            tuple(self.channel_list),
+            shape_snapshot,
+            tuple(self._variable_description.items()),
+            tuple(self._variable_default_value.items()),
+        )
+
     def validate_shape_list(self, shape_library: ShapeLibrary) -> None:
         for channel_name, shape_name, shape_param in self._shape_list:
             # valdate
@@ -107,15 +121,26 @@ class Pulse:
         return assigned_params
 
     def get_waveform(
-        self, time_slots: np.ndarray, current_time: float, config: dict[str, float], shape_library: ShapeLibrary
+        self,
+        time_slots: np.ndarray,
+        current_time: float,
+        config: dict[str, float],
+        shape_library: ShapeLibrary,
+        dtype: str = "complex128",
+        out: Optional[dict[str, np.ndarray]] = None,
+        full_scale: float = 1.0,
     ) -> tuple[dict[str, np.ndarray], float]:
         if time_slots.ndim != 1:
             raise ValueError(f"time_slots must be 1D array, but {time_slots.ndim}-dim array is provided")
 
+        output_dict = _get_output_waveform_dict(self.channel_list, len(time_slots), dtype, out)
         waveform_dict = {}
         cursor_dict = {}
         for channel_name in self.channel_list:
-            waveform_dict[channel_name] = np.zeros_like(time_slots, dtype=complex)
+            if dtype == _INT16_IQ_:
+                waveform_dict[channel_name] = np.zeros_like(time_slots, dtype=complex)
+            else:
+                waveform_dict[channel_name] = output_dict[channel_name]
             cursor_dict[channel_name] = current_time
 
         for channel_name, shape_name, shape_param in self._shape_list:
@@ -125,7 +150,10 @@ class Pulse:
             waveform_dict[channel_name] += shape_func(time_slots - cursor_dict[channel_name])
             cursor_dict[channel_name] += shape_library.get_progress(shape_name, assigned_params)
         duration = max(cursor_dict.values()) - current_time
-        return waveform_dict, duration
+        if dtype == _INT16_IQ_:
+            for channel_name in self.channel_list:
+                _convert_to_int16_iq(waveform_dict[channel_name], full_scale, output_dict[channel_name])
+        return output_dict, duration
 
     def get_duration(self, config: dict[str, float], shape_library: ShapeLibrary) -> float:
         cursor_dict: dict[str, float] = {}
@@ -137,3 +165,77 @@ class Pulse:
             cursor_dict[channel_name] += shape_library.get_progress(shape, assigned_params)
         duration = max(cursor_dict.values())
         return duration
+
+    def compile(self, shape_library: ShapeLibrary) -> CompiledPulse:
+        self.validate_shape_list(shape_library)
+        symbol_dict: dict[str, sp.Symbol] = {}
+        shape_param_expr_list: list[sp.Expr] = []
+        shape_list: list[tuple[str, CompiledShape, slice]] = []
+        for channel_name, shape_name, shape_param in self._shape_list:
+            compiled_shape = shape_library.compile(shape_name)
+            shape_param = self._verify_sympy_expr(shape_param)
+            start_index = len(shape_param_expr_list)
+            for param_name in compiled_shape.parameter_name_list:
+                value = shape_param[param_name]
+                symbol_dict.update({s.name: s for s in value.free_symbols})
+                shape_param_expr_list.append(value)
+            shape_list.append((channel_name, compiled_shape, slice(start_index, len(shape_param_expr_list))))
+
+        variable_name_list = list(self._variable_default_value.keys())
+        variable_name_list += sorted(set(symbol_dict.keys()) - set(variable_name_list))
+        variable_symbol_list = [symbol_dict.get(name, sp.Symbol(name)) for name in variable_name_list]
+        # common subexpressions among shape parameters are evaluated once
+        replacement_list, reduced_expr_list = sp.cse(shape_param_expr_list)
+        num_saved_parameter = sp.count_ops(shape_param_expr_list) - sp.count_ops(
+            [expr for _, expr in replacement_list] + reduced_expr_list
+        )
+        parameter_function = sp.lambdify(
+            variable_symbol_list,
+            shape_param_expr_list,
+            modules="numpy",
+            cse=lambda _: (replacement_list, reduced_expr_list),
+        )
+        envelope_source_list = self._get_envelope_source_list(shape_library, shape_list, shape_param_expr_list)
+        num_saved_shape = len(
+            [index for index, source in enumerate(envelope_source_list) if source is not None and source != index]
+        )
+        compiled_pulse = CompiledPulse(
+            name=self.name,
+            channel_list=list(self.channel_list),
+            variable_name_list=variable_name_list,
+            _parameter_function=parameter_function,
+            _shape_list=shape_list,
+            _envelope_source_list=envelope_source_list,
+            saved_evaluation={"parameter": int(num_saved_parameter), "shape": num_saved_shape},
+        )
+        return compiled_pulse
+
+    def _get_envelope_source_list(
+        self,
+        shape_library: ShapeLibrary,
+        shape_list: list[tuple[str, CompiledShape, slice]],
+        shape_param_expr_list: list[sp.Expr],
+    ) -> list[Optional[int]]:
+        # shapes of the same envelope starting at the same time are evaluated once by the first of them,
+        # and the others reuse the envelope with their own coefficients
+        cursor_dict: dict[str, sp.Expr] = {channel_name: sp.Integer(0) for channel_name in self.channel_list}
+        envelope_index_dict: dict[tuple, list[int]] = {}
+        for shape_index, (channel_name, compiled_shape, param_index) in enumerate(shape_list):
+            shape_param = shape_param_expr_list[param_index]
+            if not compiled_shape.is_zero:
+                envelope_param = compiled_shape.get_envelope_parameter(shape_param)
+                key = (compiled_shape.name, cursor_dict[channel_name], tuple(envelope_param))
+                envelope_index_dict.setdefault(key, []).append(shape_index)
+            shape = shape_library._shape_dict[compiled_shape.name]
+            substitution = dict(zip(compiled_shape.parameter_name_list, shape_param))
+            progress = shape.progress_time_ns.xreplace(
+                {symbol: substitution[symbol.name] for symbol in shape.progress_time_ns.free_symbols}
+            )
+            cursor_dict[channel_name] = cursor_dict[channel_name] + progress
+
+        envelope_source_list: list[Optional[int]] = [None] * len(shape_list)
+        for shape_index_list in envelope_index_dict.values():
+            if len(shape_index_list) >= 2:
+                for shape_index in shape_index_list:
+                    envelope_source_list[shape_index] = shape_index_list[0]
+        return envelope_source_list
@@ -1,15 +1,50 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Optional
 from dataclasses import dataclass, field
-import numpy as np
-from mt_pulse.pulse import Pulse
+from mt_pulse.pulse import Pulse, CompiledPulse
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary, _PulseRenderer
+from mt_pulse.shape import Shape
 from mt_pulse.shape_library import ShapeLibrary
+from mt_pulse.expression_table import ExpressionTable
+from mt_pulse.binary_format import (
+    _KIND_PULSE_LIBRARY_,
+    _encode_payload,
+    _get_content_hash,
+    _pack_payload,
+    _unpack_payload,
+)
+from mt_pulse.kernel_cache import KernelCache
+from mt_pulse.render_cache import RenderCache
 
 
 @dataclass(frozen=True, slots=True)
-class PulseLibrary:
+class PulseLibrary(_PulseRenderer):
     shape_library: ShapeLibrary
     _pulse_dict: dict[str, Pulse] = field(default_factory=dict)
+    _compiled_pulse_dict: dict[str, CompiledPulse] = field(default_factory=dict, compare=False, repr=False)
+    render_cache: RenderCache = field(default_factory=RenderCache, compare=False, repr=False)
+    # version of shape library on which compiled pulses and rendered pulses are based
+    _shape_version: list[int] = field(default_factory=list, compare=False, repr=False)
+    # revision incremented when pulses or shapes are replaced, on which timelines of sequences depend
+    _revision: list[int] = field(default_factory=lambda: [0], compare=False, repr=False)
+    # registered shapes and snapshots of pulses at the time of hashing, and the content hash
+    _content_hash_cache: list[tuple[tuple[Any, ...], str]] = field(default_factory=list, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._shape_version[:] = [self.shape_library.get_version()]
+
+    def _validate_shape_version(self) -> None:
+        # pulses compiled with replaced shapes are compiled and rendered again
+        version = self.shape_library.get_version()
+        if self._shape_version[0] != version:
+            self._compiled_pulse_dict.clear()
+            self.render_cache.clear()
+            self._shape_version[0] = version
+            self._revision[0] += 1
+
+    def get_revision(self) -> int:
+        self._validate_shape_version()
+        return self._revision[0]
 
     def to_json_dict(self) -> dict[str, dict]:
         data: dict[str, dict] = {"_pulse_dict": {}}
@@ -26,13 +61,106 @@ class PulseLibrary:
             new_data["_pulse_dict"][key] = Pulse.from_json_dict(value)
         return PulseLibrary(**new_data)
 
+    def _to_binary_payload(self) -> dict[str, Any]:
+        table = ExpressionTable()
+        shape_list = []
+        for shape in self.shape_library._shape_dict.values():
+            support = None
+            if shape.support_start_ns is not None and shape.support_end_ns is not None:
+                support = [table.add(shape.support_start_ns), table.add(shape.support_end_ns)]
+            shape_list.append([shape.name, table.add(shape.shape_expr), table.add(shape.progress_time_ns), support])
+        pulse_list = []
+        for pulse in self._pulse_dict.values():
+            shape_param_list = []
+            for channel_name, shape_name, shape_param in pulse._shape_list:
+                # numeric literals of shape parameters are serialized as sympy numbers
+                shape_param = pulse._verify_sympy_expr(shape_param)
+                param_list = [[param_name, table.add(expr)] for param_name, expr in shape_param.items()]
+                shape_param_list.append([channel_name, shape_name, param_list])
+            pulse_list.append(
+                [
+                    pulse.name,
+                    list(pulse.channel_list),
+                    shape_param_list,
+                    pulse._variable_description,
+                    pulse._variable_default_value,
+                ]
+            )
+        return {"expression": table.to_json_dict(), "shape": shape_list, "pulse": pulse_list}
+
+    def to_bytes(self) -> bytes:
+        return _pack_payload(_KIND_PULSE_LIBRARY_, _encode_payload(self._to_binary_payload()))
+
+    def get_content_hash(self) -> str:
+        # hash is reused while the same shape objects and pulses of the same content are registered
+        registered = (
+            *self.shape_library._shape_dict.values(),
+            *[pulse._get_snapshot() for pulse in self._pulse_dict.values()],
+        )
+        if len(self._content_hash_cache) == 0 or not (
+            len(self._content_hash_cache[0][0]) == len(registered)
+            and all([a is b or a == b for a, b in zip(self._content_hash_cache[0][0], registered)])
+        ):
+            content_hash = _get_content_hash(_encode_payload(self._to_binary_payload()))
+            self._content_hash_cache[:] = [(registered, content_hash)]
+        return self._content_hash_cache[0][1]
+
+    @staticmethod
+    def from_bytes(data: bytes, kernel_cache: Optional[KernelCache] = None) -> PulseLibrary:
+        """Load pulse library serialized by to_bytes
+
+        Expressions are parsed since the library is editable. Use CompiledPulseLibrary.from_pulse_library_bytes
+        to skip parsing on a hit of the kernel cache, which must be a trusted directory as noted in KernelCache.
+
+        Args:
+            data (bytes): serialized pulse library
+            kernel_cache (Optional[KernelCache]): cache of compiled pulses keyed by content hash.
+                If hit, pulses are not lambdified again. If missed, compiled pulses are stored.
+
+        Returns:
+            PulseLibrary: loaded pulse library
+        """
+        payload, payload_bytes = _unpack_payload(data, _KIND_PULSE_LIBRARY_)
+        table = ExpressionTable.from_json_dict(payload["expression"])
+        shape_dict: dict[str, Shape] = {}
+        for name, shape_expr, progress_time_ns, support in payload["shape"]:
+            support_start_ns, support_end_ns = (None, None) if support is None else [table.get(i) for i in support]
+            shape_dict[name] = Shape(
+                name, table.get(shape_expr), table.get(progress_time_ns), support_start_ns, support_end_ns
+            )
+        pulse_dict: dict[str, Pulse] = {}
+        for name, channel_list, shape_param_list, variable_description, variable_default_value in payload["pulse"]:
+            shape_list = []
+            for channel_name, shape_name, param_list in shape_param_list:
+                shape_param = {param_name: table.get(index) for param_name, index in param_list}
+                shape_list.append((channel_name, shape_name, shape_param))
+            pulse_dict[name] = Pulse(
+                name, tuple(channel_list), shape_list, variable_description, variable_default_value
+            )
+        pulse_library = PulseLibrary(ShapeLibrary(_shape_dict=shape_dict), _pulse_dict=pulse_dict)
+
+        if kernel_cache is not None:
+            content_hash = _get_content_hash(payload_bytes)
+            compiled_pulse_dict = kernel_cache.get(content_hash)
+            if compiled_pulse_dict is None:
+                kernel_cache.put(content_hash, pulse_library.compile())
+            else:
+                pulse_library._compiled_pulse_dict.update(compiled_pulse_dict)
+        return pulse_library
+
     def add_pulse(self, pulse: Pulse) -> None:
         pulse.validate_shape_list(self.shape_library)
         self._pulse_dict[pulse.name] = pulse
+        self._compiled_pulse_dict.pop(pulse.name, None)
+        self.render_cache.clear()
+        self._revision[0] += 1
 
     def get_pulse_name_list(self) -> list[str]:
         return list(self._pulse_dict.keys())
 
+    def has_pulse(self, pulse_name: str) -> bool:
+        return pulse_name in self._pulse_dict
+
     def get_channel_list(self, name: str) -> list[str]:
         return self._pulse_dict[name].channel_list
 
@@ -47,14 +175,24 @@ class PulseLibrary:
             desc[pulse_name] = self._pulse_dict[pulse_name].get_description()
         return desc
 
-    def get_waveform(
-        self, pulse_name: str, time_slots: np.ndarray, current_time: float, config: dict[str, float]
-    ) -> tuple[dict[str, np.ndarray], float]:
-        if pulse_name not in self._pulse_dict:
-            raise ValueError(f"pulse {pulse_name} not found in pulse library list {list(self._pulse_dict.keys())}")
-        return self._pulse_dict[pulse_name].get_waveform(time_slots, current_time, config, self.shape_library)
+    def compile(self) -> dict[str, CompiledPulse]:
+        for pulse_name in self._pulse_dict:
+            self.get_compiled_pulse(pulse_name)
+        return dict(self._compiled_pulse_dict)
 
-    def get_duration(self, pulse_name: str, config: dict[str, float]) -> float:
+    def get_compiled_pulse(self, pulse_name: str) -> CompiledPulse:
         if pulse_name not in self._pulse_dict:
             raise ValueError(f"pulse {pulse_name} not found in pulse library list {list(self._pulse_dict.keys())}")
-        return self._pulse_dict[pulse_name].get_duration(config, self.shape_library)
+        self._validate_shape_version()
+        if pulse_name not in self._compiled_pulse_dict:
+            self._compiled_pulse_dict[pulse_name] = self._pulse_dict[pulse_name].compile(self.shape_library)
+        return self._compiled_pulse_dict[pulse_name]
+
+    def to_compiled(self) -> CompiledPulseLibrary:
+        """Compile pulse library into runtime pulse library, which is rendered without sympy
+
+        Returns:
+            CompiledPulseLibrary: runtime pulse library that has the same content hash as this library
+        """
+        config_dict = {pulse_name: self.get_config(pulse_name) for pulse_name in self._pulse_dict}
+        return CompiledPulseLibrary(self.get_content_hash(), self.compile(), config_dict)
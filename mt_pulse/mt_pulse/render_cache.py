@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Any, Hashable, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from mt_pulse.compiled_pulse import RenderedPulse
+
+
+@dataclass(slots=True)
+class RenderCache:
+    max_bytes: int = 64 * 1024 * 1024
+    hit_count: int = 0
+    miss_count: int = 0
+    total_bytes: int = 0
+    # maximum absolute error of placing a pulse rendered at sample phase 0 by fractional delay,
+    # or None to render each sample phase by direct evaluation
+    fractional_shift_error: Optional[float] = None
+    shift_count: int = 0
+    _entry_dict: OrderedDict[Hashable, RenderedPulse] = field(default_factory=OrderedDict)
+    # whether fractional delay of the pulse rendered at sample phase 0 is within the error bound
+    _shift_verdict_dict: dict[Hashable, bool] = field(default_factory=dict)
+
+    def get(self, key: Hashable) -> Optional[RenderedPulse]:
+        if key not in self._entry_dict:
+            self.miss_count += 1
+            return None
+        self.hit_count += 1
+        self._entry_dict.move_to_end(key)
+        return self._entry_dict[key]
+
+    def put(self, key: Hashable, rendered_pulse: RenderedPulse) -> None:
+        nbytes = rendered_pulse.nbytes
+        if nbytes > self.max_bytes:
+            return
+        if key in self._entry_dict:
+            self.total_bytes -= self._entry_dict.pop(key).nbytes
+        self._entry_dict[key] = rendered_pulse
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes:
+            evicted_key, evicted = self._entry_dict.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+            self._shift_verdict_dict.pop(evicted_key, None)
+
+    def get_shift_verdict(self, key: Hashable) -> Optional[bool]:
+        return self._shift_verdict_dict.get(key)
+
+    def set_shift_verdict(self, key: Hashable, is_shiftable: bool) -> None:
+        self._shift_verdict_dict[key] = is_shiftable
+
+    def clear(self) -> None:
+        self._entry_dict.clear()
+        self._shift_verdict_dict.clear()
+        self.total_bytes = 0
+
+    def get_statistics(self) -> dict[str, Any]:
+        total_count = self.hit_count + self.miss_count
+        return {
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+            "hit_rate": self.hit_count / total_count if total_count > 0 else 0.0,
+            "num_entry": len(self._entry_dict),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "shift_count": self.shift_count,
+        }
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import bisect
+import numpy as np
+
+
+@dataclass(slots=True)
+class SegmentWaveform:
+    length: int
+    # non-overlapping segments sorted by start index, samples outside segments are zero
+    _start_list: list[int] = field(default_factory=list)
+    _sample_list: list[np.ndarray] = field(default_factory=list)
+
+    @staticmethod
+    def from_dense(waveform: np.ndarray) -> SegmentWaveform:
+        if waveform.ndim != 1:
+            raise ValueError(f"waveform must be 1-dim array, but shape {waveform.shape} is provided")
+        segment_waveform = SegmentWaveform(len(waveform))
+        is_nonzero = np.concatenate([[False], waveform != 0, [False]])
+        edge = np.flatnonzero(is_nonzero[1:] != is_nonzero[:-1])
+        for start, end in zip(edge[0::2].tolist(), edge[1::2].tolist()):
+            segment_waveform._start_list.append(start)
+            segment_waveform._sample_list.append(np.array(waveform[start:end], dtype=complex))
+        return segment_waveform
+
+    @property
+    def segment_list(self) -> list[tuple[int, np.ndarray]]:
+        return list(zip(self._start_list, self._sample_list))
+
+    @property
+    def nbytes(self) -> int:
+        return sum([samples.nbytes for samples in self._sample_list])
+
+    @property
+    def num_sample(self) -> int:
+        return sum([len(samples) for samples in self._sample_list])
+
+    def add(self, start: int, samples: np.ndarray) -> None:
+        end = min(start + len(samples), self.length)
+        offset = start
+        start = max(start, 0)
+        if start >= end:
+            return
+
+        # samples overlapping existing segments are accumulated in place, and the rest become new segments
+        new_segment_list: list[tuple[int, np.ndarray]] = []
+        cursor = start
+        index = max(bisect.bisect_right(self._start_list, start) - 1, 0)
+        while cursor < end:
+            if index < len(self._start_list) and self._start_list[index] < end:
+                segment_start = self._start_list[index]
+                segment = self._sample_list[index]
+                segment_end = segment_start + len(segment)
+                index += 1
+                if segment_end <= cursor:
+                    continue
+                if segment_start > cursor:
+                    new_segment_list.append((cursor, samples[cursor - offset : segment_start - offset]))
+                    cursor = segment_start
+                overlap_end = min(segment_end, end)
+                segment[cursor - segment_start : overlap_end - segment_start] += samples[
+                    cursor - offset : overlap_end - offset
+                ]
+                cursor = overlap_end
+            else:
+                new_segment_list.append((cursor, samples[cursor - offset : end - offset]))
+                cursor = end
+
+        for segment_start, segment in new_segment_list:
+            index = bisect.bisect_left(self._start_list, segment_start)
+            self._start_list.insert(index, segment_start)
+            self._sample_list.insert(index, np.array(segment, dtype=complex))
+
+    def add_segment_waveform(self, other: SegmentWaveform) -> None:
+        if other.length != self.length:
+            raise ValueError(f"waveform length mismatch: {self.length} and {other.length}")
+        for start, samples in zip(other._start_list, other._sample_list):
+            self.add(start, samples)
+
+    def conj(self) -> None:
+        for samples in self._sample_list:
+            np.conj(samples, out=samples)
+
+    def to_dense(self) -> np.ndarray:
+        waveform = np.zeros(self.length, dtype=complex)
+        for start, samples in zip(self._start_list, self._sample_list):
+            waveform[start : start + len(samples)] = samples
+        return waveform
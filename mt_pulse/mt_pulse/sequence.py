@@ -1,11 +1,23 @@
 from __future__ import annotations
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
 from dataclasses import field, dataclass, asdict
+import copy
+import functools
+import hashlib
 import numpy as np
-from mt_pulse.pulse_library import PulseLibrary
+from mt_pulse.compiled_pulse import _validate_time_slots, _get_sample_interval, _sample_phase_tolerance
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary
+from mt_pulse.segment_waveform import SegmentWaveform
+from mt_pulse.binary_format import _KIND_SEQUENCE_, _encode_payload, _get_digest, _pack_payload, _unpack_payload
+from mt_pulse.waveform_format import _INT16_IQ_, _get_output_waveform_dict, _convert_to_int16_iq
+
+if TYPE_CHECKING:
+    # pulse library for authoring depends on sympy, so it is imported only when it is built from json
+    from mt_pulse.pulse_library import PulseLibrary
 
 _SYNC_COMMAND_ = "__SYNC__"
 _CAPT_COMMAND_ = "__CAPT__"
+_REPEAT_COMMAND_ = "__REPEAT__"
 
 
 @dataclass(frozen=True, slots=True)
@@ -14,12 +26,35 @@ class SequenceCommand:
     pulse_channel_to_sequence_channel: dict[str, str] = field(default_factory=dict)
     channel_list: list[str] = field(default_factory=list)
     blank_time: float = 0.0
+    sub_command_list: list[SequenceCommand] = field(default_factory=list)
+    repeat_count: int = 1
+
+
+def _command_to_json_dict(command: SequenceCommand) -> dict[str, Any]:
+    data = asdict(command)
+    if command.name != _REPEAT_COMMAND_:
+        data.pop("sub_command_list")
+        data.pop("repeat_count")
+    else:
+        data["sub_command_list"] = [_command_to_json_dict(sub_command) for sub_command in command.sub_command_list]
+    return data
+
+
+def _command_from_json_dict(data: dict[str, Any]) -> SequenceCommand:
+    data = dict(data)
+    data["sub_command_list"] = [_command_from_json_dict(sub_data) for sub_data in data.get("sub_command_list", [])]
+    return SequenceCommand(**data)
 
 
 @dataclass(frozen=True, slots=True)
 class SequenceConfig:
     _raw_config_list: list[dict[str, Any]]
     _group_to_index: dict[tuple[str, ...], int] = field(default_factory=dict)
+    _timeline_cache: dict[int, tuple[Any, tuple, SequenceTimeline]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # group index -> (snapshot of group parameters, digest of the group)
+    _group_digest_dict: dict[int, tuple[tuple, bytes]] = field(default_factory=dict, compare=False, repr=False)
 
     def __post_init__(self):
         for idx, item in enumerate(self._raw_config_list):
@@ -38,36 +73,246 @@ class SequenceConfig:
         return list(self._group_to_index.keys())
 
     def get_parameter(self, group_key: tuple[str, ...]) -> Any:
+        # in-place updates of scalar values are detected by snapshots, while other values are updated by set_parameter
         key = tuple(sorted(group_key))
         idx = self._group_to_index[key]
         return self._raw_config_list[idx]["parameter"]
 
+    def set_parameter(self, group_key: tuple[str, ...], pulse_name: str, parameter_name: str, value: Any) -> None:
+        """Set parameter value, and invalidate the cached digest and timelines of the config
+
+        Values which are not scalar, such as lists updated in place, must be set by this method
+        to be reflected in fingerprints and timelines.
+
+        Args:
+            group_key (tuple[str, ...]): channel groups of the parameter group
+            pulse_name (str): name of pulse
+            parameter_name (str): name of parameter
+            value (Any): new value
+        """
+        key = tuple(sorted(group_key))
+        if key not in self._group_to_index:
+            raise ValueError(f"group {key} not found in group list {self.get_parameter_group_list()}")
+        idx = self._group_to_index[key]
+        pulse_config = self._raw_config_list[idx]["parameter"]
+        if pulse_name not in pulse_config or parameter_name not in pulse_config[pulse_name]:
+            raise ValueError(f"parameter {parameter_name} of pulse {pulse_name} not found in group {key}")
+        pulse_config[pulse_name][parameter_name] = value
+        self._group_digest_dict.pop(idx, None)
+        self._timeline_cache.clear()
+
+    def _get_group_snapshot(self, idx: int) -> tuple:
+        # hashable copy of parameter values to detect in-place updates
+        snapshot = []
+        for pulse_name, pulse_config in self._raw_config_list[idx]["parameter"].items():
+            snapshot.append((pulse_name, tuple(pulse_config.items())))
+        return tuple(snapshot)
+
+    def _get_snapshot(self) -> tuple:
+        return tuple([self._get_group_snapshot(idx) for idx in range(len(self._raw_config_list))])
+
+    def _get_group_digest(self, idx: int) -> bytes:
+        # only groups set by set_parameter or whose scalar parameters changed in place are hashed again
+        snapshot = self._get_group_snapshot(idx)
+        cached = self._group_digest_dict.get(idx)
+        if cached is None or cached[0] != snapshot:
+            cached = (snapshot, _get_digest(self._raw_config_list[idx]))
+            self._group_digest_dict[idx] = cached
+        return cached[1]
+
+    def get_group_fingerprint(self, group_key: tuple[str, ...]) -> str:
+        key = tuple(sorted(group_key))
+        return self._get_group_digest(self._group_to_index[key]).hex()
+
+    def get_fingerprint(self) -> str:
+        """Get fingerprint of config, which is combined from per-group digests of parameters
+
+        Returns:
+            str: hex digest of config
+        """
+        fingerprint = hashlib.sha256()
+        for idx in range(len(self._raw_config_list)):
+            fingerprint.update(self._get_group_digest(idx))
+        return fingerprint.hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class SequenceRepeat:
+    # timeline of a single iteration which starts from zero
+    timeline: SequenceTimeline
+    channel_index_list: list[int]
+    start: float
+    period: float
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class SequenceTimeline:
+    channel_list: list[str]
+    pulse_name_list: list[str]
+    # pulse entries in command order
+    pulse_id: np.ndarray
+    start: np.ndarray
+    duration: np.ndarray
+    pulse_config_list: list[dict[str, Any]]
+    pulse_channel_list: list[list[tuple[str, int]]]
+    # flat (channel index, pulse entry index) rows
+    channel_index: np.ndarray
+    entry_index: np.ndarray
+    capture_channel_index: np.ndarray
+    capture_time: np.ndarray
+    end_time: float
+    repeat_list: list[SequenceRepeat] = field(default_factory=list)
+
+    def get_pulse_name(self, entry: int) -> str:
+        return self.pulse_name_list[self.pulse_id[entry]]
+
+    def get_duration(self, capture_duration: float) -> float:
+        duration = self.end_time
+        if len(self.capture_time) > 0:
+            duration = max(duration, float(self.capture_time.max()) + capture_duration)
+        return duration
+
+    def get_capture_point(self) -> dict[str, list[float]]:
+        capture_point: dict[str, list[float]] = {channel: [] for channel in self.channel_list}
+        for channel_index, point in zip(self.capture_channel_index.tolist(), self.capture_time.tolist()):
+            capture_point[self.channel_list[channel_index]].append(point)
+        return capture_point
+
+
+def _stack_sequence_config(config_list: list[SequenceConfig]) -> SequenceConfig:
+    # values that differ among configs are stacked into (N, 1) arrays
+    num_batch = len(config_list)
+    raw_config_list: list[dict[str, Any]] = []
+    for item in config_list[0]._raw_config_list:
+        group_key = tuple(item["group"])
+        parameter: dict[str, dict[str, Any]] = {}
+        for pulse_name, pulse_config in item["parameter"].items():
+            parameter[pulse_name] = {}
+            for param_name in pulse_config:
+                value_list = [config.get_parameter(group_key)[pulse_name][param_name] for config in config_list]
+                if all([value == value_list[0] for value in value_list]):
+                    parameter[pulse_name][param_name] = value_list[0]
+                else:
+                    parameter[pulse_name][param_name] = np.reshape(value_list, (num_batch, 1))
+        raw_config_list.append({"group": group_key, "parameter": parameter})
+    return SequenceConfig(raw_config_list)
+
+
+def _sweep_sequence_config(
+    config: SequenceConfig, sweep_parameter: dict[Union[str, tuple[tuple[str, ...], str, str]], np.ndarray]
+) -> tuple[SequenceConfig, int]:
+    # key of sweep parameter is (group key, pulse, parameter), or "{group}.{pulse}.{parameter}" for a single group
+    num_batch_set = set([len(values) for values in sweep_parameter.values()])
+    if len(num_batch_set) != 1:
+        raise ValueError(f"swept parameters must have the same length, but lengths {num_batch_set} are provided")
+    num_batch = num_batch_set.pop()
+    batch_config = SequenceConfig(copy.deepcopy(config._raw_config_list))
+    for name, values in sweep_parameter.items():
+        if isinstance(name, str):
+            elements = name.split(".")
+            if len(elements) != 3:
+                raise ValueError(f"sweep parameter {name} must be the form of group.pulse.parameter")
+            group, pulse_name, param_name = elements
+            group_key: tuple[str, ...] = (group,)
+        else:
+            group_key, pulse_name, param_name = name
+            group_key = tuple(group_key)
+        if tuple(sorted(group_key)) not in batch_config.get_parameter_group_list():
+            raise ValueError(f"group {group_key} not found in group list {batch_config.get_parameter_group_list()}")
+        group_config = batch_config.get_parameter(group_key)
+        if pulse_name not in group_config or param_name not in group_config[pulse_name]:
+            raise ValueError(f"parameter {param_name} of pulse {pulse_name} not found in group {group_key}")
+        group_config[pulse_name][param_name] = np.reshape(values, (num_batch, 1))
+    return batch_config, num_batch
+
+
+def _is_repeat_updated(repeat: SequenceRepeat, previous_repeat: SequenceRepeat) -> bool:
+    repeat_key = (repeat.start, repeat.period, repeat.count)
+    if repeat_key != (previous_repeat.start, previous_repeat.period, previous_repeat.count):
+        return True
+    timeline, previous_timeline = repeat.timeline, previous_repeat.timeline
+    if not np.array_equal(timeline.start, previous_timeline.start):
+        return True
+    if timeline.pulse_config_list != previous_timeline.pulse_config_list:
+        return True
+    for sub_repeat, previous_sub_repeat in zip(timeline.repeat_list, previous_timeline.repeat_list):
+        if _is_repeat_updated(sub_repeat, previous_sub_repeat):
+            return True
+    return False
+
+
+@dataclass(slots=True)
+class SequenceRenderState:
+    time_slots: Optional[np.ndarray] = None
+    timeline: Optional[SequenceTimeline] = None
+    waveform: dict[str, np.ndarray] = field(default_factory=dict)
+    invalidated_channel_set: set[str] = field(default_factory=set)
+    # complex buffers reused for int16 output
+    scratch_waveform_list: list[np.ndarray] = field(default_factory=list)
+
+    def clear(self) -> None:
+        self.time_slots = None
+        self.timeline = None
+        self.waveform = {}
+        self.invalidated_channel_set = set()
+        self.scratch_waveform_list = []
+
+
+@dataclass(slots=True)
+class SequenceDigest:
+    # digests chained over channels and commands in the order of addition, updated per mutation
+    channel_digest: bytes = b""
+    command_digest: bytes = b""
+
+    def add_channel(self, channel: str, channel_group: str) -> None:
+        self.channel_digest = _get_digest([channel, channel_group], self.channel_digest)
+
+    def add_command(self, command: SequenceCommand) -> None:
+        self.command_digest = _get_digest(_command_to_json_dict(command), self.command_digest)
+
 
 @dataclass(frozen=True, slots=True)
 class Sequence:
-    pulse_library: PulseLibrary
+    pulse_library: Union[PulseLibrary, CompiledPulseLibrary]
     _channel_list: list[str] = field(default_factory=list)
     _channel_to_group: dict[str, str] = field(default_factory=dict)
     _command_list: list[SequenceCommand] = field(default_factory=list)
+    _render_state: SequenceRenderState = field(default_factory=SequenceRenderState, compare=False, repr=False)
+    # channel name -> index in _channel_list, and pulse name -> (channel list in library, its set) for validation
+    _channel_index_dict: dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+    _pulse_channel_set_dict: dict[str, tuple[list[str], frozenset[str]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    _digest: SequenceDigest = field(default_factory=SequenceDigest, compare=False, repr=False)
 
     def __post_init__(self) -> None:
-        special_command_list = [_SYNC_COMMAND_, _CAPT_COMMAND_]
+        special_command_list = [_SYNC_COMMAND_, _CAPT_COMMAND_, _REPEAT_COMMAND_]
         for special_command in special_command_list:
-            if special_command in self.pulse_library._pulse_dict:
+            if self.pulse_library.has_pulse(special_command):
                 raise ValueError(f"pulse name {special_command} is registered and cannot be used")
+        self._channel_index_dict.clear()
+        self._channel_index_dict.update({channel: index for index, channel in enumerate(self._channel_list)})
+        self._digest.channel_digest = self._digest.command_digest = b""
+        for channel in self._channel_list:
+            self._digest.add_channel(channel, self._channel_to_group[channel])
+        for command in self._command_list:
+            self._digest.add_command(command)
 
     def to_json_dict(self) -> dict:
         data: dict = {}
         data["pulse_library"] = self.pulse_library.to_json_dict()
         data["_channel_list"] = self._channel_list
         data["_channel_to_group"] = self._channel_to_group
-        data["_command_list"] = [asdict(d) for d in self._command_list]
+        data["_command_list"] = [_command_to_json_dict(d) for d in self._command_list]
         return data
 
     @staticmethod
     def from_json_dict(data: dict) -> Sequence:
+        from mt_pulse.pulse_library import PulseLibrary
+
         pulse_lib = PulseLibrary.from_json_dict(data["pulse_library"])
-        command_list = [SequenceCommand(**s) for s in data["_command_list"]]
+        command_list = [_command_from_json_dict(s) for s in data["_command_list"]]
         sequence = Sequence(
             pulse_lib,
             _channel_list=data["_channel_list"],
@@ -76,20 +321,86 @@ class Sequence:
         )
         return sequence
 
+    def to_bytes(self) -> bytes:
+        # pulse library is referenced by its content hash and serialized separately
+        payload: dict[str, Any] = {}
+        payload["pulse_library_hash"] = self.pulse_library.get_content_hash()
+        payload["_channel_list"] = self._channel_list
+        payload["_channel_to_group"] = self._channel_to_group
+        payload["_command_list"] = [_command_to_json_dict(d) for d in self._command_list]
+        return _pack_payload(_KIND_SEQUENCE_, _encode_payload(payload))
+
+    @staticmethod
+    def from_bytes(data: bytes, pulse_library: Union[PulseLibrary, CompiledPulseLibrary]) -> Sequence:
+        payload, _ = _unpack_payload(data, _KIND_SEQUENCE_)
+        pulse_library_hash = pulse_library.get_content_hash()
+        if payload["pulse_library_hash"] != pulse_library_hash:
+            raise ValueError(
+                f"sequence requires pulse library {payload['pulse_library_hash']}, "
+                f"but pulse library {pulse_library_hash} is provided"
+            )
+        command_list = [_command_from_json_dict(s) for s in payload["_command_list"]]
+        sequence = Sequence(
+            pulse_library,
+            _channel_list=payload["_channel_list"],
+            _channel_to_group=payload["_channel_to_group"],
+            _command_list=command_list,
+        )
+        return sequence
+
+    def get_fingerprint(self) -> str:
+        """Get fingerprint of sequence, which is identical for sequences that render identical waveforms
+
+        Fingerprint covers pulse library content hash, channels with their groups and commands,
+        where digests of channels and commands are updated incrementally on each addition.
+
+        Returns:
+            str: hex digest of sequence
+        """
+        fingerprint = hashlib.sha256(self.pulse_library.get_content_hash().encode("utf-8"))
+        fingerprint.update(self._digest.channel_digest)
+        fingerprint.update(self._digest.command_digest)
+        return fingerprint.hexdigest()
+
     def add_channel(self, channel: str, channel_group: str = "_default_") -> None:
-        if channel in self._channel_list:
+        if channel in self._channel_index_dict:
             raise ValueError(f"channel {channel} already exists")
+        self._channel_index_dict[channel] = len(self._channel_list)
         self._channel_list.append(channel)
         self._channel_to_group[channel] = channel_group
+        self._digest.add_channel(channel, channel_group)
+        self._render_state.clear()
 
-    def _validate_channel_exists(self, channel_list: list[str]) -> None:
+    def _append_command(self, command: SequenceCommand) -> None:
+        self._command_list.append(command)
+        self._digest.add_command(command)
+        self._render_state.clear()
+
+    def _validate_channel_exists(self, channel_list: Union[list[str], set[str]]) -> None:
         for channel in channel_list:
-            if channel not in self._channel_list:
+            if channel not in self._channel_index_dict:
                 raise ValueError(f"channel {channel} not found in channel list {self._channel_list}")
 
+    def _validate_pulse_exists(self, pulse_name: str) -> None:
+        if not self.pulse_library.has_pulse(pulse_name):
+            raise ValueError(
+                f"sequence {pulse_name} not found in sequence library list {self.pulse_library.get_pulse_name_list()}"
+            )
+
+    def _get_pulse_channel_set(self, pulse_name: str) -> frozenset[str]:
+        # cached set is reused while the pulse in the library keeps the same channel list
+        channel_list = self.pulse_library.get_channel_list(pulse_name)
+        cached = self._pulse_channel_set_dict.get(pulse_name)
+        if cached is None or cached[0] is not channel_list:
+            cached = (channel_list, frozenset(channel_list))
+            self._pulse_channel_set_dict[pulse_name] = cached
+        return cached[1]
+
     def _validate_pulse_channel_match(self, pulse_name: str, pulse_channel_list: list[str]) -> None:
-        pulse_channel_set_required = set(self.pulse_library.get_channel_list(pulse_name))
+        pulse_channel_set_required = self._get_pulse_channel_set(pulse_name)
         pulse_channel_set_provided = set(pulse_channel_list)
+        if pulse_channel_set_required == pulse_channel_set_provided:
+            return
         if len(pulse_channel_set_required - pulse_channel_set_provided) > 0:
             raise ValueError(
                 f"pulse channel {pulse_channel_set_required - pulse_channel_set_provided} is required but not provided"
@@ -101,10 +412,7 @@ class Sequence:
 
     def add_pulse(self, pulse_name: str, pulse_channel_to_sequence_channel: dict[str, str]) -> None:
         # check sequence in list
-        if pulse_name not in self.pulse_library.get_pulse_name_list():
-            raise ValueError(
-                f"sequence {pulse_name} not found in sequence library list {self.pulse_library.get_pulse_name_list()}"
-            )
+        self._validate_pulse_exists(pulse_name)
 
         # check sequence channels are mapped to qubit channels
         self._validate_pulse_channel_match(pulse_name, list(pulse_channel_to_sequence_channel.keys()))
@@ -114,7 +422,7 @@ class Sequence:
 
         # create and regist command
         command = SequenceCommand(pulse_name, pulse_channel_to_sequence_channel=pulse_channel_to_sequence_channel)
-        self._command_list.append(command)
+        self._append_command(command)
 
     def add_synchronize_command(self, channel_list: list[str]) -> None:
         self.add_blank_command(channel_list, blank_time_ns=0)
@@ -125,16 +433,82 @@ class Sequence:
     def add_capture_command(self, channel_list: list[str]) -> None:
         self._validate_channel_exists(channel_list)
         seq_command = SequenceCommand(_CAPT_COMMAND_, channel_list=channel_list)
-        self._command_list.append(seq_command)
+        self._append_command(seq_command)
 
     def add_blank_command(self, channel_list: list[str], blank_time_ns: float) -> None:
         self._validate_channel_exists(channel_list)
         seq_command = SequenceCommand(_SYNC_COMMAND_, channel_list=channel_list, blank_time=blank_time_ns)
-        self._command_list.append(seq_command)
+        self._append_command(seq_command)
+
+    def add_commands(self, command_list: list[SequenceCommand]) -> None:
+        """Add pulse, blank, synchronize and capture commands at once
+
+        The batch is validated as a whole before any command is added, where each distinct channel,
+        pulse and pulse channel mapping is checked only once. Repeat blocks are added by add_repeat_block.
+
+        Args:
+            command_list (list[SequenceCommand]): SequenceCommand(pulse_name, pulse_channel_to_sequence_channel)
+                for pulses, SequenceCommand(_SYNC_COMMAND_, channel_list=..., blank_time=...) for blank and
+                synchronize, and SequenceCommand(_CAPT_COMMAND_, channel_list=...) for capture
+        """
+        channel_set: set[str] = set()
+        pulse_key_set: set[tuple[str, frozenset[str]]] = set()
+        for command in command_list:
+            if command.name == _REPEAT_COMMAND_:
+                raise ValueError("repeat block cannot be added as a command, use add_repeat_block")
+            if command.name in (_SYNC_COMMAND_, _CAPT_COMMAND_):
+                channel_set.update(command.channel_list)
+            else:
+                channel_set.update(command.pulse_channel_to_sequence_channel.values())
+                pulse_key_set.add((command.name, frozenset(command.pulse_channel_to_sequence_channel.keys())))
+        self._validate_channel_exists(sorted(channel_set - self._channel_index_dict.keys()))
+        for pulse_name, pulse_channel_set in pulse_key_set:
+            self._validate_pulse_exists(pulse_name)
+            self._validate_pulse_channel_match(pulse_name, list(pulse_channel_set))
+        for command in command_list:
+            self._append_command(command)
+
+    def add_repeat_block(self, sub_sequence: Sequence, count: int) -> None:
+        """Add commands of a sub sequence repeated count times
+
+        Channels of the sub sequence are synchronized before the block, and each iteration starts when
+        all the channels of the previous iteration finish. The block is rendered once and tiled.
+
+        Args:
+            sub_sequence (Sequence): sequence whose channels and pulses are defined in this sequence
+            count (int): number of repetitions
+        """
+        if not isinstance(count, (int, np.integer)) or count < 1:
+            raise ValueError(f"repeat count must be a positive integer, but {count} is provided")
+        self._validate_channel_exists(sub_sequence._channel_list)
+        for channel in sub_sequence._channel_list:
+            if sub_sequence._channel_to_group[channel] != self._channel_to_group[channel]:
+                raise ValueError(
+                    f"channel {channel} belongs to group {sub_sequence._channel_to_group[channel]} in sub sequence, "
+                    f"but {self._channel_to_group[channel]} in sequence"
+                )
+        for command in self._get_pulse_command_list(sub_sequence._command_list):
+            self._validate_pulse_exists(command.name)
+        seq_command = SequenceCommand(
+            _REPEAT_COMMAND_,
+            channel_list=list(sub_sequence._channel_list),
+            sub_command_list=list(sub_sequence._command_list),
+            repeat_count=int(count),
+        )
+        self._append_command(seq_command)
+
+    def _get_pulse_command_list(self, command_list: list[SequenceCommand]) -> list[SequenceCommand]:
+        pulse_command_list: list[SequenceCommand] = []
+        for command in command_list:
+            if command.name == _REPEAT_COMMAND_:
+                pulse_command_list.extend(self._get_pulse_command_list(command.sub_command_list))
+            elif command.name not in [_SYNC_COMMAND_, _CAPT_COMMAND_]:
+                pulse_command_list.append(command)
+        return pulse_command_list
 
     def _get_group_key_from_command(self, command: SequenceCommand) -> tuple[str, ...]:
         channel_list: list[str] = []
-        if command.name in [_SYNC_COMMAND_, _CAPT_COMMAND_]:
+        if command.name in [_SYNC_COMMAND_, _CAPT_COMMAND_, _REPEAT_COMMAND_]:
             channel_list.extend(command.channel_list)
         else:
             channel_list.extend(list(command.pulse_channel_to_sequence_channel.values()))
@@ -144,9 +518,7 @@ class Sequence:
 
     def get_config(self) -> SequenceConfig:
         config_dict: dict[tuple[str, ...], dict[str, dict[str, float]]] = {}
-        for command in self._command_list:
-            if command.name in [_SYNC_COMMAND_, _CAPT_COMMAND_]:
-                continue
+        for command in self._get_pulse_command_list(self._command_list):
             # get relevant channel list
             group_key = self._get_group_key_from_command(command)
             if group_key not in config_dict:
@@ -165,73 +537,609 @@ class Sequence:
         config = SequenceConfig(raw_config)
         return config
 
-    def _get_latest_cursor(self, cursor: dict[str, float], channel_list: list[str]) -> float:
-        latest_cursor = 0.0
-        for channel in channel_list:
-            latest_cursor = max(latest_cursor, cursor[channel])
-        return latest_cursor
+    def _get_latest_cursor_batch(
+        self, cursor: dict[str, Union[float, np.ndarray]], channel_list: list[str]
+    ) -> Union[float, np.ndarray]:
+        return functools.reduce(np.maximum, [cursor[channel] for channel in channel_list], 0.0)
 
     def _synchronize_cursor(self, cursor: dict[str, float], channel_list: list[str], point: float) -> None:
         for channel in channel_list:
             cursor[channel] = point
 
-    def get_duration(self, config: SequenceConfig, capture_duration: float) -> float:
-        duration: float = 0.0
+    def _build_timeline(
+        self,
+        config: SequenceConfig,
+        command_list: list[SequenceCommand],
+        parameter_dict: dict[tuple[str, ...], Any],
+    ) -> SequenceTimeline:
+        channel_to_index = self._channel_index_dict
+        cursor = [0.0] * len(self._channel_list)
+        pulse_name_to_id: dict[str, int] = {}
 
-        cursor: dict[str, float] = {}
-        for channel in self._channel_list:
-            cursor[channel] = 0.0
+        pulse_id_list: list[int] = []
+        start_list: list[float] = []
+        duration_list: list[float] = []
+        pulse_config_list: list[dict[str, Any]] = []
+        pulse_channel_list: list[list[tuple[str, int]]] = []
+        capture_channel_index_list: list[int] = []
+        capture_time_list: list[float] = []
+        repeat_list: list[SequenceRepeat] = []
+        end_time = 0.0
+        for command in command_list:
+            if command.name in [_SYNC_COMMAND_, _CAPT_COMMAND_, _REPEAT_COMMAND_]:
+                channel_index_list = [channel_to_index[channel] for channel in command.channel_list]
+            else:
+                channel_index_list = [
+                    channel_to_index[channel] for channel in command.pulse_channel_to_sequence_channel.values()
+                ]
+            latest_cursor = 0.0
+            for channel_index in channel_index_list:
+                latest_cursor = max(latest_cursor, cursor[channel_index])
 
-        for command in self._command_list:
             if command.name == _CAPT_COMMAND_:
-                latest_cursor = self._get_latest_cursor(cursor, command.channel_list)
-                self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
-                duration = max(duration, latest_cursor + capture_duration)
+                capture_channel_index_list.extend(channel_index_list)
+                capture_time_list.extend([latest_cursor] * len(channel_index_list))
+                end_cursor = latest_cursor
             elif command.name == _SYNC_COMMAND_:
-                latest_cursor = self._get_latest_cursor(cursor, command.channel_list)
-                latest_cursor += command.blank_time
-                self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
-                duration = max(duration, latest_cursor)
+                end_cursor = latest_cursor + command.blank_time
+                end_time = max(end_time, end_cursor)
+            elif command.name == _REPEAT_COMMAND_:
+                sub_timeline = self._build_timeline(config, command.sub_command_list, parameter_dict)
+                period = sub_timeline.end_time
+                end_cursor = latest_cursor + command.repeat_count * period
+                end_time = max(end_time, end_cursor)
+                repeat_list.append(
+                    SequenceRepeat(sub_timeline, channel_index_list, latest_cursor, period, command.repeat_count)
+                )
+                iteration_start = latest_cursor + period * np.arange(command.repeat_count)
+                capture_channel_index_list.extend(np.tile(sub_timeline.capture_channel_index, command.repeat_count))
+                capture_time_list.extend(np.add.outer(iteration_start, sub_timeline.capture_time).ravel())
             else:
-                sequence_channel_list = list(command.pulse_channel_to_sequence_channel.values())
-                latest_cursor = self._get_latest_cursor(cursor, sequence_channel_list)
-                pulse_config = config.get_parameter(self._get_group_key_from_command(command))[command.name]
+                group_key = self._get_group_key_from_command(command)
+                if group_key not in parameter_dict:
+                    parameter_dict[group_key] = config.get_parameter(group_key)
+                pulse_config = dict(parameter_dict[group_key][command.name])
                 pulse_duration = self.pulse_library.get_duration(command.name, pulse_config)
-                self._synchronize_cursor(cursor, sequence_channel_list, latest_cursor + pulse_duration)
-                duration = max(duration, latest_cursor + pulse_duration)
-        return duration
+                end_cursor = latest_cursor + pulse_duration
+                end_time = max(end_time, end_cursor)
+
+                pulse_id_list.append(pulse_name_to_id.setdefault(command.name, len(pulse_name_to_id)))
+                start_list.append(latest_cursor)
+                duration_list.append(pulse_duration)
+                pulse_config_list.append(pulse_config)
+                pulse_channel_list.append(
+                    [
+                        (pulse_channel, channel_to_index[channel])
+                        for pulse_channel, channel in command.pulse_channel_to_sequence_channel.items()
+                    ]
+                )
+            for channel_index in channel_index_list:
+                cursor[channel_index] = end_cursor
+
+        channel_index_row: list[int] = []
+        entry_index_row: list[int] = []
+        for entry, channel_list in enumerate(pulse_channel_list):
+            for _, channel_index in channel_list:
+                channel_index_row.append(channel_index)
+                entry_index_row.append(entry)
+
+        timeline = SequenceTimeline(
+            channel_list=list(self._channel_list),
+            pulse_name_list=list(pulse_name_to_id.keys()),
+            pulse_id=np.array(pulse_id_list, dtype=int),
+            start=np.array(start_list, dtype=float),
+            duration=np.array(duration_list, dtype=float),
+            pulse_config_list=pulse_config_list,
+            pulse_channel_list=pulse_channel_list,
+            channel_index=np.array(channel_index_row, dtype=int),
+            entry_index=np.array(entry_index_row, dtype=int),
+            capture_channel_index=np.array(capture_channel_index_list, dtype=int),
+            capture_time=np.array(capture_time_list, dtype=float),
+            end_time=end_time,
+            repeat_list=repeat_list,
+        )
+        return timeline
+
+    def compile(self, config: SequenceConfig) -> SequenceTimeline:
+        """Resolve start time and duration of all the pulses and capture points
+
+        The timeline is cached on the config and rebuilt when the config is updated in place,
+        commands are added to the sequence, or pulses or shapes of the pulse library are replaced.
+
+        Args:
+            config (SequenceConfig): sequence config with scalar parameters
+
+        Returns:
+            SequenceTimeline: flat timeline of pulses and capture points
+        """
+        snapshot = (
+            len(self._channel_list),
+            len(self._command_list),
+            self.pulse_library.get_revision(),
+            config._get_snapshot(),
+        )
+        cached = config._timeline_cache.get(id(self))
+        if cached is not None:
+            sequence, cached_snapshot, timeline = cached
+            if sequence is self and cached_snapshot == snapshot:
+                return timeline
+        timeline = self._build_timeline(config, self._command_list, {})
+        config._timeline_cache[id(self)] = (self, snapshot, timeline)
+        return timeline
+
+    def get_duration(self, config: SequenceConfig, capture_duration: float) -> float:
+        return self.compile(config).get_duration(capture_duration)
+
+    def _render_timeline(
+        self,
+        time_slots: np.ndarray,
+        sample_interval: Optional[float],
+        timeline: SequenceTimeline,
+        waveform_list: list[Any],
+        entry_list: Union[range, list[int]],
+        repeat_index_list: Union[range, list[int]],
+        time_offset: float = 0.0,
+    ) -> None:
+        # waveform_list contains np.ndarray or SegmentWaveform of each channel
+        for entry in entry_list:
+            pulse_waveform: dict[str, Any] = {}
+            for pulse_channel, channel_index in timeline.pulse_channel_list[entry]:
+                pulse_waveform[pulse_channel] = waveform_list[channel_index]
+            if isinstance(waveform_list[timeline.pulse_channel_list[entry][0][1]], SegmentWaveform):
+                self.pulse_library.add_segment_waveform(
+                    timeline.get_pulse_name(entry),
+                    time_slots,
+                    time_offset + timeline.start[entry],
+                    timeline.pulse_config_list[entry],
+                    pulse_waveform,
+                    sample_interval,
+                )
+            else:
+                self.pulse_library.add_waveform(
+                    timeline.get_pulse_name(entry),
+                    time_slots,
+                    time_offset + timeline.start[entry],
+                    timeline.pulse_config_list[entry],
+                    pulse_waveform,
+                    sample_interval,
+                )
+        for repeat_index in repeat_index_list:
+            repeat = timeline.repeat_list[repeat_index]
+            self._render_repeat(time_slots, sample_interval, repeat, waveform_list, time_offset)
+
+    def _get_timeline_extent(self, timeline: SequenceTimeline) -> tuple[float, float]:
+        # time range where pulses of the timeline can be non-zero
+        extent_start, extent_end = np.inf, -np.inf
+        for entry in range(len(timeline.start)):
+            compiled_pulse = self.pulse_library.get_compiled_pulse(timeline.get_pulse_name(entry))
+            support_start, support_end = compiled_pulse.get_support(timeline.pulse_config_list[entry])
+            if support_start > support_end:
+                continue
+            extent_start = min(extent_start, timeline.start[entry] + support_start)
+            extent_end = max(extent_end, timeline.start[entry] + support_end)
+        for repeat in timeline.repeat_list:
+            sub_extent_start, sub_extent_end = self._get_timeline_extent(repeat.timeline)
+            if sub_extent_start > sub_extent_end:
+                continue
+            extent_start = min(extent_start, repeat.start + sub_extent_start)
+            extent_end = max(extent_end, repeat.start + (repeat.count - 1) * repeat.period + sub_extent_end)
+        return extent_start, extent_end
+
+    def _render_repeat(
+        self,
+        time_slots: np.ndarray,
+        sample_interval: Optional[float],
+        repeat: SequenceRepeat,
+        waveform_list: list[Any],
+        time_offset: float,
+    ) -> None:
+        repeat_start = time_offset + repeat.start
+        entry_list = range(len(repeat.timeline.start))
+        repeat_index_list = range(len(repeat.timeline.repeat_list))
+        extent_start, extent_end = self._get_timeline_extent(repeat.timeline)
+        if extent_start > extent_end:
+            return
+
+        num_tile_sample = 0
+        if sample_interval is not None and np.isfinite(extent_start) and np.isfinite(extent_end):
+            tile = repeat.period / sample_interval
+            if abs(tile - round(tile)) < _sample_phase_tolerance:
+                num_tile_sample = int(round(tile))
+        if num_tile_sample == 0:
+            # iterations are placed one by one when the period is not a multiple of the sample interval
+            for index in range(repeat.count):
+                iteration_start = repeat_start + index * repeat.period
+                self._render_timeline(
+                    time_slots,
+                    sample_interval,
+                    repeat.timeline,
+                    waveform_list,
+                    entry_list,
+                    repeat_index_list,
+                    iteration_start,
+                )
+            return
+
+        # the first iteration is rendered on a local grid and tiled with integer sample shifts
+        block_offset = int(np.floor((repeat_start + extent_start - time_slots[0]) / sample_interval)) - 1
+        block_length = int(np.ceil((extent_end - extent_start) / sample_interval)) + 3
+        num_block_tile = -(-block_length // num_tile_sample)
+        block_index = block_offset + np.arange(num_block_tile * num_tile_sample)
+        block_time_slots = time_slots[0] + block_index * sample_interval
+        block_waveform_list: list[Any] = [None] * len(waveform_list)
+        for channel_index in repeat.channel_index_list:
+            block_waveform_list[channel_index] = np.zeros_like(block_time_slots, dtype=complex)
+        self._render_timeline(
+            block_time_slots,
+            sample_interval,
+            repeat.timeline,
+            block_waveform_list,
+            entry_list,
+            repeat_index_list,
+            repeat_start,
+        )
+
+        for channel_index in repeat.channel_index_list:
+            block = block_waveform_list[channel_index]
+            waveform = waveform_list[channel_index]
+            if isinstance(waveform, SegmentWaveform):
+                for index in range(repeat.count):
+                    waveform.add(block_offset + index * num_tile_sample, block)
+                continue
+            tiled_waveform = np.zeros((repeat.count + num_block_tile - 1) * num_tile_sample, dtype=complex)
+            for tile_index in range(num_block_tile):
+                tile_view = tiled_waveform[tile_index * num_tile_sample : (tile_index + repeat.count) * num_tile_sample]
+                tile_view = tile_view.reshape(repeat.count, num_tile_sample)
+                tile_view += block[tile_index * num_tile_sample : (tile_index + 1) * num_tile_sample]
+            clip_start = max(block_offset, 0)
+            clip_end = min(block_offset + len(tiled_waveform), len(waveform))
+            if clip_start < clip_end:
+                waveform[clip_start:clip_end] += tiled_waveform[clip_start - block_offset : clip_end - block_offset]
 
     def get_waveform(
+        self,
+        time_slots: np.ndarray,
+        config: SequenceConfig,
+        dtype: str = "complex128",
+        out: Optional[dict[str, np.ndarray]] = None,
+        full_scale: float = 1.0,
+    ) -> tuple[dict[str, np.ndarray], dict[str, list[float]]]:
+        """Generate waveform of each channel
+
+        Args:
+            time_slots (np.ndarray): sorted time slots
+            config (SequenceConfig): sequence config
+            dtype (str): "complex128", "complex64", or "int16_iq" for (#sample, 2) I/Q array scaled by full_scale
+            out (Optional[dict[str, np.ndarray]]): preallocated buffers of each channel, overwritten and returned
+            full_scale (float): amplitude mapped to the maximum of int16
+
+        Returns:
+            tuple[dict[str, np.ndarray], dict[str, list[float]]]: waveforms and capture points of each channel
+        """
+        _validate_time_slots(time_slots)
+        sample_interval = _get_sample_interval(time_slots)
+        timeline = self.compile(config)
+        waveform = _get_output_waveform_dict(self._channel_list, len(time_slots), dtype, out)
+        if dtype == _INT16_IQ_:
+            state = self._render_state
+            if len(state.scratch_waveform_list) != len(self._channel_list) or any(
+                [len(scratch) != len(time_slots) for scratch in state.scratch_waveform_list]
+            ):
+                state.scratch_waveform_list = [np.zeros_like(time_slots, dtype=complex) for _ in self._channel_list]
+            waveform_list = state.scratch_waveform_list
+            for scratch in waveform_list:
+                scratch.fill(0)
+        else:
+            waveform_list = [waveform[channel] for channel in self._channel_list]
+        self._render_timeline(
+            time_slots,
+            sample_interval,
+            timeline,
+            waveform_list,
+            range(len(timeline.start)),
+            range(len(timeline.repeat_list)),
+        )
+        if dtype == _INT16_IQ_:
+            for channel, scratch in zip(self._channel_list, waveform_list):
+                _convert_to_int16_iq(scratch, full_scale, waveform[channel])
+        return waveform, timeline.get_capture_point()
+
+    def _render_channel_partition(
+        self, time_slots: np.ndarray, config: SequenceConfig, channel_index_list: list[int], waveform_list: list[Any]
+    ) -> None:
+        # pulses and repeat blocks touching the channels are rendered in the same order as the serial path,
+        # and waveform_list may have a discard buffer for the other channels
+        sample_interval = _get_sample_interval(time_slots)
+        timeline = self.compile(config)
+        channel_index_set = set(channel_index_list)
+        entry_list = [
+            entry
+            for entry, pulse_channel in enumerate(timeline.pulse_channel_list)
+            if any([channel_index in channel_index_set for _, channel_index in pulse_channel])
+        ]
+        repeat_index_list = [
+            repeat_index
+            for repeat_index, repeat in enumerate(timeline.repeat_list)
+            if len(channel_index_set.intersection(repeat.channel_index_list)) > 0
+        ]
+        self._render_timeline(time_slots, sample_interval, timeline, waveform_list, entry_list, repeat_index_list)
+
+    def get_segment_waveform(
+        self, time_slots: np.ndarray, config: SequenceConfig
+    ) -> tuple[dict[str, SegmentWaveform], dict[str, list[float]]]:
+        """Generate waveform as non-zero segments without allocating the whole time slots
+
+        Args:
+            time_slots (np.ndarray): uniformly sampled time slots
+            config (SequenceConfig): sequence config
+
+        Returns:
+            tuple[dict[str, SegmentWaveform], dict[str, list[float]]]: waveforms and capture points of each channel
+        """
+        _validate_time_slots(time_slots)
+        sample_interval = _get_sample_interval(time_slots)
+        if sample_interval is None:
+            raise ValueError("segment waveform requires uniformly sampled time slots")
+        timeline = self.compile(config)
+        segment_waveform_list = [SegmentWaveform(len(time_slots)) for _ in self._channel_list]
+        self._render_timeline(
+            time_slots,
+            sample_interval,
+            timeline,
+            segment_waveform_list,
+            range(len(timeline.start)),
+            range(len(timeline.repeat_list)),
+        )
+        segment_waveform = dict(zip(self._channel_list, segment_waveform_list))
+        return segment_waveform, timeline.get_capture_point()
+
+    def _get_placement_list(
+        self, timeline: SequenceTimeline, time_offset: float, placement_list: list[tuple[float, SequenceTimeline, int]]
+    ) -> None:
+        # (start time, timeline, entry) of every pulse, where iterations of repeat blocks are expanded
+        for entry in range(len(timeline.start)):
+            placement_list.append((time_offset + float(timeline.start[entry]), timeline, entry))
+        for repeat in timeline.repeat_list:
+            for index in range(repeat.count):
+                iteration_start = time_offset + repeat.start + index * repeat.period
+                self._get_placement_list(repeat.timeline, iteration_start, placement_list)
+
+    def iter_waveform_chunk(
+        self, time_slots: np.ndarray, config: SequenceConfig, chunk_size: int
+    ) -> Iterator[tuple[int, dict[str, np.ndarray]]]:
+        """Generate waveform as fixed-size chunks in time order
+
+        Only pulses overlapping each chunk are rendered into the chunk, so memory is bounded by
+        chunk_size times the number of channels. Capture points are obtained by compile(config).get_capture_point().
+
+        Args:
+            time_slots (np.ndarray): uniformly sampled time slots
+            config (SequenceConfig): sequence config
+            chunk_size (int): number of samples in a chunk, where the last chunk may be shorter
+
+        Yields:
+            tuple[int, dict[str, np.ndarray]]: start index of the chunk in time_slots and waveforms of each channel
+        """
+        _validate_time_slots(time_slots)
+        sample_interval = _get_sample_interval(time_slots)
+        if sample_interval is None:
+            raise ValueError("chunked waveform requires uniformly sampled time slots")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, but {chunk_size} is provided")
+        timeline = self.compile(config)
+        placement_list: list[tuple[float, SequenceTimeline, int]] = []
+        self._get_placement_list(timeline, 0.0, placement_list)
+
+        # sample range of each pulse, which is the same as the range of its rendered pulse
+        support_dict: dict[tuple[int, int], tuple[float, float]] = {}
+        range_list: list[tuple[int, int, float, SequenceTimeline, int]] = []
+        for start, placed_timeline, entry in placement_list:
+            key = (id(placed_timeline), entry)
+            if key not in support_dict:
+                compiled_pulse = self.pulse_library.get_compiled_pulse(placed_timeline.get_pulse_name(entry))
+                support_dict[key] = compiled_pulse.get_support(placed_timeline.pulse_config_list[entry])
+            support_start, support_end = support_dict[key]
+            if support_start > support_end:
+                continue
+            index_start, index_end = 0, len(time_slots)
+            if np.isfinite(support_start):
+                index_start = max(int(np.floor((start + support_start - time_slots[0]) / sample_interval)) - 1, 0)
+            if np.isfinite(support_end):
+                index_end = min(int(np.ceil((start + support_end - time_slots[0]) / sample_interval)) + 2, index_end)
+            if index_start < index_end:
+                range_list.append((index_start, index_end, start, placed_timeline, entry))
+        range_list.sort(key=lambda item: item[0])
+
+        range_index = 0
+        active_list: list[tuple[int, int, float, SequenceTimeline, int]] = []
+        for chunk_start in range(0, len(time_slots), chunk_size):
+            chunk_end = min(chunk_start + chunk_size, len(time_slots))
+            while range_index < len(range_list) and range_list[range_index][0] < chunk_end:
+                active_list.append(range_list[range_index])
+                range_index += 1
+            active_list = [item for item in active_list if item[1] > chunk_start]
+
+            chunk_time_slots = time_slots[chunk_start:chunk_end]
+            chunk = {channel: np.zeros(chunk_end - chunk_start, dtype=complex) for channel in self._channel_list}
+            for _, _, start, placed_timeline, entry in active_list:
+                pulse_waveform: dict[str, np.ndarray] = {}
+                for pulse_channel, channel_index in placed_timeline.pulse_channel_list[entry]:
+                    pulse_waveform[pulse_channel] = chunk[self._channel_list[channel_index]]
+                self.pulse_library.add_waveform(
+                    placed_timeline.get_pulse_name(entry),
+                    chunk_time_slots,
+                    start,
+                    placed_timeline.pulse_config_list[entry],
+                    pulse_waveform,
+                    sample_interval,
+                )
+            yield chunk_start, chunk
+
+    def invalidate_render_state(self, channel_list: Optional[list[str]] = None) -> None:
+        """Invalidate waveforms kept by get_waveform_incremental
+
+        Args:
+            channel_list (Optional[list[str]]): channels to be re-rendered. If None, all the state is discarded.
+        """
+        if channel_list is None:
+            self._render_state.clear()
+        else:
+            self._validate_channel_exists(channel_list)
+            self._render_state.invalidated_channel_set.update(channel_list)
+
+    def get_waveform_incremental(
         self, time_slots: np.ndarray, config: SequenceConfig
     ) -> tuple[dict[str, np.ndarray], dict[str, list[float]]]:
-        # intialize
-        cursor: dict[str, float] = {}
-        waveform: dict[str, np.ndarray] = {}
-        capture_point: dict[str, list[float]] = {}
-        for channel in self._channel_list:
-            cursor[channel] = 0.0
-            waveform[channel] = np.zeros_like(time_slots, dtype=complex)
-            capture_point[channel] = []
+        """Generate waveform by re-rendering only channels affected since the last call
 
-        for command in self._command_list:
+        Pulses whose config or start time differ from the last call are re-rendered together with
+        the other pulses on the same channels. Arrays of unaffected channels are shared with the last result,
+        so returned arrays must not be modified in place.
+
+        Args:
+            time_slots (np.ndarray): sorted time slots
+            config (SequenceConfig): sequence config
+
+        Returns:
+            tuple[dict[str, np.ndarray], dict[str, list[float]]]: waveforms and capture points of each channel
+        """
+        _validate_time_slots(time_slots)
+        sample_interval = _get_sample_interval(time_slots)
+        timeline = self.compile(config)
+        repeat_channel_list = [set(repeat.channel_index_list) for repeat in timeline.repeat_list]
+
+        state = self._render_state
+        previous = state.timeline
+        if previous is None or state.time_slots is None or not np.array_equal(state.time_slots, time_slots):
+            affected_channel_set = set(range(len(self._channel_list)))
+        else:
+            affected_channel_set = set([self._channel_index_dict[channel] for channel in state.invalidated_channel_set])
+            is_moved = timeline.start != previous.start
+            for entry in range(len(timeline.start)):
+                if is_moved[entry] or timeline.pulse_config_list[entry] != previous.pulse_config_list[entry]:
+                    affected_channel_set.update([index for _, index in timeline.pulse_channel_list[entry]])
+            for repeat, previous_repeat in zip(timeline.repeat_list, previous.repeat_list):
+                if _is_repeat_updated(repeat, previous_repeat):
+                    affected_channel_set.update(repeat.channel_index_list)
+
+            # pulses and repeat blocks over several channels are rendered as a whole
+            channel_set_list = list(repeat_channel_list)
+            for pulse_channel in timeline.pulse_channel_list:
+                channel_set_list.append(set([index for _, index in pulse_channel]))
+            is_expanded = True
+            while is_expanded:
+                is_expanded = False
+                for channel_set in channel_set_list:
+                    if len(channel_set & affected_channel_set) > 0 and not channel_set <= affected_channel_set:
+                        affected_channel_set |= channel_set
+                        is_expanded = True
+
+        waveform_list = [state.waveform.get(channel) for channel in self._channel_list]
+        for channel_index in affected_channel_set:
+            waveform_list[channel_index] = np.zeros_like(time_slots, dtype=complex)
+        is_affected = np.isin(timeline.channel_index, list(affected_channel_set))
+        entry_list = np.unique(timeline.entry_index[is_affected]).tolist()
+        repeat_index_list = []
+        for index, channel_set in enumerate(repeat_channel_list):
+            if len(channel_set & affected_channel_set) > 0:
+                repeat_index_list.append(index)
+        self._render_timeline(time_slots, sample_interval, timeline, waveform_list, entry_list, repeat_index_list)
+
+        state.time_slots = np.array(time_slots)
+        state.timeline = timeline
+        state.waveform = dict(zip(self._channel_list, waveform_list))
+        state.invalidated_channel_set = set()
+        return dict(state.waveform), timeline.get_capture_point()
+
+    def _replay_command_batch(
+        self,
+        command_list: list[SequenceCommand],
+        time_slots: np.ndarray,
+        batch_config: SequenceConfig,
+        cursor: dict[str, Union[float, np.ndarray]],
+        waveform: dict[str, np.ndarray],
+        capture_point: dict[str, list[Union[float, np.ndarray]]],
+    ) -> None:
+        for command in command_list:
             if command.name == _CAPT_COMMAND_:
-                latest_cursor = self._get_latest_cursor(cursor, command.channel_list)
+                latest_cursor = self._get_latest_cursor_batch(cursor, command.channel_list)
                 for channel in command.channel_list:
                     capture_point[channel].append(latest_cursor)
                 self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
             elif command.name == _SYNC_COMMAND_:
-                latest_cursor = self._get_latest_cursor(cursor, command.channel_list)
-                latest_cursor += command.blank_time
+                latest_cursor = self._get_latest_cursor_batch(cursor, command.channel_list)
+                latest_cursor = latest_cursor + command.blank_time
+                self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
+            elif command.name == _REPEAT_COMMAND_:
+                # iteration periods may differ among the batch, so iterations are replayed one by one
+                for _ in range(command.repeat_count):
+                    latest_cursor = self._get_latest_cursor_batch(cursor, command.channel_list)
+                    self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
+                    self._replay_command_batch(
+                        command.sub_command_list, time_slots, batch_config, cursor, waveform, capture_point
+                    )
+                latest_cursor = self._get_latest_cursor_batch(cursor, command.channel_list)
                 self._synchronize_cursor(cursor, command.channel_list, latest_cursor)
             else:
                 sequence_channel_list = list(command.pulse_channel_to_sequence_channel.values())
-                latest_cursor = self._get_latest_cursor(cursor, sequence_channel_list)
-                pulse_config = config.get_parameter(self._get_group_key_from_command(command))[command.name]
-                pulse_waveform, pulse_duration = self.pulse_library.get_waveform(
-                    command.name, time_slots, latest_cursor, pulse_config
+                latest_cursor = self._get_latest_cursor_batch(cursor, sequence_channel_list)
+                pulse_config = batch_config.get_parameter(self._get_group_key_from_command(command))[command.name]
+                pulse_waveform: dict[str, np.ndarray] = {}
+                for pulse_channel, channel in command.pulse_channel_to_sequence_channel.items():
+                    pulse_waveform[pulse_channel] = waveform[channel]
+                pulse_duration = self.pulse_library.add_waveform_batch(
+                    command.name, time_slots, latest_cursor, pulse_config, pulse_waveform
                 )
-                for pulse_channel, channel_waveform in pulse_waveform.items():
-                    channel = command.pulse_channel_to_sequence_channel[pulse_channel]
-                    waveform[channel] += channel_waveform
                 self._synchronize_cursor(cursor, sequence_channel_list, latest_cursor + pulse_duration)
-        return waveform, capture_point
+
+    def get_waveform_batch(
+        self,
+        time_slots: np.ndarray,
+        config: Union[SequenceConfig, list[SequenceConfig]],
+        sweep_parameter: Optional[dict[Union[str, tuple[tuple[str, ...], str, str]], np.ndarray]] = None,
+    ) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+        """Generate waveforms of many configs at once
+
+        Parameters that differ among the batch are evaluated as arrays along the first axis,
+        so the commands are replayed only once regardless of the batch size.
+
+        Args:
+            time_slots (np.ndarray): sorted time slots
+            config (Union[SequenceConfig, list[SequenceConfig]]): list of configs, or a base config of sweep
+            sweep_parameter (Optional[dict[Union[str, tuple[tuple[str, ...], str, str]], np.ndarray]]): swept values
+                keyed by (group key, pulse, parameter), or by "{group}.{pulse}.{parameter}" for a single group
+
+        Returns:
+            tuple[dict[str, np.ndarray], dict[str, np.ndarray]]: (N, len(time_slots)) waveforms and
+                (N, #capture) capture points of each channel
+        """
+        _validate_time_slots(time_slots)
+        if isinstance(config, SequenceConfig):
+            if sweep_parameter is None:
+                raise ValueError("sweep_parameter must be provided for a single config")
+            batch_config, num_batch = _sweep_sequence_config(config, sweep_parameter)
+        else:
+            if sweep_parameter is not None:
+                raise ValueError("sweep_parameter cannot be used with a list of configs")
+            if len(config) == 0:
+                raise ValueError("at least one config must be provided")
+            batch_config, num_batch = _stack_sequence_config(config), len(config)
+
+        # intialize
+        cursor: dict[str, Union[float, np.ndarray]] = {}
+        waveform: dict[str, np.ndarray] = {}
+        capture_point: dict[str, list[Union[float, np.ndarray]]] = {}
+        for channel in self._channel_list:
+            cursor[channel] = 0.0
+            waveform[channel] = np.zeros((num_batch, len(time_slots)), dtype=complex)
+            capture_point[channel] = []
+
+        self._replay_command_batch(self._command_list, time_slots, batch_config, cursor, waveform, capture_point)
+
+        capture_point_batch: dict[str, np.ndarray] = {}
+        for channel, point_list in capture_point.items():
+            point_array = np.zeros((num_batch, len(point_list)))
+            for index, point in enumerate(point_list):
+                point_array[:, index] = np.reshape(point, -1)
+            capture_point_batch[channel] = point_array
+        return waveform, capture_point_batch
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 from dataclasses import dataclass
 import sympy as sp
+from mt_pulse.compiled_shape import CompiledShape, ShapeKernel, _broadcast_parameter, _unbounded_support
 
 
 @dataclass(frozen=True, slots=True)
@@ -9,31 +10,50 @@ class Shape:
     name: str
     shape_expr: sp.Expr
     progress_time_ns: sp.Expr
+    support_start_ns: Optional[sp.Expr] = None
+    support_end_ns: Optional[sp.Expr] = None
 
     def __post_init__(self):
         def get_symbol_names(symbol_list: list[sp.Expr]) -> set[str]:
             return set([s.name for s in symbol_list])
 
+        if (self.support_start_ns is None) != (self.support_end_ns is None):
+            raise ValueError("support_start_ns and support_end_ns must be provided together.")
+
         symbol_names = set()
         symbol_names |= get_symbol_names(self.progress_time_ns.free_symbols)
+        if self.support_start_ns is not None and self.support_end_ns is not None:
+            symbol_names |= get_symbol_names(self.support_start_ns.free_symbols)
+            symbol_names |= get_symbol_names(self.support_end_ns.free_symbols)
         if "t" in symbol_names:
             raise ValueError(
                 "variable 't' is registered for time and cannot be used except for shape_expr, but used in description."
             )
 
     def to_json_dict(self) -> dict:
-        return {
+        json_dict = {
             "name": self.name,
             "shape_expr": sp.srepr(self.shape_expr),
             "progress_time_ns": sp.srepr(self.progress_time_ns),
         }
+        if self.support_start_ns is not None and self.support_end_ns is not None:
+            json_dict["support_start_ns"] = sp.srepr(self.support_start_ns)
+            json_dict["support_end_ns"] = sp.srepr(self.support_end_ns)
+        return json_dict
 
     @staticmethod
     def from_json_dict(json_dict: dict) -> Shape:
+        support_start_ns = None
+        support_end_ns = None
+        if "support_start_ns" in json_dict:
+            support_start_ns = sp.sympify(json_dict["support_start_ns"])
+            support_end_ns = sp.sympify(json_dict["support_end_ns"])
         pulse = Shape(
             name=json_dict["name"],
             shape_expr=sp.sympify(json_dict["shape_expr"]),
             progress_time_ns=sp.sympify(json_dict["progress_time_ns"]),
+            support_start_ns=support_start_ns,
+            support_end_ns=support_end_ns,
         )
         return pulse
 
@@ -45,6 +65,9 @@ class Shape:
 
         symbol_names |= get_symbol_names(self.shape_expr.free_symbols)
         symbol_names |= get_symbol_names(self.progress_time_ns.free_symbols)
+        if self.support_start_ns is not None and self.support_end_ns is not None:
+            symbol_names |= get_symbol_names(self.support_start_ns.free_symbols)
+            symbol_names |= get_symbol_names(self.support_end_ns.free_symbols)
         return symbol_names
 
     def get_function(self, variable_dict: dict[str, Any]) -> Callable:
@@ -68,3 +91,66 @@ class Shape:
             raise ValueError(f"{free_symbols} are left as free symbols")
         value = float(value)
         return value
+
+    def get_parameter_name_list(self) -> list[str]:
+        return sorted(self.get_symbol_name_set() - set(["t"]))
+
+    def _get_coefficient_index_list(self, parameter_symbol_list: list[sp.Symbol]) -> tuple[list[int], list[int]]:
+        # parameter is factored out of the shape when dividing by it removes the parameter from the expression,
+        # and shapes of different factors share the envelope evaluated with amplitude 1 and phase 0
+        timing_symbols = self.progress_time_ns.free_symbols
+        if self.support_start_ns is not None and self.support_end_ns is not None:
+            timing_symbols |= self.support_start_ns.free_symbols | self.support_end_ns.free_symbols
+        scale_index_list: list[int] = []
+        phase_index_list: list[int] = []
+        for index, symbol in enumerate(parameter_symbol_list):
+            if symbol in timing_symbols:
+                continue
+            if symbol not in sp.powsimp(sp.piecewise_fold(self.shape_expr / symbol)).free_symbols:
+                scale_index_list.append(index)
+            elif symbol not in sp.powsimp(sp.piecewise_fold(self.shape_expr * sp.exp(-sp.I * symbol))).free_symbols:
+                phase_index_list.append(index)
+        return scale_index_list, phase_index_list
+
+    def compile(self, kernel: Optional[ShapeKernel] = None) -> CompiledShape:
+        free_symbols = self.shape_expr.free_symbols | self.progress_time_ns.free_symbols
+        if self.support_start_ns is not None and self.support_end_ns is not None:
+            free_symbols |= self.support_start_ns.free_symbols | self.support_end_ns.free_symbols
+        symbol_dict = {s.name: s for s in free_symbols}
+        time_symbol = symbol_dict.pop("t", sp.Symbol("t"))
+        parameter_name_list = sorted(symbol_dict.keys())
+        parameter_symbol_list = [symbol_dict[name] for name in parameter_name_list]
+        if kernel is not None and kernel.parameter_name_list != parameter_name_list:
+            raise ValueError(
+                f"kernel parameters {kernel.parameter_name_list} do not match shape parameters {parameter_name_list}"
+            )
+
+        if kernel is not None:
+            time_function = kernel.time_function
+            progress_function = kernel.progress_function
+        else:
+            time_function = _broadcast_parameter(
+                sp.lambdify([time_symbol, *parameter_symbol_list], self.shape_expr, modules="numpy")
+            )
+            progress_function = sp.lambdify(parameter_symbol_list, self.progress_time_ns, modules="numpy")
+
+        if kernel is not None and kernel.support_function is not None:
+            support_function = kernel.support_function
+        elif self.support_start_ns is None or self.support_end_ns is None:
+            support_function = _unbounded_support
+        else:
+            support_expr = (self.support_start_ns, self.support_end_ns)
+            support_function = sp.lambdify(parameter_symbol_list, support_expr, modules="numpy")
+
+        scale_index_list, phase_index_list = self._get_coefficient_index_list(parameter_symbol_list)
+        compiled_shape = CompiledShape(
+            name=self.name,
+            parameter_name_list=parameter_name_list,
+            time_function=time_function,
+            progress_function=progress_function,
+            support_function=support_function,
+            is_zero=bool(self.shape_expr.is_zero),
+            scale_index_list=scale_index_list,
+            phase_index_list=phase_index_list,
+        )
+        return compiled_shape
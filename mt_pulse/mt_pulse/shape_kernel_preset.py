@@ -0,0 +1,66 @@
+import numpy as np
+
+# gaussian is truncated at this multiple of FWHM, where the envelope is below 2^-64
+_gaussian_support_coef = 4.0
+
+
+# numpy kernels of preset shapes, which take parameters in the alphabetical order of names
+def _blank_function(t: np.ndarray, width: float) -> np.ndarray:
+    return np.zeros(np.broadcast(t, width).shape, dtype=complex)
+
+
+def _blank_progress(width: float) -> float:
+    return width
+
+
+def _gaussian_function(t: np.ndarray, amplitude: float, phase: float, width: float) -> np.ndarray:
+    inv_var = 4.0 * np.log(2.0) / width**2
+    return (amplitude * np.exp(1.0j * phase)) * np.exp(-inv_var * t**2)
+
+
+def _gaussian_drag_function(t: np.ndarray, amplitude: float, drag: float, phase: float, width: float) -> np.ndarray:
+    inv_var = 4.0 * np.log(2.0) / width**2
+    return (amplitude * np.exp(1.0j * phase)) * np.exp(-inv_var * t**2) * (1.0 + (2.0j * drag * inv_var) * t)
+
+
+def _gaussian_progress(*args: float) -> float:
+    return 0.0
+
+
+def _gaussian_support(*args: float) -> tuple[float, float]:
+    width = args[-1]
+    return -_gaussian_support_coef * width, _gaussian_support_coef * width
+
+
+def _flattop_function(t: np.ndarray, amplitude: float, phase: float, width: float) -> np.ndarray:
+    return np.where((0 < t) & (t < width), amplitude * np.exp(1.0j * phase), 0.0)
+
+
+def _flattop_progress(amplitude: float, phase: float, width: float) -> float:
+    return width
+
+
+def _flattop_support(amplitude: float, phase: float, width: float) -> tuple[float, float]:
+    return 0.0, width
+
+
+def _flattop_cosrise_function(
+    t: np.ndarray, amplitude: float, phase: float, risetime: float, width: float
+) -> np.ndarray:
+    t, risetime, width = np.broadcast_arrays(t, risetime, width)
+    is_rise = (-risetime / 2 < t) & (t < np.minimum(risetime / 2, width / 2))
+    is_fall = (np.maximum(width - risetime / 2, width / 2) < t) & (t < width + risetime / 2) & ~is_rise
+    envelope = np.where((0 < t) & (t < width), 1.0, 0.0)
+    envelope[is_rise] = (1.0 - np.cos((t[is_rise] + risetime[is_rise] / 2) / risetime[is_rise] * np.pi)) / 2
+    envelope[is_fall] = (
+        1.0 - np.cos((width[is_fall] + risetime[is_fall] / 2 - t[is_fall]) / risetime[is_fall] * np.pi)
+    ) / 2
+    return (amplitude * np.exp(1.0j * phase)) * envelope
+
+
+def _flattop_cosrise_progress(amplitude: float, phase: float, risetime: float, width: float) -> float:
+    return width
+
+
+def _flattop_cosrise_support(amplitude: float, phase: float, risetime: float, width: float) -> tuple[float, float]:
+    return -risetime / 2, width + risetime / 2
@@ -1,16 +1,81 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 import numpy as np
 from mt_pulse.shape import Shape
+from mt_pulse.compiled_shape import ShapeKernel, CompiledShape
+from mt_pulse.kernel_cache import register_kernel_module
+
+# shape name -> (reference shape, numpy kernel equivalent to the reference shape)
+_shape_kernel_registry: dict[str, tuple[Shape, ShapeKernel]] = {}
+
+
+def _validate_kernel(shape: Shape, kernel: ShapeKernel) -> None:
+    parameter_name_list = shape.get_parameter_name_list()
+    if kernel.parameter_name_list != parameter_name_list:
+        raise ValueError(
+            f"kernel parameters {kernel.parameter_name_list} do not match shape parameters {parameter_name_list}"
+        )
+    # kernels are loaded from cache files and binary payloads by reference to their modules
+    for function in [kernel.time_function, kernel.progress_function, kernel.support_function]:
+        if function is not None and hasattr(function, "__module__"):
+            register_kernel_module(function.__module__)
+
+
+def register_shape_kernel(shape: Shape, kernel: ShapeKernel) -> None:
+    """Register hand-written numpy kernel of shape
+
+    The kernel is used when a shape library compiles a shape identical to the registered one,
+    while sympy expression of the shape is kept as the reference and serialization form.
+
+    Args:
+        shape (Shape): reference shape
+        kernel (ShapeKernel): numpy kernel that takes parameters in the order of shape.get_parameter_name_list()
+    """
+    _validate_kernel(shape, kernel)
+    _shape_kernel_registry[shape.name] = (shape, kernel)
+
+
+def find_shape_kernel(shape: Shape) -> Optional[ShapeKernel]:
+    if shape.name not in _shape_kernel_registry:
+        return None
+    reference_shape, kernel = _shape_kernel_registry[shape.name]
+    if reference_shape != shape:
+        return None
+    return kernel
 
 
 @dataclass(frozen=True, slots=True)
 class ShapeLibrary:
     _shape_dict: dict[str, Shape] = field(default_factory=dict)
+    _kernel_dict: dict[str, ShapeKernel] = field(default_factory=dict)
+    _compiled_shape_dict: dict[str, CompiledShape] = field(default_factory=dict)
+    # incremented when a shape or kernel is replaced, so that pulse libraries drop pulses compiled before
+    _version: list[int] = field(default_factory=lambda: [0], compare=False, repr=False)
+
+    def get_version(self) -> int:
+        return self._version[0]
 
     def add_shape(self, pulse: Shape) -> None:
         self._shape_dict[pulse.name] = pulse
+        self._kernel_dict.pop(pulse.name, None)
+        self._compiled_shape_dict.pop(pulse.name, None)
+        self._version[0] += 1
+
+    def add_kernel(self, pulse_name: str, kernel: ShapeKernel) -> None:
+        if pulse_name not in self._shape_dict:
+            raise ValueError(f"pulse {pulse_name} not defined")
+        _validate_kernel(self._shape_dict[pulse_name], kernel)
+        self._kernel_dict[pulse_name] = kernel
+        self._compiled_shape_dict.pop(pulse_name, None)
+        self._version[0] += 1
+
+    def get_kernel(self, pulse_name: str) -> Optional[ShapeKernel]:
+        if pulse_name not in self._shape_dict:
+            raise ValueError(f"pulse {pulse_name} not defined")
+        if pulse_name in self._kernel_dict:
+            return self._kernel_dict[pulse_name]
+        return find_shape_kernel(self._shape_dict[pulse_name])
 
     def get_shape_name_list(self) -> list[str]:
         return list(self._shape_dict.keys())
@@ -27,6 +92,14 @@ class ShapeLibrary:
         value = self._shape_dict[pulse_name].get_progress(variable_dict)
         return value
 
+    def compile(self, pulse_name: str) -> CompiledShape:
+        if pulse_name not in self._shape_dict:
+            raise ValueError(f"pulse {pulse_name} not defined")
+        if pulse_name not in self._compiled_shape_dict:
+            kernel = self.get_kernel(pulse_name)
+            self._compiled_shape_dict[pulse_name] = self._shape_dict[pulse_name].compile(kernel)
+        return self._compiled_shape_dict[pulse_name]
+
     def to_json_dict(self) -> dict:
         shape_dict = {}
         for name, shape in self._shape_dict.items():
@@ -1,6 +1,21 @@
 import sympy as sp
-from mt_pulse.shape import Shape
-from mt_pulse.shape_library import ShapeLibrary
+from mt_pulse.shape import Shape, ShapeKernel
+from mt_pulse.shape_library import ShapeLibrary, register_shape_kernel
+from mt_pulse.shape_kernel_preset import (
+    _gaussian_support_coef,
+    _blank_function,
+    _blank_progress,
+    _gaussian_function,
+    _gaussian_drag_function,
+    _gaussian_progress,
+    _gaussian_support,
+    _flattop_function,
+    _flattop_progress,
+    _flattop_support,
+    _flattop_cosrise_function,
+    _flattop_cosrise_progress,
+    _flattop_cosrise_support,
+)
 
 
 def blank() -> Shape:
@@ -32,6 +47,8 @@ def gaussian() -> Shape:
         name=name,
         shape_expr=shape,
         progress_time_ns=zero,
+        support_start_ns=-_gaussian_support_coef * width,
+        support_end_ns=_gaussian_support_coef * width,
     )
     return shape
 
@@ -54,6 +71,8 @@ def gaussian_drag() -> Shape:
         name=name,
         shape_expr=shape,
         progress_time_ns=zero,
+        support_start_ns=-_gaussian_support_coef * width,
+        support_end_ns=_gaussian_support_coef * width,
     )
     return shape
 
@@ -74,6 +93,8 @@ def flattop() -> Shape:
         name=name,
         shape_expr=shape,
         progress_time_ns=width,
+        support_start_ns=sp.Float(0),
+        support_end_ns=width,
     )
     return shape
 
@@ -103,10 +124,38 @@ def flattop_cosrise() -> Shape:
         name=name,
         shape_expr=shape,
         progress_time_ns=width,
+        support_start_ns=-risetime / 2,
+        support_end_ns=width + risetime / 2,
     )
     return shape
 
 
+register_shape_kernel(blank(), ShapeKernel(["width"], _blank_function, _blank_progress))
+register_shape_kernel(
+    gaussian(),
+    ShapeKernel(["amplitude", "phase", "width"], _gaussian_function, _gaussian_progress, _gaussian_support),
+)
+register_shape_kernel(
+    gaussian_drag(),
+    ShapeKernel(
+        ["amplitude", "drag", "phase", "width"], _gaussian_drag_function, _gaussian_progress, _gaussian_support
+    ),
+)
+register_shape_kernel(
+    flattop(),
+    ShapeKernel(["amplitude", "phase", "width"], _flattop_function, _flattop_progress, _flattop_support),
+)
+register_shape_kernel(
+    flattop_cosrise(),
+    ShapeKernel(
+        ["amplitude", "phase", "risetime", "width"],
+        _flattop_cosrise_function,
+        _flattop_cosrise_progress,
+        _flattop_cosrise_support,
+    ),
+)
+
+
 def get_preset_shape_library() -> ShapeLibrary:
     shape_lib = ShapeLibrary()
     shape_list = [blank(), gaussian(), gaussian_drag(), flattop(), flattop_cosrise()]
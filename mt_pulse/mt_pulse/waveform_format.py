@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+
+# int16_iq waveform is (#sample, 2) int16 array of I and Q, where full_scale amplitude is mapped to 32767
+_INT16_IQ_ = "int16_iq"
+_waveform_dtype_list = ["complex128", "complex64", _INT16_IQ_]
+_int16_max = np.iinfo(np.int16).max
+
+
+def _validate_waveform_dtype(dtype: str) -> None:
+    if dtype not in _waveform_dtype_list:
+        raise ValueError(f"dtype {dtype} is not supported, choose from {_waveform_dtype_list}")
+
+
+def _get_waveform_shape(num_sample: int, dtype: str) -> tuple[int, ...]:
+    if dtype == _INT16_IQ_:
+        return (num_sample, 2)
+    return (num_sample,)
+
+
+def _get_numpy_dtype(dtype: str) -> np.dtype:
+    if dtype == _INT16_IQ_:
+        return np.dtype(np.int16)
+    return np.dtype(dtype)
+
+
+def _get_output_waveform_dict(
+    channel_list: list[str], num_sample: int, dtype: str, out: Optional[dict[str, np.ndarray]]
+) -> dict[str, np.ndarray]:
+    # zero-filled output buffers, where caller-provided buffers are validated and reused
+    _validate_waveform_dtype(dtype)
+    shape = _get_waveform_shape(num_sample, dtype)
+    numpy_dtype = _get_numpy_dtype(dtype)
+    if out is None:
+        return {channel: np.zeros(shape, dtype=numpy_dtype) for channel in channel_list}
+
+    waveform_dict: dict[str, np.ndarray] = {}
+    for channel in channel_list:
+        if channel not in out:
+            raise ValueError(f"output buffer of channel {channel} is not provided")
+        buffer = out[channel]
+        if buffer.shape != shape or buffer.dtype != numpy_dtype:
+            raise ValueError(
+                f"output buffer of channel {channel} must be {numpy_dtype} array of shape {shape}, "
+                f"but {buffer.dtype} array of shape {buffer.shape} is provided"
+            )
+        buffer.fill(0)
+        waveform_dict[channel] = buffer
+    return waveform_dict
+
+
+def _convert_to_int16_iq(waveform: np.ndarray, full_scale: float, out: np.ndarray) -> None:
+    if full_scale <= 0:
+        raise ValueError(f"full_scale must be positive, but {full_scale} is provided")
+    if len(waveform) > 0:
+        peak = max(np.max(np.abs(waveform.real)), np.max(np.abs(waveform.imag)))
+        if peak > full_scale:
+            raise ValueError(f"waveform amplitude {peak} exceeds full scale {full_scale}")
+    scale = _int16_max / full_scale
+    np.copyto(out[:, 0], np.rint(waveform.real * scale), casting="unsafe")
+    np.copyto(out[:, 1], np.rint(waveform.imag * scale), casting="unsafe")
@@ -0,0 +1,361 @@
+"""Waveform render benchmark of template sequences
+
+Run from the mt_pulse directory, and compare with a result of another commit
+
+    python -m tests.benchmark_render --output result.json --baseline baseline.json
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Optional
+import argparse
+import cProfile
+import json
+import platform
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from mt_pulse.compiled_pulse import CompiledPulse, RenderedPulse
+from mt_pulse.pulse_preset import get_preset_pulse_library
+from mt_pulse.sequence import Sequence
+
+_default_num_qubit_list = [16, 64, 144]
+# modules imported by runtime workers, which do not import sympy, and by authoring scripts
+_runtime_module_list = ["mt_pulse.sequence", "mt_pulse.compiled_pulse_library"]
+_authoring_module_list = ["mt_pulse.sequence", "mt_pulse.pulse_preset"]
+
+_import_time_script = """
+import sys
+import time
+start = time.perf_counter()
+for module_name in sys.argv[1:]:
+    __import__(module_name)
+print(time.perf_counter() - start)
+"""
+_sample_interval = 0.5
+_capture_duration = 1000.0
+
+
+def _index_to_position(index: int, chip_width: int) -> tuple[int, int]:
+    # qubits are grouped into 2x2 muxes as in the lattice of generate_template
+    mux_index, index_in_mux = divmod(index, 4)
+    mux_y, mux_x = divmod(mux_index, chip_width // 2)
+    return mux_x * 2 + index_in_mux % 2, mux_y * 2 + index_in_mux // 2
+
+
+def _get_cross_resonance_pair_list(num_qubit: int) -> list[tuple[int, int]]:
+    # low-frequency qubits drive their nearest neighbors
+    chip_width = int(np.sqrt(num_qubit))
+    position_to_index = {_index_to_position(index, chip_width): index for index in range(num_qubit)}
+    pair_list = []
+    for control_index in range(num_qubit):
+        if control_index % 4 not in [0, 3]:
+            continue
+        x, y = _index_to_position(control_index, chip_width)
+        for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+            if (x + dx, y + dy) in position_to_index:
+                pair_list.append((control_index, position_to_index[(x + dx, y + dy)]))
+    return pair_list
+
+
+def create_template_sequence(num_qubit: int, depth: int) -> Sequence:
+    """Create sequence with channels of generate_template and layers of HPI on all qubits and TPCX on all pairs
+
+    Args:
+        num_qubit (int): number of qubits, which is the square of an even number
+        depth (int): number of layers before measurement
+
+    Returns:
+        Sequence: template sequence with the preset pulse library
+    """
+    chip_width = int(np.sqrt(num_qubit))
+    if chip_width**2 != num_qubit or chip_width % 2 == 1:
+        raise ValueError(f"num_qubit must be square of an even number, but {num_qubit} is provided")
+    sequence = Sequence(get_preset_pulse_library())
+    for qubit_index in range(num_qubit):
+        sequence.add_channel(f"Q{qubit_index}_qubit", f"Q{qubit_index}")
+        sequence.add_channel(f"Q{qubit_index}_resonator", f"Q{qubit_index}")
+    pair_list = _get_cross_resonance_pair_list(num_qubit)
+    for control_index, target_index in pair_list:
+        sequence.add_channel(f"Q{control_index}_Q{target_index}_CR", f"Q{control_index}")
+
+    for _ in range(depth):
+        for qubit_index in range(num_qubit):
+            sequence.add_pulse("HPI", {"qubit": f"Q{qubit_index}_qubit"})
+        sequence.add_synchronize_all_command()
+        for control_index, target_index in pair_list:
+            channel_map = {"control": f"Q{control_index}_Q{target_index}_CR", "target": f"Q{target_index}_qubit"}
+            sequence.add_pulse("TPCX", channel_map)
+        sequence.add_synchronize_all_command()
+    resonator_channel_list = [f"Q{qubit_index}_resonator" for qubit_index in range(num_qubit)]
+    sequence.add_capture_command(resonator_channel_list)
+    for resonator_channel in resonator_channel_list:
+        sequence.add_pulse("MEAS", {"resonator": resonator_channel})
+    return sequence
+
+
+def _get_cumulative_time(profile: cProfile.Profile, function_list: list[Callable[..., Any]]) -> float:
+    # cumulative time of the outermost calls of the functions
+    code_set = {(function.__code__.co_filename, function.__code__.co_firstlineno) for function in function_list}
+    name_set = {function.__code__.co_name for function in function_list}
+    cumulative_time = 0.0
+    for (filename, lineno, name), (_, _, _, cumtime, caller_dict) in pstats.Stats(profile).stats.items():
+        if (filename, lineno) not in code_set or name not in name_set:
+            continue
+        # calls from the listed functions are already included in the time of their callers
+        inner_cumtime = sum([caller[3] for key, caller in caller_dict.items() if key[:2] in code_set])
+        cumulative_time += cumtime - inner_cumtime
+    return cumulative_time
+
+
+def _profile(function: Callable[[], Any]) -> tuple[float, cProfile.Profile]:
+    profile = cProfile.Profile()
+    start = time.perf_counter()
+    profile.enable()
+    function()
+    profile.disable()
+    return time.perf_counter() - start, profile
+
+
+def run_benchmark(num_qubit: int, depth: int = 2, repeat: int = 3) -> dict[str, Any]:
+    """Measure compile and render of a template sequence
+
+    Args:
+        num_qubit (int): number of qubits
+        depth (int): number of layers before measurement
+        repeat (int): number of timed renders, where the best is reported
+
+    Returns:
+        dict[str, Any]: times in seconds, peak memory in bytes, and per-stage breakdown of the profiled run
+    """
+    from sympy.utilities.lambdify import lambdify
+
+    sequence = create_template_sequence(num_qubit, depth)
+    pulse_library = sequence.pulse_library
+
+    # pulse library compile is split into symbolic manipulation and lambdify
+    compile_time, compile_profile = _profile(pulse_library.compile)
+    lambdify_time = _get_cumulative_time(compile_profile, [lambdify])
+
+    config = sequence.get_config()
+    schedule_time, _ = _profile(lambda: sequence.compile(config))
+    time_slots = np.arange(0, sequence.get_duration(config, _capture_duration), _sample_interval)
+
+    def render() -> None:
+        pulse_library.render_cache.clear()
+        sequence.invalidate_render_state()
+        sequence.get_waveform(time_slots, config)
+
+    render_time_list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        render_time_list.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    sequence.get_waveform(time_slots, config)
+    warm_render_time = time.perf_counter() - start
+
+    # render is split into numeric evaluation of shapes and accumulation of rendered pulses into waveforms
+    profiled_render_time, render_profile = _profile(render)
+    numeric_time = _get_cumulative_time(render_profile, [CompiledPulse.add_waveform])
+    accumulation_time = _get_cumulative_time(render_profile, [RenderedPulse.add_to])
+
+    tracemalloc.start()
+    render()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timeline = sequence.compile(config)
+    return {
+        "num_qubit": num_qubit,
+        "depth": depth,
+        "num_channel": len(timeline.channel_list),
+        "num_pulse": len(timeline.start),
+        "num_sample": len(time_slots),
+        "render_time": min(render_time_list),
+        "warm_render_time": warm_render_time,
+        "peak_memory": peak_memory,
+        "stage": {
+            "symbolic": compile_time - lambdify_time,
+            "lambdify": lambdify_time,
+            "schedule": schedule_time,
+            "numeric": numeric_time,
+            "accumulation": accumulation_time,
+            "other": profiled_render_time - numeric_time - accumulation_time,
+        },
+        "render_cache": pulse_library.render_cache.get_statistics(),
+    }
+
+
+def run_pulse_benchmark(repeat: int = 3) -> dict[str, float]:
+    """Measure Pulse.get_waveform of each preset pulse on a grid covering the pulse
+
+    Args:
+        repeat (int): number of timed evaluations, where the best is reported
+
+    Returns:
+        dict[str, float]: time in seconds of each pulse
+    """
+    pulse_library = get_preset_pulse_library()
+    time_slots = np.arange(0, 2000, _sample_interval)
+    pulse_time_dict = {}
+    for pulse_name in pulse_library.get_pulse_name_list():
+        pulse = pulse_library._pulse_dict[pulse_name]
+        config = pulse_library.get_config(pulse_name)
+        time_list = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pulse.get_waveform(time_slots, 0.0, config, pulse_library.shape_library)
+            time_list.append(time.perf_counter() - start)
+        pulse_time_dict[pulse_name] = min(time_list)
+    return pulse_time_dict
+
+
+def run_fractional_shift_benchmark(
+    num_channel: int = 8, num_pulse: int = 300, repeat: int = 3, seed: int = 0
+) -> dict[str, float]:
+    """Measure HPI pulses at random sub-sample starts by direct evaluation and by fractional delay
+
+    Args:
+        num_channel (int): number of channels
+        num_pulse (int): number of pulses on each channel
+        repeat (int): number of timed renders, where the best is reported
+        seed (int): seed of random state
+
+    Returns:
+        dict[str, float]: times in seconds of both modes, and maximum absolute deviation of fractional delay
+    """
+    pulse_library = get_preset_pulse_library()
+    config = pulse_library.get_config("HPI")
+    random_state = np.random.RandomState(seed)
+    _, duration = pulse_library.get_waveform("HPI", np.zeros(1), 0.0, config)
+    cursor_list = np.cumsum(duration + random_state.uniform(0, 10, size=(num_channel, num_pulse)), axis=1)
+    time_slots = np.arange(0, np.max(cursor_list) + duration, _sample_interval)
+
+    def render() -> list[np.ndarray]:
+        pulse_library.render_cache.clear()
+        waveform_list = []
+        for channel_cursor_list in cursor_list:
+            waveform_dict = {"qubit": np.zeros_like(time_slots, dtype=complex)}
+            for cursor in channel_cursor_list:
+                pulse_library.add_waveform("HPI", time_slots, cursor, config, waveform_dict, _sample_interval)
+            waveform_list.append(waveform_dict["qubit"])
+        return waveform_list
+
+    result: dict[str, float] = {}
+    waveform_list_dict = {}
+    for name, fractional_shift_error in [("direct_time", None), ("shift_time", 1e-3)]:
+        pulse_library.render_cache.fractional_shift_error = fractional_shift_error
+        time_list = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            waveform_list_dict[name] = render()
+            time_list.append(time.perf_counter() - start)
+        result[name] = min(time_list)
+    waveform_pair_list = zip(waveform_list_dict["direct_time"], waveform_list_dict["shift_time"])
+    result["max_deviation"] = max(
+        [float(np.max(np.abs(direct - shift))) for direct, shift in waveform_pair_list]
+    )
+    return result
+
+
+def run_import_benchmark(repeat: int = 3) -> dict[str, float]:
+    """Measure import time of runtime and authoring modules in fresh interpreters
+
+    Args:
+        repeat (int): number of timed imports, where the best is reported
+
+    Returns:
+        dict[str, float]: time in seconds of runtime and authoring imports
+    """
+    import_time_dict = {}
+    for name, module_name_list in [("runtime", _runtime_module_list), ("authoring", _authoring_module_list)]:
+        time_list = []
+        for _ in range(repeat):
+            result = subprocess.run(
+                [sys.executable, "-c", _import_time_script, *module_name_list],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            time_list.append(float(result.stdout))
+        import_time_dict[name] = min(time_list)
+    return import_time_dict
+
+
+def _get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark_suite(num_qubit_list: list[int], depth: int = 2, repeat: int = 3) -> dict[str, Any]:
+    return {
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "import_time": run_import_benchmark(repeat),
+        "pulse_time": run_pulse_benchmark(repeat),
+        "fractional_shift": run_fractional_shift_benchmark(repeat=repeat),
+        "result_list": [run_benchmark(num_qubit, depth, repeat) for num_qubit in num_qubit_list],
+    }
+
+
+def compare_benchmark(result: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    # ratio of render time and peak memory to the baseline for each number of qubits
+    baseline_dict = {(item["num_qubit"], item["depth"]): item for item in baseline["result_list"]}
+    line_list = []
+    for item in result["result_list"]:
+        key = (item["num_qubit"], item["depth"])
+        if key not in baseline_dict:
+            continue
+        base = baseline_dict[key]
+        line_list.append(
+            f"{item['num_qubit']:4d} qubits: render time x{item['render_time'] / base['render_time']:.2f}, "
+            f"peak memory x{item['peak_memory'] / base['peak_memory']:.2f}"
+        )
+    return line_list
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-qubit", type=int, nargs="+", default=_default_num_qubit_list)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=str, default=None, help="path of JSON result")
+    parser.add_argument("--baseline", type=str, default=None, help="path of JSON result to compare with")
+    args = parser.parse_args()
+
+    result = run_benchmark_suite(args.num_qubit, args.depth, args.repeat)
+    import_time = result["import_time"]
+    print(", ".join([f"import time of {name} {value * 1e3:.1f}ms" for name, value in import_time.items()]))
+    print(", ".join([f"{name} {value * 1e3:.2f}ms" for name, value in result["pulse_time"].items()]))
+    fractional_shift = result["fractional_shift"]
+    print(
+        f"fractional shift: direct {fractional_shift['direct_time']:.3f}s, "
+        f"shift {fractional_shift['shift_time']:.3f}s, max deviation {fractional_shift['max_deviation']:.1e}"
+    )
+    for item in result["result_list"]:
+        stage = ", ".join([f"{name} {value:.3f}s" for name, value in item["stage"].items()])
+        print(
+            f"{item['num_qubit']:4d} qubits: {item['num_pulse']} pulses on {item['num_channel']} channels, "
+            f"render {item['render_time']:.3f}s (warm {item['warm_render_time']:.3f}s), "
+            f"peak memory {item['peak_memory'] / 2**20:.1f}MiB, {stage}"
+        )
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        for line in compare_benchmark(result, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import json
+from tests.benchmark_render import compare_benchmark, create_template_sequence, run_benchmark_suite
+
+
+def test_template_sequence():
+    sequence = create_template_sequence(16, depth=1)
+    timeline = sequence.compile(sequence.get_config())
+    # qubit and resonator channels of 16 qubits, and CR channels of 24 pairs
+    assert len(timeline.channel_list) == 56
+    assert len(timeline.start) == 16 + 24 + 16
+
+
+def test_benchmark_suite():
+    result = run_benchmark_suite([16], depth=1, repeat=1)
+    result = json.loads(json.dumps(result))
+    item = result["result_list"][0]
+    assert item["render_time"] > 0 and item["peak_memory"] > 0
+    assert set(item["stage"]) == {"symbolic", "lambdify", "schedule", "numeric", "accumulation", "other"}
+    assert set(result["import_time"]) == {"runtime", "authoring"}
+    assert result["fractional_shift"]["max_deviation"] <= 1e-3
+    assert set(result["pulse_time"]) == {"BLANK", "FLATTOP", "HPI", "CR", "MEAS", "TPCX"}
+    assert compare_benchmark(result, result) == ["  16 qubits: render time x1.00, peak memory x1.00"]
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+import numpy as np
+from mt_pulse.pulse_preset import get_preset_pulse_library
+from mt_pulse.sequence import Sequence, SequenceConfig
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary
+
+
+def _create_sequence() -> Sequence:
+    seq = Sequence(get_preset_pulse_library())
+    for qubit_index in range(2):
+        seq.add_channel(f"Q{qubit_index}_qubit", channel_group=f"Q{qubit_index}")
+        seq.add_channel(f"Q{qubit_index}_resonator", channel_group=f"Q{qubit_index}")
+    seq.add_channel("Q0_cr", channel_group="Q0")
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    seq.add_pulse("HPI", {"qubit": "Q1_qubit"})
+    seq.add_synchronize_all_command()
+    seq.add_pulse("TPCX", {"control": "Q0_cr", "target": "Q1_qubit"})
+    seq.add_synchronize_all_command()
+    seq.add_capture_command(["Q0_resonator", "Q1_resonator"])
+    seq.add_pulse("MEAS", {"resonator": "Q0_resonator"})
+    seq.add_pulse("MEAS", {"resonator": "Q1_resonator"})
+    return seq
+
+
+# runtime worker that loads precompiled artifacts and renders a sequence
+_runtime_script = """
+import json
+import sys
+import numpy as np
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary
+from mt_pulse.sequence import Sequence, SequenceConfig
+
+directory = sys.argv[1]
+with open(f"{directory}/pulse_library.bin", "rb") as file:
+    pulse_library = CompiledPulseLibrary.from_bytes(file.read())
+with open(f"{directory}/sequence.bin", "rb") as file:
+    seq = Sequence.from_bytes(file.read(), pulse_library)
+with open(f"{directory}/config.json") as file:
+    config = SequenceConfig.from_json_dict(json.load(file))
+time_slots = np.arange(0, seq.get_duration(config, 100), 2.0)
+waveform, _ = seq.get_waveform(time_slots, config)
+np.savez(f"{directory}/waveform.npz", **waveform)
+print("sympy" in sys.modules)
+"""
+
+
+def test_compiled_pulse_library_serialization():
+    pulse_lib = get_preset_pulse_library()
+    compiled_lib = CompiledPulseLibrary.from_bytes(pulse_lib.to_compiled().to_bytes())
+    assert compiled_lib.get_content_hash() == pulse_lib.get_content_hash()
+    assert compiled_lib.get_pulse_name_list() == pulse_lib.get_pulse_name_list()
+    time_slots = np.arange(0, 1000, 2.0)
+    for pulse_name in pulse_lib.get_pulse_name_list():
+        config = pulse_lib.get_config(pulse_name)
+        assert compiled_lib.get_config(pulse_name) == config
+        waveform_ref, duration_ref = pulse_lib.get_waveform(pulse_name, time_slots, 100.0, config)
+        waveform, duration = compiled_lib.get_waveform(pulse_name, time_slots, 100.0, config)
+        assert np.isclose(duration, duration_ref)
+        for channel in waveform_ref:
+            assert np.allclose(waveform[channel], waveform_ref[channel])
+
+
+def test_runtime_without_sympy(tmp_path):
+    seq = _create_sequence()
+    config = seq.get_config()
+    config.get_parameter(("Q1",))["HPI"]["hpi_phase"] = 0.3
+    (tmp_path / "pulse_library.bin").write_bytes(seq.pulse_library.to_compiled().to_bytes())
+    (tmp_path / "sequence.bin").write_bytes(seq.to_bytes())
+    (tmp_path / "config.json").write_text(json.dumps(config.to_json_dict()))
+    result = subprocess.run(
+        [sys.executable, "-c", _runtime_script, str(tmp_path)], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+    time_slots = np.arange(0, seq.get_duration(config, 100), 2.0)
+    waveform_ref, _ = seq.get_waveform(time_slots, config)
+    waveform = np.load(tmp_path / "waveform.npz")
+    for channel in waveform_ref:
+        assert np.allclose(waveform[channel], waveform_ref[channel])
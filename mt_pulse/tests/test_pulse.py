@@ -0,0 +1,221 @@
+import json
+import numpy as np
+import pytest
+from mt_pulse.pulse_preset import get_preset_pulse_library
+from mt_pulse.shape import Shape
+from mt_pulse.compiled_pulse_library import CompiledPulseLibrary
+
+
+def _get_random_config(pulse_lib, pulse_name, random_state):
+    config = pulse_lib.get_config(pulse_name)
+    for key in config:
+        if "phase" in key:
+            config[key] = random_state.uniform(-np.pi, np.pi)
+        elif "amplitude" in key:
+            config[key] = random_state.uniform(0.1, 1.0)
+        else:
+            config[key] = config[key] * random_state.uniform(0.5, 1.5)
+    return config
+
+
+def test_compiled_pulse_equivalence():
+    pulse_lib = get_preset_pulse_library()
+    random_state = np.random.RandomState(0)
+    time_slots = np.arange(0, 2000, 2.0)
+    for pulse_name in pulse_lib.get_pulse_name_list():
+        pulse = pulse_lib._pulse_dict[pulse_name]
+        for _ in range(3):
+            config = _get_random_config(pulse_lib, pulse_name, random_state)
+            cursor = random_state.uniform(0, 500)
+            waveform_ref, duration_ref = pulse.get_waveform(time_slots, cursor, config, pulse_lib.shape_library)
+            waveform, duration = pulse_lib.get_waveform(pulse_name, time_slots, cursor, config)
+            assert np.isclose(duration, duration_ref)
+            duration_ref = pulse.get_duration(config, pulse_lib.shape_library)
+            assert np.isclose(pulse_lib.get_duration(pulse_name, config), duration_ref)
+            for channel in waveform_ref:
+                assert np.allclose(waveform[channel], waveform_ref[channel])
+
+
+def test_compile_once():
+    pulse_lib = get_preset_pulse_library()
+    compiled_dict = pulse_lib.compile()
+    assert set(compiled_dict.keys()) == set(pulse_lib.get_pulse_name_list())
+    for pulse_name, compiled_pulse in compiled_dict.items():
+        assert pulse_lib.get_compiled_pulse(pulse_name) is compiled_pulse
+
+    # replacing shapes drops compiled and rendered pulses
+    time_slots = np.arange(0, 200, 2.0)
+    config = pulse_lib.get_config("HPI")
+    waveform = {channel: np.zeros_like(time_slots, dtype=complex) for channel in pulse_lib.get_channel_list("HPI")}
+    pulse_lib.add_waveform("HPI", time_slots, 0.0, config, waveform, sample_interval=2.0)
+    for shape_name in pulse_lib.shape_library.get_shape_name_list():
+        shape = pulse_lib.shape_library._shape_dict[shape_name]
+        doubled_shape = Shape(
+            shape.name, 2 * shape.shape_expr, shape.progress_time_ns, shape.support_start_ns, shape.support_end_ns
+        )
+        pulse_lib.shape_library.add_shape(doubled_shape)
+    assert pulse_lib.get_compiled_pulse("HPI") is not compiled_dict["HPI"]
+    waveform_doubled = {channel: np.zeros_like(time_slots, dtype=complex) for channel in waveform}
+    pulse_lib.add_waveform("HPI", time_slots, 0.0, config, waveform_doubled, sample_interval=2.0)
+    for channel in waveform:
+        assert np.allclose(waveform_doubled[channel], 2 * waveform[channel])
+        assert not np.allclose(waveform[channel], 0)
+
+
+def test_render_cache():
+    pulse_lib = get_preset_pulse_library()
+    time_slots = np.arange(0, 1000, 2.0)
+    config = pulse_lib.get_config("TPCX")
+    # cursors with fractional sample phase and pulses clipped at both edges
+    cursor_list = [-100.0, 0.0, 3.3, 103.3, 250.0, 900.0, 253.3]
+    for cursor in cursor_list:
+        waveform_ref, duration_ref = pulse_lib.get_waveform("TPCX", time_slots, cursor, config)
+        waveform = {channel: np.zeros_like(time_slots, dtype=complex) for channel in waveform_ref}
+        duration = pulse_lib.add_waveform("TPCX", time_slots, cursor, config, waveform, sample_interval=2.0)
+        assert np.isclose(duration, duration_ref)
+        for channel in waveform_ref:
+            assert np.allclose(waveform[channel], waveform_ref[channel])
+    statistics = pulse_lib.render_cache.get_statistics()
+    assert statistics["miss_count"] == 2
+    assert statistics["hit_count"] == len(cursor_list) - 2
+
+
+def test_render_cache_eviction():
+    pulse_lib = get_preset_pulse_library()
+    time_slots = np.arange(0, 1000, 2.0)
+    config = pulse_lib.get_config("MEAS")
+    waveform = {"resonator": np.zeros_like(time_slots, dtype=complex)}
+    pulse_lib.add_waveform("MEAS", time_slots, 0.0, config, waveform, sample_interval=2.0)
+    entry_bytes = pulse_lib.render_cache.total_bytes
+    pulse_lib.render_cache.max_bytes = entry_bytes * 2
+    for width in [100, 200, 300, 400]:
+        config["meas_width"] = width
+        pulse_lib.add_waveform("MEAS", time_slots, 0.0, config, waveform, sample_interval=2.0)
+    statistics = pulse_lib.render_cache.get_statistics()
+    assert statistics["total_bytes"] <= statistics["max_bytes"]
+    assert 0 < statistics["num_entry"] < 5
+
+
+def test_render_cache_fractional_shift():
+    pulse_lib = get_preset_pulse_library()
+    pulse_lib.render_cache.fractional_shift_error = 1e-3
+    time_slots = np.arange(0, 1000, 0.5)
+    for pulse_name in ["TPCX", "MEAS", "FLATTOP"]:
+        config = pulse_lib.get_config(pulse_name)
+        for cursor in [100.0, 101.1, 102.25, 103.7]:
+            waveform_ref, _ = pulse_lib.get_waveform(pulse_name, time_slots, cursor, config)
+            waveform = {channel: np.zeros_like(time_slots, dtype=complex) for channel in waveform_ref}
+            pulse_lib.add_waveform(pulse_name, time_slots, cursor, config, waveform, sample_interval=0.5)
+            for channel in waveform_ref:
+                assert np.max(np.abs(waveform[channel] - waveform_ref[channel])) <= 1e-3
+    # smooth pulses are shifted, and flat-top pulses with sharp edges fall back to direct evaluation
+    statistics = pulse_lib.render_cache.get_statistics()
+    assert statistics["shift_count"] == 6
+    # probes of the shift error are not stored, so only the rendered sample phases are cached
+    assert statistics["num_entry"] == 12
+
+
+def test_pulse_library_binary_serialization(tmp_path):
+    from mt_pulse.pulse_library import PulseLibrary
+    from mt_pulse.kernel_cache import KernelCache
+
+    pulse_lib = get_preset_pulse_library()
+    data = pulse_lib.to_bytes()
+    pulse_lib_load = PulseLibrary.from_bytes(data)
+    assert pulse_lib_load.get_content_hash() == pulse_lib.get_content_hash()
+    for pulse_name in pulse_lib.get_pulse_name_list():
+        pulse, pulse_load = pulse_lib._pulse_dict[pulse_name], pulse_lib_load._pulse_dict[pulse_name]
+        assert json.dumps(pulse_load.to_json_dict()) == json.dumps(pulse.to_json_dict())
+
+    # compiled pulses are stored at the first load and reused at the second load
+    kernel_cache = KernelCache(str(tmp_path))
+    PulseLibrary.from_bytes(data, kernel_cache=kernel_cache)
+    pulse_lib_cached = PulseLibrary.from_bytes(data, kernel_cache=kernel_cache)
+    assert set(pulse_lib_cached._compiled_pulse_dict.keys()) == set(pulse_lib.get_pulse_name_list())
+    time_slots = np.arange(0, 1000, 2.0)
+    for pulse_name in pulse_lib.get_pulse_name_list():
+        config = pulse_lib.get_config(pulse_name)
+        waveform_ref, duration_ref = pulse_lib.get_waveform(pulse_name, time_slots, 100.0, config)
+        waveform, duration = pulse_lib_cached.get_waveform(pulse_name, time_slots, 100.0, config)
+        assert np.isclose(duration, duration_ref)
+        for channel in waveform_ref:
+            assert np.allclose(waveform[channel], waveform_ref[channel])
+
+    compiled_lib = CompiledPulseLibrary.from_pulse_library_bytes(data, kernel_cache)
+    assert compiled_lib.get_content_hash() == pulse_lib.get_content_hash()
+    for pulse_name in pulse_lib.get_pulse_name_list():
+        assert compiled_lib.get_config(pulse_name) == pulse_lib.get_config(pulse_name)
+
+
+def test_pulse_library_numeric_literal_parameter():
+    from mt_pulse.pulse import Pulse
+    from mt_pulse.pulse_library import PulseLibrary
+
+    pulse_lib = get_preset_pulse_library()
+    pulse = Pulse(name="LITERAL", channel_list=["qubit"])
+    amplitude = pulse.add_variable("literal_amplitude", default_value=0.5, description="amplitude")
+    # numeric literals are valid shape parameters
+    shape_param = {"amplitude": amplitude, "phase": 0, "width": 20}
+    pulse.add_shape(channel_name="qubit", shape_name="gaussian", shape_param=shape_param)
+    pulse_lib.add_pulse(pulse)
+
+    pulse_lib_load = PulseLibrary.from_bytes(pulse_lib.to_bytes())
+    assert pulse_lib_load.get_content_hash() == pulse_lib.get_content_hash()
+    time_slots = np.arange(0, 200, 2.0)
+    config = pulse_lib.get_config("LITERAL")
+    waveform_ref, duration_ref = pulse_lib.get_waveform("LITERAL", time_slots, 10.0, config)
+    waveform, duration = pulse_lib_load.get_waveform("LITERAL", time_slots, 10.0, config)
+    assert np.isclose(duration, duration_ref)
+    assert np.allclose(waveform["qubit"], waveform_ref["qubit"])
+
+    # content hash follows in-place updates of registered pulses
+    content_hash = pulse_lib.get_content_hash()
+    shape_param["phase"] = 1
+    phase_hash = pulse_lib.get_content_hash()
+    assert phase_hash != content_hash
+    pulse.add_shape(channel_name="qubit", shape_name="blank", shape_param={"width": 10})
+    assert pulse_lib.get_content_hash() not in [content_hash, phase_hash]
+    assert pulse_lib.get_content_hash() == PulseLibrary.from_bytes(pulse_lib.to_bytes()).get_content_hash()
+
+
+def test_kernel_cache_untrusted_payload():
+    from mt_pulse.kernel_cache import _function_from_json_dict
+
+    valid_source = "def _lambdifygenerated(x):\n    return [sqrt(x)]\n"
+    function = _function_from_json_dict(
+        {"source": valid_source, "global": {"sqrt": {"numpy": "sqrt"}}, "broadcast": False}
+    )
+    assert function(4.0) == [2.0]
+
+    invalid_data_list = [
+        {"module": "os", "qualname": "system"},
+        {"module": "mt_pulse.compiled_shape", "qualname": "__builtins__.eval"},
+        {"source": valid_source, "global": {"sqrt": {"module": "os"}}, "broadcast": False},
+        {"source": valid_source, "global": {"sqrt": {"numpy": "_NoValue"}}, "broadcast": False},
+        {"source": "def _lambdifygenerated(x):\n    return [open(x)]\n", "global": {}, "broadcast": False},
+        {"source": "def _lambdifygenerated(x):\n    import os\n    return [x]\n", "global": {}, "broadcast": False},
+        {"source": "def _lambdifygenerated(x):\n    return [x.__class__]\n", "global": {}, "broadcast": False},
+        {"source": "import os\ndef _lambdifygenerated(x):\n    return [x]\n", "global": {}, "broadcast": False},
+    ]
+    for data in invalid_data_list:
+        with pytest.raises(ValueError):
+            _function_from_json_dict(data)
+
+
+def test_compiled_pulse_common_subexpression():
+    pulse_lib = get_preset_pulse_library()
+    saved_evaluation = pulse_lib.get_saved_evaluation()
+    # flattop_cosrise envelopes on control and target are shared, and hpi_c*hpi_w is evaluated once
+    assert saved_evaluation["TPCX"]["shape"] == 2
+    assert saved_evaluation["TPCX"]["parameter"] > 0
+    assert saved_evaluation["CR"]["shape"] == 1
+    assert saved_evaluation["MEAS"] == {"parameter": 0, "shape": 0}
+
+    pulse = pulse_lib._pulse_dict["CR"]
+    time_slots = np.arange(0, 2000, 2.0)
+    config = pulse_lib.get_config("CR")
+    config["cr_counter_phase"] = 0.7
+    waveform_ref, _ = pulse.get_waveform(time_slots, 10.0, config, pulse_lib.shape_library)
+    waveform, _ = pulse_lib.get_waveform("CR", time_slots, 10.0, config)
+    for channel in waveform_ref:
+        assert np.allclose(waveform[channel], waveform_ref[channel])
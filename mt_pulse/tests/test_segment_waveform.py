@@ -0,0 +1,39 @@
+import numpy as np
+from mt_pulse.segment_waveform import SegmentWaveform
+
+
+def test_segment_waveform_add():
+    rng = np.random.default_rng(0)
+    length = 200
+    segment_waveform = SegmentWaveform(length)
+    dense = np.zeros(length, dtype=complex)
+    for _ in range(50):
+        start = int(rng.integers(-30, length + 10))
+        samples = rng.normal(size=int(rng.integers(1, 40))) + 1j * rng.normal()
+        segment_waveform.add(start, samples)
+        clip_start, clip_end = max(start, 0), min(start + len(samples), length)
+        if clip_start < clip_end:
+            dense[clip_start:clip_end] += samples[clip_start - start : clip_end - start]
+        assert np.allclose(segment_waveform.to_dense(), dense)
+
+    end_list = [start + len(samples) for start, samples in segment_waveform.segment_list]
+    start_list = [start for start, _ in segment_waveform.segment_list]
+    assert all([end <= start for end, start in zip(end_list[:-1], start_list[1:])])
+
+    segment_waveform.conj()
+    assert np.allclose(segment_waveform.to_dense(), np.conj(dense))
+
+
+def test_segment_waveform_from_dense():
+    dense = np.zeros(100, dtype=complex)
+    dense[10:20] = 1.0
+    dense[50:51] = 2j
+    dense[99] = 3.0
+    segment_waveform = SegmentWaveform.from_dense(dense)
+    assert [start for start, _ in segment_waveform.segment_list] == [10, 50, 99]
+    assert segment_waveform.num_sample == 12
+    assert np.allclose(segment_waveform.to_dense(), dense)
+
+    other = SegmentWaveform.from_dense(dense)
+    other.add_segment_waveform(segment_waveform)
+    assert np.allclose(other.to_dense(), 2 * dense)
@@ -0,0 +1,449 @@
+import json
+import pytest
+import numpy as np
+from mt_pulse.pulse_preset import get_preset_pulse_library
+from mt_pulse.sequence import Sequence, SequenceConfig, _SYNC_COMMAND_, _CAPT_COMMAND_
+
+
+def _create_sequence() -> Sequence:
+    seq = Sequence(get_preset_pulse_library())
+    for qubit_index in range(3):
+        seq.add_channel(f"Q{qubit_index}_qubit", channel_group=f"Q{qubit_index}")
+        seq.add_channel(f"Q{qubit_index}_resonator", channel_group=f"Q{qubit_index}")
+    seq.add_channel("Q0_cr", channel_group="Q0")
+    seq.add_channel("Q2_cr", channel_group="Q2")
+
+    seq.add_blank_command(["Q0_qubit"], 200)
+    seq.add_synchronize_all_command()
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    seq.add_pulse("HPI", {"qubit": "Q1_qubit"})
+    seq.add_pulse("HPI", {"qubit": "Q2_qubit"})
+    seq.add_synchronize_command(["Q0_qubit", "Q1_qubit", "Q2_qubit"])
+    seq.add_pulse("TPCX", {"control": "Q0_cr", "target": "Q1_qubit"})
+    seq.add_pulse("TPCX", {"control": "Q2_cr", "target": "Q1_qubit"})
+    seq.add_synchronize_command(["Q1_qubit", "Q1_resonator"])
+    seq.add_capture_command(["Q1_resonator"])
+    seq.add_pulse("MEAS", {"resonator": "Q1_resonator"})
+    seq.add_synchronize_all_command()
+    seq.add_blank_command(["Q1_resonator"], 200)
+    seq.add_synchronize_all_command()
+    return seq
+
+
+def _get_reference_waveform(
+    seq: Sequence, time_slots: np.ndarray, config: SequenceConfig
+) -> tuple[dict[str, np.ndarray], dict[str, list[float]]]:
+    # replay commands with symbolic evaluation of pulses
+    pulse_lib = seq.pulse_library
+    cursor = {channel: 0.0 for channel in seq._channel_list}
+    waveform = {channel: np.zeros_like(time_slots, dtype=complex) for channel in seq._channel_list}
+    capture_point: dict[str, list[float]] = {channel: [] for channel in seq._channel_list}
+    for command in seq._command_list:
+        if command.name in [_SYNC_COMMAND_, _CAPT_COMMAND_]:
+            latest_cursor = max(cursor[channel] for channel in command.channel_list)
+            if command.name == _CAPT_COMMAND_:
+                for channel in command.channel_list:
+                    capture_point[channel].append(latest_cursor)
+            latest_cursor += command.blank_time
+            for channel in command.channel_list:
+                cursor[channel] = latest_cursor
+        else:
+            channel_list = list(command.pulse_channel_to_sequence_channel.values())
+            latest_cursor = max(cursor[channel] for channel in channel_list)
+            pulse_config = config.get_parameter(seq._get_group_key_from_command(command))[command.name]
+            pulse_waveform, duration = pulse_lib._pulse_dict[command.name].get_waveform(
+                time_slots, latest_cursor, pulse_config, pulse_lib.shape_library
+            )
+            for pulse_channel, channel_waveform in pulse_waveform.items():
+                waveform[command.pulse_channel_to_sequence_channel[pulse_channel]] += channel_waveform
+            for channel in channel_list:
+                cursor[channel] = latest_cursor + duration
+    return waveform, capture_point
+
+
+def test_sequence_serialization():
+    seq = _create_sequence()
+    dump_str = json.dumps(seq.to_json_dict())
+    seq_load = Sequence.from_json_dict(json.loads(dump_str))
+    assert dump_str == json.dumps(seq_load.to_json_dict())
+
+    config = seq.get_config()
+    dump_str = json.dumps(config.to_json_dict())
+    config_load = SequenceConfig.from_json_dict(json.loads(dump_str))
+    assert dump_str == json.dumps(config_load.to_json_dict())
+
+
+def test_sequence_binary_serialization():
+    seq = _create_sequence()
+    seq_load = Sequence.from_bytes(seq.to_bytes(), seq.pulse_library)
+    assert json.dumps(seq_load.to_json_dict()) == json.dumps(seq.to_json_dict())
+
+    # sequence refers to pulse library by content hash
+    pulse_library = get_preset_pulse_library()
+    pulse_library._pulse_dict["HPI"]._variable_default_value["hpi_width"] = 40.0
+    with pytest.raises(ValueError):
+        Sequence.from_bytes(seq.to_bytes(), pulse_library)
+
+
+def test_sequence_waveform():
+    seq = _create_sequence()
+    config = seq.get_config()
+    config.get_parameter(("Q1",))["HPI"]["hpi_phase"] = 0.3
+    config.get_parameter(("Q0", "Q1"))["TPCX"]["tpcx_width"] = 150
+    capture_duration = 200
+    duration = seq.get_duration(config, capture_duration)
+    time_slots = np.arange(0, duration, 2.0)
+
+    waveform, capture_point = seq.get_waveform(time_slots, config)
+    waveform_ref, capture_point_ref = _get_reference_waveform(seq, time_slots, config)
+    assert capture_point == capture_point_ref
+    for channel in waveform_ref:
+        assert np.allclose(waveform[channel], waveform_ref[channel])
+
+
+def test_sequence_compile():
+    seq = _create_sequence()
+    config = seq.get_config()
+    timeline = seq.compile(config)
+    assert seq.compile(config) is timeline
+    assert len(timeline.start) == 6
+    assert timeline.get_pulse_name(3) == "TPCX"
+    assert np.allclose(timeline.start[:3], 200)
+    assert np.isclose(timeline.start[4], timeline.start[3] + timeline.duration[3])
+    assert np.allclose(timeline.capture_time, timeline.start[5])
+    assert seq.get_duration(config, 0) == timeline.end_time
+    assert seq.get_duration(config, 10000) == timeline.start[5] + 10000
+
+    config.get_parameter(("Q1",))["HPI"]["hpi_width"] = 40.0
+    updated_timeline = seq.compile(config)
+    assert updated_timeline is not timeline
+    assert updated_timeline.start[3] > timeline.start[3]
+    seq.add_capture_command(["Q0_qubit"])
+    assert len(seq.compile(config).capture_time) == 2
+
+
+def test_sequence_compile_pulse_replaced():
+    from mt_pulse.pulse import Pulse
+
+    seq = Sequence(get_preset_pulse_library())
+    seq.add_channel("Q0_qubit", channel_group="Q0")
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    config = seq.get_config()
+    assert seq.get_duration(config, 0) == 80.0
+
+    # timelines cached on the config are rebuilt with the replaced pulse
+    pulse = Pulse(name="HPI", channel_list=["qubit"])
+    width = pulse.add_variable("hpi_width", default_value=20, description="width of half-pi pulse")
+    pulse.add_shape(channel_name="qubit", shape_name="blank", shape_param={"width": 5 * width})
+    seq.pulse_library.add_pulse(pulse)
+    assert seq.get_duration(config, 0) == 100.0
+    assert seq.get_duration(seq.get_config(), 0) == 100.0
+
+
+def test_sequence_segment_waveform():
+    seq = _create_sequence()
+    config = seq.get_config()
+    duration = seq.get_duration(config, 100)
+    time_slots = np.arange(0, duration + 1000, 2.0)
+    waveform, capture_point = seq.get_waveform(time_slots, config)
+    segment_waveform, segment_capture_point = seq.get_segment_waveform(time_slots, config)
+    for channel in waveform:
+        assert np.allclose(segment_waveform[channel].to_dense(), waveform[channel])
+        assert segment_waveform[channel].num_sample < len(time_slots)
+        assert capture_point[channel] == segment_capture_point[channel]
+
+
+def test_sequence_waveform_batch():
+    seq = _create_sequence()
+    seq.add_pulse("FLATTOP", {"channel": "Q0_resonator"})
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    seq.add_capture_command(["Q0_qubit", "Q0_resonator"])
+    config = seq.get_config()
+    num_batch = 5
+    sweep_parameter = {
+        "Q1.HPI.hpi_width": np.linspace(10, 40, num_batch),
+        "Q1.HPI.hpi_phase": np.linspace(0, np.pi, num_batch),
+        "Q0.FLATTOP.flattop_width": np.linspace(50, 150, num_batch),
+        "Q1.MEAS.meas_amplitude": np.linspace(0.1, 0.5, num_batch),
+    }
+    config_list = []
+    for index in range(num_batch):
+        config_point = SequenceConfig.from_json_dict(json.loads(json.dumps(config.to_json_dict())))
+        for name, values in sweep_parameter.items():
+            group, pulse_name, param_name = name.split(".")
+            config_point.get_parameter((group,))[pulse_name][param_name] = values[index]
+        config_list.append(config_point)
+    duration = max([seq.get_duration(config_point, 200) for config_point in config_list])
+    time_slots = np.arange(0, duration, 2.0)
+
+    waveform_sweep, capture_point_sweep = seq.get_waveform_batch(time_slots, config, sweep_parameter)
+    waveform_stack, capture_point_stack = seq.get_waveform_batch(time_slots, config_list)
+    for index, config_point in enumerate(config_list):
+        waveform, capture_point = seq.get_waveform(time_slots, config_point)
+        for channel in waveform:
+            assert waveform_sweep[channel].shape == (num_batch, len(time_slots))
+            assert np.allclose(waveform_sweep[channel][index], waveform[channel])
+            assert np.allclose(waveform_stack[channel][index], waveform[channel])
+            assert np.allclose(capture_point_sweep[channel][index], capture_point[channel])
+            assert np.allclose(capture_point_stack[channel][index], capture_point[channel])
+
+
+def test_sequence_waveform_batch_group_key():
+    seq = Sequence(get_preset_pulse_library())
+    seq.add_channel("Q0_qubit")
+    seq.add_channel("Q1_qubit", channel_group="Q1_group")
+    seq.add_channel("Q0_cr")
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    seq.add_pulse("TPCX", {"control": "Q0_cr", "target": "Q1_qubit"})
+    config = seq.get_config()
+    num_batch = 3
+    hpi_amplitude = np.linspace(0.1, 0.3, num_batch)
+    cr_amplitude = np.linspace(0.2, 0.4, num_batch)
+    sweep_parameter = {
+        "_default_.HPI.hpi_amplitude": hpi_amplitude,
+        (("Q1_group", "_default_"), "TPCX", "tpcx_main_amplitude"): cr_amplitude,
+    }
+    time_slots = np.arange(0, seq.get_duration(config, 0), 2.0)
+    waveform_sweep, _ = seq.get_waveform_batch(time_slots, config, sweep_parameter)
+    for index in range(num_batch):
+        config_point = SequenceConfig.from_json_dict(json.loads(json.dumps(config.to_json_dict())))
+        config_point.set_parameter(("_default_",), "HPI", "hpi_amplitude", hpi_amplitude[index])
+        config_point.set_parameter(("_default_", "Q1_group"), "TPCX", "tpcx_main_amplitude", cr_amplitude[index])
+        waveform, _ = seq.get_waveform(time_slots, config_point)
+        for channel in waveform:
+            assert np.allclose(waveform_sweep[channel][index], waveform[channel])
+
+    with pytest.raises(ValueError):
+        seq.get_waveform_batch(time_slots, config, {"Q1.HPI.hpi_amplitude": hpi_amplitude})
+
+
+def test_sequence_waveform_incremental():
+    seq = _create_sequence()
+    config = seq.get_config()
+    time_slots = np.arange(0, 2000, 2.0)
+
+    def _assert_equal_to_full_render() -> None:
+        waveform, capture_point = seq.get_waveform_incremental(time_slots, config)
+        waveform_full, capture_point_full = seq.get_waveform(time_slots, config)
+        for channel in waveform_full:
+            assert np.allclose(waveform[channel], waveform_full[channel])
+            assert np.allclose(capture_point[channel], capture_point_full[channel])
+
+    _assert_equal_to_full_render()
+    config.get_parameter(("Q1",))["HPI"]["hpi_phase"] = 0.3
+    _assert_equal_to_full_render()
+    config.get_parameter(("Q1",))["HPI"]["hpi_width"] = 40.0
+    _assert_equal_to_full_render()
+    seq.invalidate_render_state(["Q0_qubit"])
+    _assert_equal_to_full_render()
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    config = seq.get_config()
+    _assert_equal_to_full_render()
+
+
+def _create_repeat_sequence(count: int, use_repeat_block: bool) -> Sequence:
+    seq = Sequence(get_preset_pulse_library())
+    for qubit_index in range(2):
+        seq.add_channel(f"Q{qubit_index}_qubit", channel_group=f"Q{qubit_index}")
+    seq.add_channel("Q0_resonator", channel_group="Q0")
+    seq.add_blank_command(["Q0_qubit"], 100)
+
+    block = Sequence(seq.pulse_library)
+    block.add_channel("Q0_qubit", channel_group="Q0")
+    block.add_channel("Q1_qubit", channel_group="Q1")
+    block.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    block.add_blank_command(["Q1_qubit"], 12)
+    block.add_pulse("HPI", {"qubit": "Q1_qubit"})
+    block.add_capture_command(["Q1_qubit"])
+    if use_repeat_block:
+        seq.add_repeat_block(block, count)
+    else:
+        for _ in range(count):
+            seq.add_synchronize_command(["Q0_qubit", "Q1_qubit"])
+            for command in block._command_list:
+                seq._command_list.append(command)
+        seq.add_synchronize_command(["Q0_qubit", "Q1_qubit"])
+    seq.add_pulse("MEAS", {"resonator": "Q0_resonator"})
+    return seq
+
+
+def test_sequence_repeat_block():
+    count = 20
+    seq = _create_repeat_sequence(count, True)
+    seq_expanded = _create_repeat_sequence(count, False)
+    config = seq.get_config()
+    assert config.to_json_dict() == seq_expanded.get_config().to_json_dict()
+    assert np.isclose(seq.get_duration(config, 100), seq_expanded.get_duration(config, 100))
+
+    for sample_interval in [2.0, 0.7]:
+        time_slots = np.arange(-10, seq.get_duration(config, 100) + 10, sample_interval)
+        waveform, capture_point = seq.get_waveform(time_slots, config)
+        waveform_expanded, capture_point_expanded = seq_expanded.get_waveform(time_slots, config)
+        segment_waveform, _ = seq.get_segment_waveform(time_slots, config)
+        waveform_batch, capture_point_batch = seq.get_waveform_batch(time_slots, [config, config])
+        for channel in waveform:
+            assert np.allclose(waveform[channel], waveform_expanded[channel])
+            assert np.allclose(segment_waveform[channel].to_dense(), waveform_expanded[channel])
+            assert np.allclose(waveform_batch[channel][1], waveform_expanded[channel])
+            assert np.allclose(capture_point[channel], capture_point_expanded[channel])
+            assert np.allclose(capture_point_batch[channel][1], capture_point_expanded[channel])
+    assert len(capture_point["Q1_qubit"]) == count
+
+    config.get_parameter(("Q1",))["HPI"]["hpi_phase"] = 0.5
+    waveform, _ = seq.get_waveform_incremental(time_slots, config)
+    waveform_expanded, _ = seq_expanded.get_waveform(time_slots, config)
+    for channel in waveform:
+        assert np.allclose(waveform[channel], waveform_expanded[channel])
+
+    data = seq.to_json_dict()
+    assert len(json.dumps(data)) == len(json.dumps(_create_repeat_sequence(count + 50, True).to_json_dict()))
+    seq_loaded = Sequence.from_json_dict(json.loads(json.dumps(data)))
+    assert json.dumps(seq_loaded.to_json_dict()) == json.dumps(data)
+
+
+def test_sequence_waveform_dtype():
+    seq = _create_sequence()
+    config = seq.get_config()
+    time_slots = np.arange(0, seq.get_duration(config, 100), 2.0)
+    waveform, _ = seq.get_waveform(time_slots, config)
+
+    out = {channel: np.empty(len(time_slots), dtype=np.complex64) for channel in waveform}
+    for _ in range(2):
+        waveform_complex64, _ = seq.get_waveform(time_slots, config, dtype="complex64", out=out)
+        for channel in waveform:
+            assert waveform_complex64[channel] is out[channel]
+            assert np.allclose(waveform_complex64[channel], waveform[channel], atol=1e-6)
+
+    waveform_int16, _ = seq.get_waveform(time_slots, config, dtype="int16_iq", full_scale=1.0)
+    for channel in waveform:
+        assert waveform_int16[channel].dtype == np.int16
+        assert np.allclose(waveform_int16[channel][:, 0], np.rint(waveform[channel].real * 32767))
+        assert np.allclose(waveform_int16[channel][:, 1], np.rint(waveform[channel].imag * 32767))
+
+    with pytest.raises(ValueError):
+        seq.get_waveform(time_slots, config, dtype="int16_iq", full_scale=0.1)
+    with pytest.raises(ValueError):
+        seq.get_waveform(time_slots, config, dtype="complex64", out={channel: np.empty(3) for channel in waveform})
+    with pytest.raises(ValueError):
+        seq.get_waveform(time_slots, config, dtype="float32")
+
+
+def test_sequence_add_commands():
+    from mt_pulse.sequence import SequenceCommand
+
+    seq_ref = _create_sequence()
+    seq = Sequence(get_preset_pulse_library())
+    for channel in seq_ref._channel_list:
+        seq.add_channel(channel, channel_group=seq_ref._channel_to_group[channel])
+    seq.add_commands(list(seq_ref._command_list))
+    assert json.dumps(seq.to_json_dict()) == json.dumps(seq_ref.to_json_dict())
+
+    # invalid batch is rejected as a whole
+    invalid_batch_list = [
+        [SequenceCommand("HPI", {"qubit": "Q0_qubit"}), SequenceCommand("HPI", {"qubit": "Q9_qubit"})],
+        [SequenceCommand("HPI", {"qubit": "Q0_qubit"}), SequenceCommand("UNKNOWN", {"qubit": "Q0_qubit"})],
+        [SequenceCommand("TPCX", {"control": "Q0_cr"})],
+        [SequenceCommand(_SYNC_COMMAND_, channel_list=["Q0_qubit", "Q9_qubit"])],
+    ]
+    for command_list in invalid_batch_list:
+        with pytest.raises(ValueError):
+            seq.add_commands(command_list)
+    assert len(seq._command_list) == len(seq_ref._command_list)
+
+
+def test_sequence_fingerprint():
+    seq = _create_sequence()
+    fingerprint = seq.get_fingerprint()
+    assert _create_sequence().get_fingerprint() == fingerprint
+    assert Sequence.from_json_dict(seq.to_json_dict()).get_fingerprint() == fingerprint
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    assert seq.get_fingerprint() != fingerprint
+    seq_channel = _create_sequence()
+    seq_channel.add_channel("Q3_qubit", channel_group="Q3")
+    assert seq_channel.get_fingerprint() != fingerprint
+
+    config = seq.get_config()
+    config_fingerprint = config.get_fingerprint()
+    group_fingerprint = config.get_group_fingerprint(("Q0",))
+    phase = config.get_parameter(("Q1",))["HPI"]["hpi_phase"]
+    assert SequenceConfig.from_json_dict(json.loads(json.dumps(config.to_json_dict()))).get_fingerprint() == (
+        config_fingerprint
+    )
+    config.set_parameter(("Q1",), "HPI", "hpi_phase", 0.3)
+    assert config.get_fingerprint() != config_fingerprint
+    assert config.get_group_fingerprint(("Q0",)) == group_fingerprint
+    # in-place updates of scalar values are also detected
+    config.get_parameter(("Q1",))["HPI"]["hpi_phase"] = phase
+    assert config.get_fingerprint() == config_fingerprint
+    # list values updated in place are reflected when they are set
+    value_list = [0.1, 0.2]
+    config.set_parameter(("Q1",), "HPI", "hpi_phase", value_list)
+    list_fingerprint = config.get_fingerprint()
+    value_list[0] = 0.3
+    config.set_parameter(("Q1",), "HPI", "hpi_phase", value_list)
+    assert config.get_fingerprint() not in [list_fingerprint, config_fingerprint]
+    with pytest.raises(ValueError):
+        config.set_parameter(("Q1",), "HPI", "unknown", 0.3)
+
+
+def _create_literal_sequence(phase: float) -> Sequence:
+    from mt_pulse.pulse import Pulse
+
+    pulse_lib = get_preset_pulse_library()
+    pulse = Pulse(name="LITERAL", channel_list=["qubit"])
+    shape_param = {"amplitude": 0.5, "phase": phase, "width": 20}
+    pulse.add_shape(channel_name="qubit", shape_name="gaussian", shape_param=shape_param)
+    pulse_lib.add_pulse(pulse)
+    seq = Sequence(pulse_lib)
+    seq.add_channel("Q0_qubit", channel_group="Q0")
+    seq.add_pulse("LITERAL", {"qubit": "Q0_qubit"})
+    return seq
+
+
+def test_sequence_fingerprint_numeric_literal():
+    # pulses whose shape parameters are numeric literals are fingerprinted and serialized
+    seq = _create_literal_sequence(0)
+    fingerprint = seq.get_fingerprint()
+    assert Sequence.from_bytes(seq.to_bytes(), seq.pulse_library).get_fingerprint() == fingerprint
+    assert _create_literal_sequence(0).get_fingerprint() == fingerprint
+    assert _create_literal_sequence(1).get_fingerprint() != fingerprint
+
+
+def test_sequence_waveform_chunk():
+    for seq in [_create_sequence(), _create_repeat_sequence(20, use_repeat_block=True)]:
+        config = seq.get_config()
+        time_slots = np.arange(0, seq.get_duration(config, 100) + 500, 2.0)
+        waveform_ref, _ = seq.get_waveform(time_slots, config)
+        for chunk_size in [7, 256, len(time_slots) + 1]:
+            waveform = {channel: [] for channel in waveform_ref}
+            next_start = 0
+            for chunk_start, chunk in seq.iter_waveform_chunk(time_slots, config, chunk_size):
+                assert chunk_start == next_start
+                for channel, samples in chunk.items():
+                    assert len(samples) == min(chunk_size, len(time_slots) - chunk_start)
+                    waveform[channel].append(samples)
+                next_start += chunk_size
+            for channel in waveform_ref:
+                assert np.allclose(np.concatenate(waveform[channel]), waveform_ref[channel])
+
+
+def test_sequence_waveform_parallel():
+    from mt_pulse.parallel_render import get_channel_partition, get_waveform_parallel
+
+    shift_seq = _create_sequence()
+    shift_seq.pulse_library.render_cache.fractional_shift_error = 1e-3
+    seq_list = [_create_sequence(), _create_repeat_sequence(20, use_repeat_block=True), _create_literal_sequence(0)]
+    for seq in seq_list + [shift_seq]:
+        config = seq.get_config()
+        # sample interval of 0.7 places pulses at fractional sample phases
+        time_slots = np.arange(0, seq.get_duration(config, 100) + 500, 2.0 if seq is not shift_seq else 0.7)
+        waveform_ref, capture_point_ref = seq.get_waveform(time_slots, config)
+        for num_process in [1, 2]:
+            waveform, capture_point = get_waveform_parallel(seq, time_slots, config, num_process=num_process)
+            assert capture_point == capture_point_ref
+            for channel in waveform_ref:
+                assert np.array_equal(waveform[channel], waveform_ref[channel])
+        assert len(get_channel_partition(seq, config, 2)) == min(len(seq._channel_list), 2)
+    assert shift_seq.pulse_library.render_cache.get_statistics()["shift_count"] > 0
+    with pytest.raises(ValueError):
+        get_waveform_parallel(seq, time_slots, config, channel_partition=[["Q0_qubit"]])
@@ -0,0 +1,74 @@
+import json
+import numpy as np
+import sympy as sp
+from mt_pulse.shape import Shape
+from mt_pulse.shape_preset import get_preset_shape_library
+
+
+def test_shape_serialization():
+    shape_lib = get_preset_shape_library()
+    for shape_name in shape_lib.get_shape_name_list():
+        shape = shape_lib._shape_dict[shape_name]
+        json_str = json.dumps(shape.to_json_dict())
+        shape_load = Shape.from_json_dict(json.loads(json_str))
+        assert json_str == json.dumps(shape_load.to_json_dict())
+
+
+def test_shape_support():
+    shape_lib = get_preset_shape_library()
+    param = {"width": 40, "amplitude": 0.8, "phase": 0.3, "risetime": 10, "drag": 2.0}
+    time_slots = np.arange(-500, 500, 0.5)
+    for shape_name in shape_lib.get_shape_name_list():
+        compiled_shape = shape_lib.compile(shape_name)
+        shape_param = [param[name] for name in compiled_shape.parameter_name_list]
+        waveform = shape_lib.get_function(shape_name, param)(time_slots) + np.zeros_like(time_slots)
+        support_start, support_end = compiled_shape.support_function(*shape_param)
+        outside = (time_slots < support_start) | (support_end < time_slots)
+        assert np.max(np.abs(waveform[outside]), initial=0) < 1e-15
+        if compiled_shape.is_zero:
+            assert np.all(waveform == 0)
+
+
+def test_shape_without_support():
+    t, width = sp.symbols(["t", "width"])
+    shape = Shape(name="triangle", shape_expr=sp.Max(1 - sp.Abs(t) / width, 0), progress_time_ns=sp.Float(0))
+    compiled_shape = shape.compile()
+    assert compiled_shape.support_function(10) == (-np.inf, np.inf)
+    assert not compiled_shape.is_zero
+
+
+def test_shape_kernel_equivalence():
+    random_state = np.random.RandomState(0)
+    shape_lib = get_preset_shape_library()
+    for shape_name in shape_lib.get_shape_name_list():
+        kernel = shape_lib.get_kernel(shape_name)
+        assert kernel is not None
+        compiled_shape = shape_lib.compile(shape_name)
+        assert compiled_shape.time_function is kernel.time_function
+        reference_shape = shape_lib._shape_dict[shape_name].compile()
+        for _ in range(20):
+            param = {
+                "width": random_state.choice([random_state.uniform(1, 200), 16, 20]),
+                "risetime": random_state.choice([random_state.uniform(1, 100), 20, 40]),
+                "amplitude": random_state.uniform(-1, 1),
+                "phase": random_state.uniform(-np.pi, np.pi),
+                "drag": random_state.uniform(-10, 10),
+            }
+            shape_param = [param[name] for name in kernel.parameter_name_list]
+            # integer grid hits boundaries of piecewise shapes exactly
+            time_slots = np.concatenate([np.arange(-300, 500, 1.0), random_state.uniform(-300, 500, 100)])
+            waveform = kernel.time_function(time_slots, *shape_param) + np.zeros_like(time_slots)
+            waveform_ref = reference_shape.time_function(time_slots, *shape_param) + np.zeros_like(time_slots)
+            assert np.allclose(waveform, waveform_ref, rtol=1e-12, atol=1e-12)
+            assert np.isclose(kernel.progress_function(*shape_param), reference_shape.progress_function(*shape_param))
+            if kernel.support_function is not None:
+                support = kernel.support_function(*shape_param)
+                support_ref = reference_shape.support_function(*shape_param)
+                assert np.allclose(support, support_ref)
+
+
+def test_shape_kernel_not_used_for_modified_shape():
+    t, width = sp.symbols(["t", "width"])
+    shape_lib = get_preset_shape_library()
+    shape_lib.add_shape(Shape(name="gaussian", shape_expr=sp.exp(-(t**2) / width**2), progress_time_ns=sp.Float(0)))
+    assert shape_lib.get_kernel("gaussian") is None
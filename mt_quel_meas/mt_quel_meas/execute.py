@@ -82,7 +82,7 @@ def process_update(name: str, value: Any, job: Job) -> None:
         assert len(handle) == 3
         group, pulse, param_name = handle
         group_tuple = tuple(group.split("_"))
-        job.sequence_config.get_parameter(group_tuple)[pulse][param_name] = value
+        job.sequence_config.set_parameter(group_tuple, pulse, param_name, value)
     else:
         raise ValueError(f"Unknown parameter category {category}")
 
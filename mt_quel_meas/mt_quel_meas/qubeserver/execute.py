@@ -4,6 +4,7 @@ from typing import Literal
 import numpy as np
 import labrad
 from mt_util.tunits_util import FrequencyType, TimeType
+from mt_pulse.segment_waveform import SegmentWaveform
 from mt_quel_meas.qubeserver.job import JobQubeServer, PhysicalUnitIdentifier, AcquisitionConfigQubeServer
 from mt_quel_meas.qubeserver.util import _boxport_to_port_type
 
@@ -32,10 +33,11 @@ class JobExecutorQubeServer:
     def _update_waveform(
         self,
         awg_channel_to_dac_unit: dict[str, PhysicalUnitIdentifier],
-        awg_channel_to_waveform: dict[str, np.ndarray],
+        awg_channel_to_waveform: dict[str, SegmentWaveform],
         acquisition_config: AcquisitionConfigQubeServer,
     ) -> None:
-        for channel, waveform in awg_channel_to_waveform.items():
+        for channel, segment_waveform in awg_channel_to_waveform.items():
+            waveform = segment_waveform.to_dense()
             physical_unit = awg_channel_to_dac_unit[channel]
             self._qube.select_device(physical_unit.box_port)
             self._qube.daq_length(acquisition_config.waveform_length["ns"] * labrad.units.ns)
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Literal
 import numpy as np
 from mt_util.tunits_util import FrequencyType, TimeType
+from mt_pulse.segment_waveform import SegmentWaveform
 
 
 @dataclass(frozen=True, slots=True)
@@ -32,7 +33,7 @@ class JobQubeServer:
     sequence_channel_to_frequency_modulation: dict[str, FrequencyType]
 
     awg_channel_to_dac_unit: dict[str, PhysicalUnitIdentifier]
-    awg_channel_to_waveform: dict[str, np.ndarray]
+    awg_channel_to_waveform: dict[str, SegmentWaveform]
     awg_channel_to_FNCO_frequency: dict[str, FrequencyType]
 
     boxport_to_CNCO_frequency: dict[str, FrequencyType]
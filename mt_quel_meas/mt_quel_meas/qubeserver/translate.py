@@ -1,13 +1,14 @@
 from logging import getLogger
-from typing import Literal
+from typing import Iterator, Literal
 import numpy as np
 from tunits.units import ns
 from mt_util.tunits_util import FrequencyType, TimeType
 from mt_quel_util.mux_assignment import get_multiplex_config, MultiplexingResult
 from mt_quel_util.demux_filter import get_gaussian_FIR_coefficients
-from mt_quel_util.mod_demod import modulate_waveform, modulate_averaging_window
+from mt_quel_util.mod_demod import modulate_waveform_segment, modulate_averaging_window
 from mt_quel_util.acq_window_shift import adjust_capture_point_list, adjust_averaging_window
 from mt_quel_util.constant import InstrumentConstantQuEL
+from mt_pulse.segment_waveform import SegmentWaveform
 from mt_quel_meas.job import Job, AssignmentQuel
 from mt_quel_meas.qubeserver.job import JobQubeServer, PhysicalUnitIdentifier, AcquisitionConfigQubeServer
 from mt_quel_meas.qubeserver.util import (
@@ -18,6 +19,9 @@ from mt_quel_meas.qubeserver.util import (
 
 logger = getLogger(__name__)
 
+# number of samples generated at once per channel, which bounds memory of waveform generation
+_waveform_chunk_size = 2**16
+
 
 def _map_sequence_channel_to_awg_channel(assign: AssignmentQuel, mux_result: MultiplexingResult) -> dict[str, str]:
     sequence_channel_to_awg_channel: dict[str, str] = {}
@@ -63,31 +67,50 @@ def _get_sequence_channel_to_mux_index(
     return sequence_to_mux_index
 
 
+def _iter_modulated_segment_chunk(
+    waveform_chunk_iter: Iterator[tuple[int, dict[str, np.ndarray]]],
+    sequence_channel_to_frequency_modulation: dict[str, FrequencyType],
+    constant: InstrumentConstantQuEL,
+) -> Iterator[dict[str, list[tuple[int, np.ndarray]]]]:
+    # streaming stage of modulation, where only non-zero segments of each chunk are modulated at their sample index
+    for chunk_start, chunk in waveform_chunk_iter:
+        modulated_chunk: dict[str, list[tuple[int, np.ndarray]]] = {}
+        for sequence_channel, freq_modulate in sequence_channel_to_frequency_modulation.items():
+            segment_list = [
+                (chunk_start + start, samples)
+                for start, samples in SegmentWaveform.from_dense(chunk[sequence_channel]).segment_list
+            ]
+            modulated_chunk[sequence_channel] = modulate_waveform_segment(segment_list, freq_modulate, constant)
+        yield modulated_chunk
+
+
 def _get_awg_channel_to_waveform(
     time_slots: np.ndarray,
     awg_channel_list: list[str],
     sequence_channel_to_awg_channel: dict[str, str],
-    sequence_channel_to_waveform: dict[str, np.ndarray],
+    waveform_chunk_iter: Iterator[tuple[int, dict[str, np.ndarray]]],
     sequence_channel_to_frequency_modulation: dict[str, FrequencyType],
     sequence_channel_to_boxport: dict[str, str],
     boxport_to_LO_sideband: dict[str, Literal["USB", "LSB", "Direct"]],
     constant: InstrumentConstantQuEL,
-):
+) -> dict[str, SegmentWaveform]:
 
     # create zero waveform
-    awg_channel_to_waveform: dict[str, np.ndarray] = {}
+    awg_channel_to_waveform: dict[str, SegmentWaveform] = {}
     for awg_channel in awg_channel_list:
-        awg_channel_to_waveform[awg_channel] = np.zeros_like(time_slots, dtype=complex)
+        awg_channel_to_waveform[awg_channel] = SegmentWaveform(len(time_slots))
 
-    # add each sequence channel to physical channel
+    # add modulated segments of each sequence channel to physical channel chunk by chunk
+    modulated_chunk_iter = _iter_modulated_segment_chunk(
+        waveform_chunk_iter, sequence_channel_to_frequency_modulation, constant
+    )
+    for modulated_chunk in modulated_chunk_iter:
+        for sequence_channel, awg_channel in sequence_channel_to_awg_channel.items():
+            for start, samples in modulated_chunk[sequence_channel]:
+                awg_channel_to_waveform[awg_channel].add(start, samples)
     for sequence_channel, awg_channel in sequence_channel_to_awg_channel.items():
-        waveform = sequence_channel_to_waveform[sequence_channel]
-
-        freq_modulate = sequence_channel_to_frequency_modulation[sequence_channel]
-        modulated_waveform = modulate_waveform(waveform, freq_modulate, constant)
-        awg_channel_to_waveform[awg_channel] += modulated_waveform
         logger.info(
-            f"job translate | modulate waveform | v: {freq_modulate} "
+            f"job translate | modulate waveform | v: {sequence_channel_to_frequency_modulation[sequence_channel]} "
             f"seq-ch: {sequence_channel} - awg-ch: {awg_channel}"
         )
 
@@ -98,7 +121,7 @@ def _get_awg_channel_to_waveform(
         sequence_channel = sequence_channel_filter[0]
         boxport = sequence_channel_to_boxport[sequence_channel]
         if boxport_to_LO_sideband[boxport] == "LSB":
-            np.conj(awg_channel_to_waveform[awg_channel], out=awg_channel_to_waveform[awg_channel])
+            awg_channel_to_waveform[awg_channel].conj()
 
     return awg_channel_to_waveform
 
@@ -333,9 +356,8 @@ def translate_job_qube_server(job: Job, assign: AssignmentQuel) -> JobQubeServer
     delta_time = 1 / assign.instrument_const.DACBB_sampling_freq
     num_sample_waveform = np.ceil(waveform_length / delta_time).astype(int)
     time_slots_ns = np.arange(num_sample_waveform) * delta_time["ns"]
-    sequence_channel_to_waveform, sequence_channel_to_capture_point_list_ns = job.sequence.get_waveform(
-        time_slots_ns, job.sequence_config
-    )
+    sequence_channel_to_capture_point_list_ns = job.sequence.compile(job.sequence_config).get_capture_point()
+    waveform_chunk_iter = job.sequence.iter_waveform_chunk(time_slots_ns, job.sequence_config, _waveform_chunk_size)
 
     # convert float values to TimeType items
     sequence_channel_to_capture_point_list: dict[str, list[TimeType]] = {}
@@ -388,7 +410,7 @@ def translate_job_qube_server(job: Job, assign: AssignmentQuel) -> JobQubeServer
         time_slots_ns,
         awg_channel_list,
         sequence_channel_to_awg_channel,
-        sequence_channel_to_waveform,
+        waveform_chunk_iter,
         sequence_channel_to_frequency_modulation,
         assign.sequence_channel_to_boxport_name,
         boxport_to_LO_sideband,
@@ -1,6 +1,9 @@
+from typing import Union
 import numpy as np
 from mt_util.tunits_util import FrequencyType, TimeType
+from mt_pulse.segment_waveform import SegmentWaveform
 from mt_quel_meas.quelware.job import JobQuelware, ChannelIdentifier
+from mt_quel_meas.quelware.wave_chunk import plan_wave_chunk
 
 
 try:
@@ -23,15 +26,26 @@ if __import_success:
                 self.box_dict[name] = box
 
         def _update_waveform(
-            self, ID_to_box_port_dac: dict[str, ChannelIdentifier], ID_to_waveform: dict[str, np.ndarray]
+            self,
+            ID_to_box_port_dac: dict[str, ChannelIdentifier],
+            ID_to_waveform: dict[str, Union[np.ndarray, SegmentWaveform]],
         ):
-            waveform_name = "waveform"
+            # only non-zero blocks are uploaded, and zero gaps are expressed as blank words
             for ID, waveform in ID_to_waveform.items():
                 channel = ID_to_box_port_dac[ID]
                 box = self.box_dict[channel.box]
-                box.register_wavedata(channel.port, channel.dac, waveform_name, waveform)
-                awg_param = AwgParam(num_wait_word=0, num_repeat=1)
-                awg_param.chunks.append(WaveChunk(name_of_wavedata=waveform_name, num_blank_word=0, num_repeat=1))
+                plan = plan_wave_chunk(waveform)
+                for wavedata_index, wavedata in enumerate(plan.wavedata_list):
+                    box.register_wavedata(channel.port, channel.dac, f"waveform_{wavedata_index}", wavedata)
+                awg_param = AwgParam(num_wait_word=plan.num_wait_word, num_repeat=1)
+                for wavedata_index, num_blank_word, num_repeat in plan.chunk_list:
+                    awg_param.chunks.append(
+                        WaveChunk(
+                            name_of_wavedata=f"waveform_{wavedata_index}",
+                            num_blank_word=num_blank_word,
+                            num_repeat=num_repeat,
+                        )
+                    )
                 box.config_channel(channel.port, channel.dac, awg_param=awg_param)
 
         def _update_NCO_frequency(
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 import numpy as np
 from tunits.units import us, ms
 from mt_util.tunits_util import TimeType, FrequencyType
+from mt_pulse.segment_waveform import SegmentWaveform
 
 
 @dataclass(frozen=True, slots=True)
@@ -30,7 +31,7 @@ class JobQuelware:
     ID_to_box_port_dac: dict[str, ChannelIdentifier]
 
     # waveform setting
-    ID_to_waveform: dict[str, np.ndarray] | None
+    ID_to_waveform: dict[str, np.ndarray | SegmentWaveform] | None
 
     # frequency setting
     ID_to_NCO_frequency: dict[str, tuple[FrequencyType, list[FrequencyType]]] | None
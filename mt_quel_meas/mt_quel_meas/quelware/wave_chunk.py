@@ -0,0 +1,105 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Union
+import numpy as np
+from mt_pulse.segment_waveform import SegmentWaveform
+
+# AWG of e7awghal consumes a word of 4 samples, and wavedata length must be a multiple of 64 samples
+_num_sample_per_word = 4
+_num_sample_per_block = 64
+_max_num_wave_chunk = 16
+
+
+@dataclass(frozen=True, slots=True)
+class WaveChunkPlan:
+    num_wait_word: int
+    # (index of wavedata, number of blank words after the chunk, number of repeat)
+    chunk_list: list[tuple[int, int, int]]
+    wavedata_list: list[np.ndarray]
+
+    @property
+    def nbytes(self) -> int:
+        return sum([wavedata.nbytes for wavedata in self.wavedata_list])
+
+
+def _merge_touching_block_range(block_range_list: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged_range_list: list[tuple[int, int]] = []
+    for start, end in block_range_list:
+        if len(merged_range_list) > 0 and merged_range_list[-1][1] >= start:
+            merged_range_list[-1] = (merged_range_list[-1][0], max(merged_range_list[-1][1], end))
+        else:
+            merged_range_list.append((start, end))
+    return merged_range_list
+
+
+def _merge_closest_block_range(block_range_list: list[tuple[int, int]], max_num_range: int) -> list[tuple[int, int]]:
+    # ranges separated by the smallest gaps are merged until the number of ranges fits
+    gap_list = np.array([block_range_list[i + 1][0] - block_range_list[i][1] for i in range(len(block_range_list) - 1)])
+    num_merge = len(block_range_list) - max_num_range
+    merge_set = set(np.argsort(gap_list, kind="stable")[:num_merge].tolist())
+    merged_range_list = [block_range_list[0]]
+    for index in range(1, len(block_range_list)):
+        if index - 1 in merge_set:
+            merged_range_list[-1] = (merged_range_list[-1][0], block_range_list[index][1])
+        else:
+            merged_range_list.append(block_range_list[index])
+    return merged_range_list
+
+
+def _get_wave_chunk_plan(
+    segment_list: list[tuple[int, np.ndarray]], block_range_list: list[tuple[int, int]], num_block: int
+) -> WaveChunkPlan:
+    num_word_per_block = _num_sample_per_block // _num_sample_per_word
+    segment_index = 0
+
+    # identical wavedata is registered once, and consecutive identical chunks are repeated
+    wavedata_list: list[np.ndarray] = []
+    wavedata_index_dict: dict[bytes, int] = {}
+    chunk_list: list[tuple[int, int, int]] = []
+    for index, (block_start, block_end) in enumerate(block_range_list):
+        range_start = block_start * _num_sample_per_block
+        range_end = block_end * _num_sample_per_block
+        wavedata = np.zeros(range_end - range_start, dtype=complex)
+        while segment_index < len(segment_list) and segment_list[segment_index][0] < range_end:
+            start, samples = segment_list[segment_index]
+            wavedata[start - range_start : start - range_start + len(samples)] = samples
+            segment_index += 1
+        key = wavedata.tobytes()
+        if key not in wavedata_index_dict:
+            wavedata_index_dict[key] = len(wavedata_list)
+            wavedata_list.append(wavedata)
+        next_block_start = block_range_list[index + 1][0] if index + 1 < len(block_range_list) else num_block
+        num_blank_word = (next_block_start - block_end) * num_word_per_block
+        chunk = (wavedata_index_dict[key], num_blank_word, 1)
+        if len(chunk_list) > 0 and chunk_list[-1][:2] == chunk[:2]:
+            chunk_list[-1] = (chunk[0], chunk[1], chunk_list[-1][2] + 1)
+        else:
+            chunk_list.append(chunk)
+
+    num_wait_word = block_range_list[0][0] * num_word_per_block
+    return WaveChunkPlan(num_wait_word=num_wait_word, chunk_list=chunk_list, wavedata_list=wavedata_list)
+
+
+def plan_wave_chunk(waveform: Union[np.ndarray, SegmentWaveform]) -> WaveChunkPlan:
+    if isinstance(waveform, np.ndarray):
+        waveform = SegmentWaveform.from_dense(waveform)
+    # AWG requires at least one block even for an empty waveform
+    num_block = max(-(-waveform.length // _num_sample_per_block), 1)
+    segment_list = waveform.segment_list
+
+    block_range_list = []
+    for start, samples in segment_list:
+        block_start = start // _num_sample_per_block
+        block_end = -(-(start + len(samples)) // _num_sample_per_block)
+        block_range_list.append((block_start, block_end))
+    block_range_list = _merge_touching_block_range(block_range_list)
+    if len(block_range_list) == 0:
+        # AWG requires at least one chunk
+        block_range_list = [(0, 1)]
+
+    # when chunks exceed the AWG limit even with repeats, close ranges are uploaded together
+    plan = _get_wave_chunk_plan(segment_list, block_range_list, num_block)
+    if len(plan.chunk_list) > _max_num_wave_chunk:
+        block_range_list = _merge_closest_block_range(block_range_list, _max_num_wave_chunk)
+        plan = _get_wave_chunk_plan(segment_list, block_range_list, num_block)
+    return plan
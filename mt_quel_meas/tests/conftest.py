@@ -0,0 +1,63 @@
+import dataclasses
+import os
+import sys
+import types
+
+# sibling packages of the monorepo are imported from the source tree
+for _package in ["mt_pulse", "mt_util", "mt_quel_util"]:
+    sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", _package))
+
+
+def _stub_tunits() -> None:
+    # minimal units of tunits, which are values in base units of second and hertz
+    class UnitMismatchError(Exception):
+        pass
+
+    class Value:
+        _scale = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9, "Hz": 1.0, "MHz": 1e6, "GHz": 1e9}
+
+        def __init__(self, value: float, units: str = "") -> None:
+            self.value = value * self._scale.get(units, 1.0)
+            self.units = units
+
+        def __getitem__(self, units: str) -> float:
+            return self.value / self._scale[units]
+
+        def __mul__(self, other: float) -> "Value":
+            return Value(self.value * other)
+
+        __rmul__ = __mul__
+
+        def __add__(self, other: "Value") -> "Value":
+            return Value(self.value + other.value)
+
+    units = types.ModuleType("tunits.units")
+    for name in ["s", "ms", "us", "ns", "Hz", "MHz", "GHz"]:
+        setattr(units, name, Value(1.0, name))
+    tunits = types.ModuleType("tunits")
+    tunits.Value, tunits.ValueArray, tunits.UnitMismatchError, tunits.units = Value, Value, UnitMismatchError, units
+    sys.modules["tunits"], sys.modules["tunits.units"] = tunits, units
+
+
+def _stub_pydantic() -> None:
+    def dataclass(*args, **kwargs):
+        return dataclasses.dataclass(*args, **kwargs)
+
+    pydantic = types.ModuleType("pydantic")
+    pydantic_dataclasses = types.ModuleType("pydantic.dataclasses")
+    pydantic_dataclasses.dataclass = dataclass
+    pydantic.dataclasses = pydantic_dataclasses
+    pydantic.BaseModel = object
+    pydantic.PlainValidator = pydantic.PlainSerializer = lambda function: function
+    pydantic.validate_call = lambda function: function
+    sys.modules["pydantic"], sys.modules["pydantic.dataclasses"] = pydantic, pydantic_dataclasses
+
+
+try:
+    import tunits  # noqa: F401
+except ImportError:
+    _stub_tunits()
+try:
+    import pydantic  # noqa: F401
+except ImportError:
+    _stub_pydantic()
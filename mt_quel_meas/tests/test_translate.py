@@ -0,0 +1,49 @@
+import numpy as np
+from tunits.units import MHz
+from mt_pulse.pulse_preset import get_preset_pulse_library
+from mt_pulse.sequence import Sequence
+from mt_quel_util.constant import CONST_QuEL1SE_LOW_FREQ
+from mt_quel_util.mod_demod import modulate_waveform
+from mt_quel_meas.qubeserver.translate import _get_awg_channel_to_waveform
+
+
+def test_chunked_awg_waveform():
+    seq = Sequence(get_preset_pulse_library())
+    for channel in ["Q0_qubit", "Q1_qubit", "Q0_resonator"]:
+        seq.add_channel(channel)
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    seq.add_pulse("HPI", {"qubit": "Q1_qubit"})
+    seq.add_synchronize_all_command()
+    seq.add_pulse("FLATTOP", {"channel": "Q0_resonator"})
+    seq.add_pulse("HPI", {"qubit": "Q0_qubit"})
+    config = seq.get_config()
+    constant = CONST_QuEL1SE_LOW_FREQ
+    time_slots = np.arange(0, seq.get_duration(config, 100), 1e3 / constant.DACBB_sampling_freq["MHz"])
+
+    sequence_channel_to_awg_channel = {"Q0_qubit": "control", "Q1_qubit": "control", "Q0_resonator": "readout"}
+    sequence_channel_to_frequency_modulation = {"Q0_qubit": 30 * MHz, "Q1_qubit": -70 * MHz, "Q0_resonator": 10 * MHz}
+    sequence_channel_to_boxport = {"Q0_qubit": "ctrl", "Q1_qubit": "ctrl", "Q0_resonator": "read"}
+    boxport_to_LO_sideband = {"ctrl": "Direct", "read": "LSB"}
+
+    # reference is dense translation of the whole waveform
+    waveform, _ = seq.get_waveform(time_slots, config)
+    reference = {awg_channel: np.zeros(len(time_slots), dtype=complex) for awg_channel in ["control", "readout"]}
+    for sequence_channel, awg_channel in sequence_channel_to_awg_channel.items():
+        freq_modulate = sequence_channel_to_frequency_modulation[sequence_channel]
+        reference[awg_channel] += modulate_waveform(waveform[sequence_channel], freq_modulate, constant)
+    reference["readout"] = np.conj(reference["readout"])
+
+    # chunks split pulses at their boundaries
+    awg_channel_to_waveform = _get_awg_channel_to_waveform(
+        time_slots,
+        ["control", "readout"],
+        sequence_channel_to_awg_channel,
+        seq.iter_waveform_chunk(time_slots, config, 37),
+        sequence_channel_to_frequency_modulation,
+        sequence_channel_to_boxport,
+        boxport_to_LO_sideband,
+        constant,
+    )
+    for awg_channel, segment_waveform in awg_channel_to_waveform.items():
+        assert np.allclose(segment_waveform.to_dense(), reference[awg_channel])
+        assert np.any(reference[awg_channel] != 0)
@@ -0,0 +1,81 @@
+import numpy as np
+from mt_pulse.segment_waveform import SegmentWaveform
+from mt_quel_meas.quelware.wave_chunk import (
+    WaveChunkPlan,
+    plan_wave_chunk,
+    _num_sample_per_block,
+    _num_sample_per_word,
+    _max_num_wave_chunk,
+)
+
+
+def _reconstruct(plan: WaveChunkPlan) -> np.ndarray:
+    # waveform that AWG outputs from the plan
+    sample_list = [np.zeros(plan.num_wait_word * _num_sample_per_word, dtype=complex)]
+    for wavedata_index, num_blank_word, num_repeat in plan.chunk_list:
+        for _ in range(num_repeat):
+            sample_list.append(plan.wavedata_list[wavedata_index])
+            sample_list.append(np.zeros(num_blank_word * _num_sample_per_word, dtype=complex))
+    return np.concatenate(sample_list)
+
+
+def _assert_valid_plan(plan: WaveChunkPlan, waveform: np.ndarray) -> None:
+    assert 1 <= len(plan.chunk_list) <= _max_num_wave_chunk
+    for wavedata in plan.wavedata_list:
+        assert len(wavedata) > 0 and len(wavedata) % _num_sample_per_block == 0
+    for _, num_blank_word, num_repeat in plan.chunk_list:
+        assert num_blank_word >= 0 and num_repeat >= 1
+    reconstructed = _reconstruct(plan)
+    num_block = max(-(-len(waveform) // _num_sample_per_block), 1)
+    assert len(reconstructed) == num_block * _num_sample_per_block
+    assert np.array_equal(reconstructed[: len(waveform)], waveform)
+    assert not np.any(reconstructed[len(waveform) :])
+
+
+def test_wave_chunk_reconstruction():
+    random_state = np.random.RandomState(0)
+    for _ in range(50):
+        length = random_state.randint(1, 5000)
+        waveform = np.zeros(length, dtype=complex)
+        for _ in range(random_state.randint(1, 8)):
+            start = random_state.randint(length)
+            width = random_state.randint(1, 200)
+            waveform[start : start + width] = random_state.randn(len(waveform[start : start + width])) + 1.0j
+        plan = plan_wave_chunk(waveform)
+        _assert_valid_plan(plan, waveform)
+        plan_segment = plan_wave_chunk(SegmentWaveform.from_dense(waveform))
+        assert plan_segment.chunk_list == plan.chunk_list
+        assert plan_segment.num_wait_word == plan.num_wait_word
+
+    # identical pulses at a fixed period are uploaded once and repeated
+    waveform = np.zeros(_num_sample_per_block * 40, dtype=complex)
+    for block_index in range(4, 40, 4):
+        waveform[block_index * _num_sample_per_block + 3 : block_index * _num_sample_per_block + 30] = 0.5
+    plan = plan_wave_chunk(waveform)
+    _assert_valid_plan(plan, waveform)
+    assert plan.num_wait_word == 4 * _num_sample_per_block // _num_sample_per_word
+    assert len(plan.wavedata_list) == 1
+    assert plan.chunk_list == [(0, 3 * _num_sample_per_block // _num_sample_per_word, 9)]
+
+
+def test_wave_chunk_limit():
+    # distinct pulses more than the chunk limit are merged with their closest neighbors
+    random_state = np.random.RandomState(1)
+    num_pulse = 3 * _max_num_wave_chunk
+    waveform = np.zeros(_num_sample_per_block * 8 * num_pulse, dtype=complex)
+    for pulse_index in range(num_pulse):
+        start = (pulse_index * 8 + random_state.randint(1, 6)) * _num_sample_per_block
+        waveform[start : start + 10] = random_state.randn(10)
+    plan = plan_wave_chunk(waveform)
+    _assert_valid_plan(plan, waveform)
+    assert len(plan.chunk_list) == _max_num_wave_chunk
+    assert plan.nbytes < waveform.nbytes
+
+
+def test_wave_chunk_empty():
+    for waveform in [np.zeros(0, dtype=complex), np.zeros(1000, dtype=complex), np.zeros(128, dtype=complex)]:
+        plan = plan_wave_chunk(waveform)
+        _assert_valid_plan(plan, waveform)
+        assert plan.num_wait_word == 0
+        assert len(plan.wavedata_list) == 1
+        assert not np.any(plan.wavedata_list[0])
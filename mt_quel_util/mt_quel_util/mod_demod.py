@@ -1,19 +1,38 @@
+from typing import Optional
 import numpy as np
 from mt_quel_util.constant import InstrumentConstantQuEL
 from mt_util.tunits_util import FrequencyType, TimeType
 
 
 def modulate_waveform(
-    channel_waveform: np.ndarray, frequency_modulate: FrequencyType, constant: InstrumentConstantQuEL
+    channel_waveform: np.ndarray,
+    frequency_modulate: FrequencyType,
+    constant: InstrumentConstantQuEL,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
+    # complex64 input is modulated in complex64, and out may be channel_waveform itself for in-place modulation
     assert channel_waveform.ndim == 1
     DAC_baseband_freq = constant.DACBB_sampling_freq
     phase_factor = 2 * np.pi * (frequency_modulate["MHz"] / DAC_baseband_freq["MHz"]) * np.arange(len(channel_waveform))
-    coef_factor = np.exp(1j * phase_factor)
-    corrected_channel_waveform = channel_waveform * coef_factor
+    coef_factor = np.exp(1j * phase_factor).astype(np.result_type(channel_waveform.dtype, np.complex64), copy=False)
+    corrected_channel_waveform = np.multiply(channel_waveform, coef_factor, out=out)
     return corrected_channel_waveform
 
 
+def modulate_waveform_segment(
+    segment_list: list[tuple[int, np.ndarray]], frequency_modulate: FrequencyType, constant: InstrumentConstantQuEL
+) -> list[tuple[int, np.ndarray]]:
+    # segment_list is a list of (start sample index, samples), and zero gaps are kept zero
+    DAC_baseband_freq = constant.DACBB_sampling_freq
+    phase_coef = 2 * np.pi * (frequency_modulate["MHz"] / DAC_baseband_freq["MHz"])
+    corrected_segment_list: list[tuple[int, np.ndarray]] = []
+    for start, samples in segment_list:
+        assert samples.ndim == 1
+        coef_factor = np.exp(1j * phase_coef * np.arange(start, start + len(samples)))
+        corrected_segment_list.append((start, samples * coef_factor))
+    return corrected_segment_list
+
+
 def demodulate_waveform(
     readout_waveform: np.ndarray,
     frequency_modulate: FrequencyType,